@@ -1,6 +1,7 @@
 from .table import Table
 from .exceptions import InvalidSchema, InvalidColumn, InvalidData, InvalidIndex
 from .index import Index
+from .expression import col, lit
 from .table_literal import table_literal
 from .table_test_mixin import TableTestMixin
 
@@ -12,5 +13,7 @@ __all__ = [
     "InvalidColumn",
     "InvalidData",
     "InvalidIndex",
-    "Index"
+    "Index",
+    "col",
+    "lit",
 ]
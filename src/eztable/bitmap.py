@@ -0,0 +1,295 @@
+"""A compact, growable sequence of bits.
+"""
+
+import array
+import binascii
+import sys
+import six.moves
+
+# The positions of the set bits in each possible byte.
+_BIT_POSITIONS = [
+    tuple(j for j in range(8) if b >> j & 1) for b in range(256)
+]
+
+
+class Bitmap(object):
+
+    """A list-like sequence of booleans stored as single bits, eight
+    to a byte. Bit i is held in byte i // 8 at bit position i % 8.
+
+    Bitmaps of equal length can be combined with the &, | and ^
+    operators, and inverted with ~. These work on the whole bitmap as
+    a single integer rather than bit by bit.
+    """
+
+    def __init__(self, bits=()):
+        self._bytes = bytearray()
+        self._len = 0
+        self.extend(bits)
+
+    @classmethod
+    def filled(cls, value, length):
+        """Create a bitmap of length bits which are all set to value.
+        """
+        b = cls()
+        b.fill(value, length)
+        return b
+
+    @classmethod
+    def from_positions(cls, positions, length):
+        """Create a bitmap of length bits in which only the bits at
+        the given positions are set."""
+        b = cls.filled(False, length)
+        bs = b._bytes
+        for i in positions:
+            bs[i >> 3] |= 1 << (i & 7)
+        return b
+
+    def copy(self):
+        b = self.__class__()
+        b._bytes = bytearray(self._bytes)
+        b._len = self._len
+        return b
+
+    def __len__(self):
+        return self._len
+
+    def __sizeof__(self):
+        return object.__sizeof__(self) + sys.getsizeof(self._bytes)
+
+    def _normalize(self, i):
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError('Bitmap index out of range')
+        return i
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in six.moves.range(*i.indices(self._len))]
+        i = self._normalize(i)
+        return bool(self._bytes[i >> 3] & (1 << (i & 7)))
+
+    def __setitem__(self, i, value):
+        i = self._normalize(i)
+        if value:
+            self._bytes[i >> 3] |= 1 << (i & 7)
+        else:
+            self._bytes[i >> 3] &= ~(1 << (i & 7)) & 0xff
+
+    def __iter__(self):
+        bs = self._bytes
+        for i in six.moves.range(self._len):
+            yield bool(bs[i >> 3] & (1 << (i & 7)))
+
+    def __repr__(self):
+        return '%s(%s)' % (
+            self.__class__.__name__,
+            ''.join('1' if b else '0' for b in self)
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, Bitmap):
+            return NotImplemented
+        return self._len == other._len and self._bytes == other._bytes
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    __hash__ = None
+
+    def _as_int(self):
+        """The bits as a single integer, bit i being the i-th bit."""
+        return int(binascii.hexlify(bytes(self._bytes[::-1])) or b'0', 16)
+
+    @classmethod
+    def _from_int(cls, n, length):
+        b = cls()
+        nbytes = (length + 7) // 8
+        if nbytes:
+            n &= (1 << length) - 1
+            b._bytes = bytearray(
+                binascii.unhexlify('%0*x' % (nbytes * 2, n))[::-1])
+        b._len = length
+        return b
+
+    def _combine(self, other, op):
+        if not isinstance(other, Bitmap):
+            return NotImplemented
+        if self._len != other._len:
+            raise ValueError(
+                'Cannot combine bitmaps of length %d and %d' % (
+                    self._len, other._len))
+        return self._from_int(op(self._as_int(), other._as_int()), self._len)
+
+    def __and__(self, other):
+        return self._combine(other, lambda a, b: a & b)
+
+    def __or__(self, other):
+        return self._combine(other, lambda a, b: a | b)
+
+    def __xor__(self, other):
+        return self._combine(other, lambda a, b: a ^ b)
+
+    def __invert__(self):
+        return self._from_int(~self._as_int(), self._len)
+
+    def _set_run(self, start, stop):
+        """Set the bits from start up to, but not including, stop."""
+        if start >= stop:
+            return
+        bs = self._bytes
+        first, last = start >> 3, (stop - 1) >> 3
+        if first == last:
+            bs[first] |= ((1 << (stop - start)) - 1) << (start & 7)
+            return
+        bs[first] |= (0xff << (start & 7)) & 0xff
+        bs[first + 1:last] = bytearray([0xff]) * (last - first - 1)
+        bs[last] |= (1 << (((stop - 1) & 7) + 1)) - 1
+
+    def any(self):
+        """True if any bit is set."""
+        return any(self._bytes)
+
+    def positions(self):
+        """Generator giving the position of each set bit, in order."""
+        table = _BIT_POSITIONS
+        for k, byte in enumerate(self._bytes):
+            if byte:
+                base = k << 3
+                for j in table[byte]:
+                    yield base + j
+
+    def append(self, value):
+        i = self._len
+        if not i & 7:
+            self._bytes.append(0)
+        if value:
+            self._bytes[i >> 3] |= 1 << (i & 7)
+        self._len = i + 1
+
+    def extend(self, values):
+        values = list(values)
+        head = min((-self._len) & 7, len(values))
+        for v in values[:head]:
+            self.append(v)
+        # The bitmap now ends on a byte boundary, so the remaining
+        # values can be packed a whole byte at a time.
+        bs = self._bytes
+        for k in six.moves.range(head, len(values), 8):
+            byte = 0
+            for j, v in enumerate(values[k:k + 8]):
+                if v:
+                    byte |= 1 << j
+            bs.append(byte)
+        self._len += len(values) - head
+
+    def fill(self, value, count):
+        """Append count copies of value."""
+        if count <= 0:
+            return
+        end = self._len + count
+        pad = 0xff if value else 0
+        spare = (-self._len) & 7
+        first = min(spare, count)
+        if value and first:
+            mask = ((1 << first) - 1) << (8 - spare)
+            self._bytes[-1] |= mask
+        self._bytes.extend(bytearray([pad]) * ((end + 7) // 8 - len(self._bytes)))
+        self._len = end
+        if value and end & 7:
+            self._bytes[-1] &= (1 << (end & 7)) - 1
+
+    def count(self, value=True):
+        """Count the bits which are set to value."""
+        ones = bin(self._as_int()).count('1')
+        return ones if value else self._len - ones
+
+
+class RunBitmap(object):
+
+    """A sequence of bits compressed as the runs of consecutive set
+    bits, each stored as its start and stop position. This is much
+    smaller than a Bitmap when the set bits are clustered, as the rows
+    holding each value of a sorted or slowly changing column are, and
+    much larger when they are scattered.
+
+    Bits can only be added at the end. Use bitmap() to get a Bitmap
+    which can be combined with others.
+    """
+
+    def __init__(self):
+        self._starts = array.array('l')
+        self._stops = array.array('l')
+        self._len = 0
+
+    @classmethod
+    def from_positions(cls, positions, length):
+        """Create a RunBitmap of length bits in which only the bits at
+        the given positions, which must be in ascending order, are
+        set."""
+        b = cls()
+        starts, stops = b._starts, b._stops
+        for i in positions:
+            if stops and stops[-1] == i:
+                stops[-1] = i + 1
+            else:
+                starts.append(i)
+                stops.append(i + 1)
+        b._len = length
+        return b
+
+    def __len__(self):
+        return self._len
+
+    def __sizeof__(self):
+        return (object.__sizeof__(self) +
+                sys.getsizeof(self._starts) + sys.getsizeof(self._stops))
+
+    def __repr__(self):
+        return '<%s %d bits in %d runs>' % (
+            self.__class__.__name__, self._len, self.runs)
+
+    @property
+    def runs(self):
+        """The number of runs of set bits."""
+        return len(self._starts)
+
+    @property
+    def nbytes(self):
+        """Bytes taken up by the runs."""
+        return self._starts.itemsize * 2 * len(self._starts)
+
+    def append(self, value):
+        self.fill(value, 1)
+
+    def fill(self, value, count):
+        """Append count copies of value."""
+        if count <= 0:
+            return
+        if value:
+            if self._stops and self._stops[-1] == self._len:
+                self._stops[-1] += count
+            else:
+                self._starts.append(self._len)
+                self._stops.append(self._len + count)
+        self._len += count
+
+    def positions(self):
+        """Generator giving the position of each set bit, in order."""
+        for start, stop in six.moves.zip(self._starts, self._stops):
+            for i in six.moves.range(start, stop):
+                yield i
+
+    def count(self, value=True):
+        """Count the bits which are set to value."""
+        ones = sum(self._stops) - sum(self._starts)
+        return ones if value else self._len - ones
+
+    def bitmap(self):
+        """The bits as an uncompressed Bitmap."""
+        b = Bitmap.filled(False, self._len)
+        for start, stop in six.moves.zip(self._starts, self._stops):
+            b._set_run(start, stop)
+        return b
@@ -1,6 +1,35 @@
+import bisect
+import collections
+import datetime
+import decimal
+import functools
 import itertools
 import array
+import re
+import sys
+import zlib
 import six
+from six.moves import cPickle as pickle
+
+try:
+    import lzma
+except ImportError:  # Python 2
+    lzma = None
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    from concurrent import futures
+except ImportError:  # Python 2 without the futures backport
+    futures = None
+
+from .bitmap import Bitmap
+from .exceptions import InvalidData
+from .stats import ColumnStats, ZoneMap, column_stats
+from .memory import sizeof_list
 
 if six.PY2:
     import types
@@ -9,6 +38,46 @@ else:
     import builtins
     builtin_types = vars(builtins).values()
 
+NoneType = type(None)
+
+try:
+    array.array('q')
+    INT64_TYPECODE = 'q'
+except ValueError:  # Python 2 has no long long arrays
+    INT64_TYPECODE = 'l'
+
+
+def range_span(indices):
+    """(start, stop) if indices is a range with a step of 1, otherwise
+    None. Python 2's xrange has no start, stop or step attributes, so
+    they are worked out from its length and first items."""
+    if not isinstance(indices, six.moves.range):
+        return None
+    n = len(indices)
+    if n == 0:
+        return 0, 0
+    start = indices[0]
+    if n > 1 and indices[1] - start != 1:
+        return None
+    return start, start + n
+
+
+def covers_column(indices, column):
+    """True if indices is every position in column, in order."""
+    span = range_span(indices)
+    if span is None:
+        return False
+    try:
+        return span == (0, len(column))
+    except TypeError:  # The column has no length
+        return False
+
+
+def is_sequence(indices):
+    """True if indices supports len() and positional access, as ranges,
+    lists and arrays do, rather than being a one-off iterator."""
+    return hasattr(indices, '__len__') and hasattr(indices, '__getitem__')
+
 
 def describe_column(name, typ):
     if typ is object:
@@ -23,14 +92,52 @@ def describe_column(name, typ):
     )
 
 
-class Column(list):
+class StatsMixin(object):
 
-    def __init__(self, name, values=None, column_type=object):
-        values = values or []
-        list.__init__(self)
-        self.name = name
-        self.column_type = column_type
-        self[:] = values
+    """Gives a stored column running statistics. They are brought up to
+    date whenever they are read, by scanning only the rows which have
+    been added since the last read, so appending is not slowed down.
+    """
+
+    _stats = None
+    _zone_map = None
+
+    @property
+    def stats(self):
+        """A ColumnStats object describing every value in this column."""
+        stats = self._stats
+        n = len(self)
+        if stats is None or stats.rows > n:
+            stats = self._stats = ColumnStats()
+        if stats.rows < n:
+            stats.update(self[stats.rows:n])
+        return stats
+
+    @property
+    def zone_map(self):
+        """A ZoneMap of this column's complete chunks, or None if the
+        column's values cannot be ordered."""
+        zone_map = self._zone_map
+        if zone_map is False:
+            return None
+        n = len(self)
+        if zone_map is None or zone_map.rows > n:
+            zone_map = self._zone_map = ZoneMap()
+        size = zone_map.chunk_size
+        try:
+            for start in six.moves.range(zone_map.rows, n - size + 1, size):
+                zone_map.add_chunk(self[start:start + size])
+        except TypeError:
+            self._zone_map = False
+            return None
+        return zone_map
+
+
+class TypedColumn(StatsMixin):
+
+    """Base class for stored columns whose values must be instances
+    of column_type (or None).
+    """
 
     @property
     def description(self):
@@ -39,11 +146,179 @@ class Column(list):
     def validate(self, v):
         return v is None or isinstance(v, self.column_type)
 
+    def validate_many(self, values):
+        """Validate a batch of values at once. Each distinct type
+        in the batch is checked once, rather than every value.
+        """
+        typ = self.column_type
+        if typ is object:
+            return True
+        return all(
+            t is NoneType or issubclass(t, typ)
+            for t in set(six.moves.map(type, values))
+        )
+
+    @staticmethod
+    def coerce_many(values):
+        """Convert a batch of validated values into something
+        which can be passed to extend."""
+        return values
+
     def fn_from_string(self):
         return self.column_type
 
 
-class ArrayColumn(array.array):
+class Column(TypedColumn, list):
+
+    storage = 'object'
+
+    def __init__(self, name, values=None, column_type=object):
+        values = values or []
+        list.__init__(self)
+        self.name = name
+        self.column_type = column_type
+        self[:] = values
+
+    def memory_usage(self, deep=True):
+        """Bytes used by this column, including its values if deep."""
+        return sizeof_list(self, deep)
+
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+TIMESTAMP_FORMATS = [
+    '%Y-%m-%d %H:%M:%S.%f',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S.%f',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%d',
+]
+
+
+DECIMAL_STRING = re.compile(r'([+-]?)([0-9]*)(?:\.([0-9]*))?$')
+
+
+def to_microseconds(delta):
+    """Convert a timedelta into a whole number of microseconds."""
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def parse_timestamp(s):
+    """Parse a datetime from an ISO 8601 style string, as printed by
+    str(datetime)."""
+    for fmt in TIMESTAMP_FORMATS:
+        try:
+            return datetime.datetime.strptime(s, fmt)
+        except ValueError:
+            pass
+    raise ValueError('Cannot parse %r as a timestamp' % s)
+
+
+class StringPool(object):
+
+    """A pool of distinct strings. Interning a string returns the
+    pool's copy of any equal string, so that each distinct value is
+    only held in memory once, and comparisons between interned values
+    can short-circuit on identity.
+
+    The pool counts the strings it has been given, so that it can
+    report how much repetition it has removed.
+    """
+
+    STRING_TYPES = (six.binary_type, six.text_type)
+
+    def __init__(self):
+        self.strings = {}
+        self.interned = 0
+
+    def __len__(self):
+        return len(self.strings)
+
+    @property
+    def dedupe_ratio(self):
+        """The number of strings interned for every distinct string
+        held, i.e. 1.0 means no values were repeated."""
+        if not self.strings:
+            return 1.0
+        return self.interned / float(len(self.strings))
+
+    def intern(self, v):
+        """Get the pooled copy of v. Values which are not strings are
+        returned as they are."""
+        if type(v) not in self.STRING_TYPES:
+            return v
+        self.interned += 1
+        return self.strings.setdefault(v, v)
+
+    def intern_many(self, values):
+        """Intern a batch of values, returning a list."""
+        string_types = self.STRING_TYPES
+        setdefault = self.strings.setdefault
+        result = [
+            setdefault(v, v) if type(v) in string_types else v
+            for v in values
+        ]
+        self.interned += sum(1 for v in result if type(v) in string_types)
+        return result
+
+    def memory_usage(self, deep=True):
+        """Bytes used by the pool's dictionary, including its strings
+        if deep."""
+        total = sys.getsizeof(self.strings)
+        if deep:
+            total += sum(sys.getsizeof(v) for v in self.strings)
+        return total
+
+
+class InternedColumn(Column):
+
+    """A Column whose strings are interned in a StringPool as they are
+    added. The pool may be shared between columns, as it is by every
+    interned column of a Table.
+    """
+
+    storage = 'interned'
+
+    def __init__(self, name, values=None, column_type=object, pool=None):
+        self.pool = StringPool() if pool is None else pool
+        Column.__init__(self, name, column_type=column_type)
+        self.extend(values or [])
+
+    def append(self, v):
+        list.append(self, self.pool.intern(v))
+
+    def extend(self, values):
+        list.extend(self, self.pool.intern_many(values))
+
+    def insert(self, i, v):
+        list.insert(self, i, self.pool.intern(v))
+
+    def __setitem__(self, key, v):
+        if isinstance(key, slice):
+            v = self.pool.intern_many(v)
+        else:
+            v = self.pool.intern(v)
+        list.__setitem__(self, key, v)
+
+    def __setslice__(self, start, stop, values):
+        """Required to support slice assignment on Python 2.x
+        """
+        self.__setitem__(slice(start, stop), values)
+
+    def __iadd__(self, values):
+        self.extend(values)
+        return self
+
+
+class ArrayColumn(StatsMixin, array.array):
+
+    """A column whose values are held in an array.array.
+
+    Missing values (None) are allowed. The first time a None is stored
+    the column starts to keep a validity bitmap alongside the array,
+    in which a cleared bit marks a missing value. The array holds a
+    placeholder (zero) in the same position.
+    """
 
     PY_TYPE_MAPPING = {
         'c': str,
@@ -56,6 +331,8 @@ class ArrayColumn(array.array):
         'I': int,
         'l': int,
         'L': int,
+        'q': int,
+        'Q': int,
         'f': float,
         'd': float
     }
@@ -65,6 +342,7 @@ class ArrayColumn(array.array):
 
     def __init__(self, name, values=None, column_type=None):
         self.name = name
+        self._validity = None
         self.extend(values or [])
 
     def fn_from_string(self):
@@ -78,10 +356,926 @@ class ArrayColumn(array.array):
     def description(self):
         return '%s (%s)' % (self.name, self.typecode)
 
+    @property
+    def null_count(self):
+        """The number of missing values in this column."""
+        if self._validity is None:
+            return 0
+        return self._validity.count(False)
+
+    def memory_usage(self, deep=True):
+        """Bytes used by this column's array and validity bitmap."""
+        total = sys.getsizeof(self)
+        if self._validity is not None:
+            total += sys.getsizeof(self._validity)
+        return total
+
+    @property
+    def _placeholder(self):
+        return u'\x00' if self.typecode in 'uc' else 0
+
     @staticmethod
     def validate(_):
         return True
 
+    @staticmethod
+    def validate_many(_):
+        return True
+
+    def coerce_many(self, values):
+        """Convert a batch of values into an array of this column's
+        type-code. Raises TypeError or OverflowError if any value
+        cannot be stored, without modifying the column."""
+        if None in values:
+            return ArrayColumn(self.name, values, self.typecode)
+        return array.array(self.typecode, values)
+
+    def _start_validity(self):
+        if self._validity is None:
+            self._validity = Bitmap.filled(True, len(self))
+
+    def append(self, v):
+        if v is None:
+            self._start_validity()
+            array.array.append(self, self._placeholder)
+            self._validity.append(False)
+        else:
+            array.array.append(self, v)
+            if self._validity is not None:
+                self._validity.append(True)
+
+    def extend(self, values):
+        if isinstance(values, ArrayColumn):
+            validity = values._validity
+        elif isinstance(values, array.array):
+            validity = None
+        else:
+            values = list(values)
+            if None in values:
+                validity = Bitmap(v is not None for v in values)
+                placeholder = self._placeholder
+                values = [placeholder if v is None else v for v in values]
+            else:
+                validity = None
+            values = array.array(self.typecode, values)
+
+        if validity is not None:
+            self._start_validity()
+        array.array.extend(self, values)
+        if validity is not None:
+            self._validity.extend(validity)
+        elif self._validity is not None:
+            self._validity.fill(True, len(values))
+
+    def __setitem__(self, key, v):
+        if isinstance(key, slice):
+            raise TypeError('ArrayColumn only supports setting single rows')
+        if v is None:
+            self._start_validity()
+            array.array.__setitem__(self, key, self._placeholder)
+            self._validity[key] = False
+        else:
+            array.array.__setitem__(self, key, v)
+            if self._validity is not None:
+                self._validity[key] = True
+
+    def __getitem__(self, key):
+        validity = self._validity
+        if validity is None:
+            return array.array.__getitem__(self, key)
+        if isinstance(key, slice):
+            return [self[i] for i in six.moves.range(*key.indices(len(self)))]
+        if validity[key]:
+            return array.array.__getitem__(self, key)
+        return None
+
+    def __iter__(self):
+        validity = self._validity
+        if validity is None:
+            return array.array.__iter__(self)
+        return (
+            v if ok else None
+            for v, ok in six.moves.zip(array.array.__iter__(self), validity)
+        )
+
+    def __getslice__(self, start, stop):
+        """Required to support slicing on Python 2.x
+        """
+        return self.__getitem__(slice(start, stop))
+
+    # The methods below are inherited from array.array, which would see
+    # the placeholders stored for missing values.
+
+    def tolist(self):
+        return list(self)
+
+    def __eq__(self, other):
+        if not isinstance(other, array.array):
+            return NotImplemented
+        if self._validity is None and getattr(other, '_validity', None) is None:
+            return array.array.__eq__(self, other)
+        return len(self) == len(other) and \
+            all(a == b for a, b in six.moves.zip(self, other))
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    __hash__ = None
+
+    def __contains__(self, v):
+        if self._validity is None:
+            return v is not None and array.array.__contains__(self, v)
+        return any(x == v for x in self)
+
+    def count(self, v):
+        if self._validity is None:
+            return 0 if v is None else array.array.count(self, v)
+        return sum(1 for x in self if x == v)
+
+    def index(self, v):
+        if self._validity is None and v is not None:
+            return array.array.index(self, v)
+        for i, x in enumerate(self):
+            if x == v:
+                return i
+        raise ValueError('%r is not in column %s' % (v, self.name))
+
+
+class CompactColumn(TypedColumn):
+
+    """A column of ints or floats which is stored in a compact
+    ArrayColumn for as long as possible. Missing values are recorded
+    in the array's validity bitmap.
+
+    The first time the column is given a value which the array cannot
+    hold (e.g. an integer which is too large, or an instance of a
+    subclass such as bool) all of its values are permanently moved into
+    an ordinary list of objects.
+    """
+
+    storage = 'compact'
+
+    TYPECODES = {
+        int: INT64_TYPECODE,
+        float: 'd',
+    }
+
+    def __init__(self, name, values=None, column_type=int):
+        self.name = name
+        self.column_type = column_type
+        self._values = ArrayColumn(
+            name, column_type=self.TYPECODES[column_type])
+        self.extend(values or [])
+
+    @property
+    def is_compact(self):
+        """True while the column's values are held in an array."""
+        return isinstance(self._values, array.array)
+
+    @property
+    def null_count(self):
+        """The number of missing values in this column."""
+        if self.is_compact:
+            return self._values.null_count
+        return sum(1 for v in self._values if v is None)
+
+    def memory_usage(self, deep=True):
+        """Bytes used by this column, including its values if deep."""
+        if self.is_compact:
+            return self._values.memory_usage(deep)
+        return sizeof_list(self._values, deep)
+
+    def _to_objects(self):
+        self._values = list(self._values)
+
+    def append(self, v):
+        if self.is_compact:
+            if v is None or type(v) is self.column_type:
+                try:
+                    self._values.append(v)
+                    return
+                except OverflowError:
+                    pass
+            self._to_objects()
+        self._values.append(v)
+
+    def extend(self, values):
+        if self.is_compact:
+            if isinstance(values, array.array) and \
+                    values.typecode == self._values.typecode:
+                self._values.extend(values)
+                return
+            values = list(values)
+            if set(six.moves.map(type, values)) <= set([self.column_type, NoneType]):
+                try:
+                    self._values.extend(values)
+                    return
+                except OverflowError:
+                    pass
+            self._to_objects()
+        self._values.extend(values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def __setitem__(self, key, v):
+        if self.is_compact:
+            if v is None or type(v) is self.column_type:
+                try:
+                    self._values[key] = v
+                    return
+                except OverflowError:
+                    pass
+            self._to_objects()
+        self._values[key] = v
+
+
+class TimestampColumn(TypedColumn):
+
+    """A column of naive datetimes, stored as 64 bit integer counts of
+    microseconds since 1970-01-01 (in the raw ArrayColumn) and only
+    converted into datetime objects when they are read.
+
+    Indexes and joins group rows by these integers, and
+    Table.restrict_between and Table.expand_bucket work on them
+    directly.
+    """
+
+    storage = 'timestamp'
+
+    def __init__(self, name, values=None, column_type=datetime.datetime):
+        self.name = name
+        self.column_type = column_type
+        self.raw = ArrayColumn(name, column_type=INT64_TYPECODE)
+        self.extend(values or [])
+
+    @property
+    def description(self):
+        return '%s (timestamp)' % self.name
+
+    @property
+    def null_count(self):
+        """The number of missing values in this column."""
+        return self.raw.null_count
+
+    def memory_usage(self, deep=True):
+        """Bytes used by this column's integers."""
+        return self.raw.memory_usage(deep)
+
+    def validate(self, v):
+        return v is None or (
+            isinstance(v, self.column_type) and v.tzinfo is None)
+
+    def validate_many(self, values):
+        return TypedColumn.validate_many(self, values) and all(
+            v is None or v.tzinfo is None for v in values)
+
+    def fn_from_string(self):
+        return parse_timestamp
+
+    @staticmethod
+    def to_raw(v):
+        """Convert a datetime into microseconds since the epoch."""
+        return None if v is None else to_microseconds(v - EPOCH)
+
+    @staticmethod
+    def decode(n):
+        """Convert microseconds since the epoch into a datetime."""
+        return None if n is None else EPOCH + datetime.timedelta(microseconds=n)
+
+    @property
+    def encoded(self):
+        return self.raw
+
+    def bucket_column(self, name, width):
+        """A DerivedColumn giving the start of the bucket of length
+        width (a timedelta) which each value falls into. Buckets are
+        aligned to the epoch."""
+        step = to_microseconds(width)
+        decode = self.decode
+
+        def bucket(n):
+            return None if n is None else decode(n - n % step)
+        return DerivedColumn(name, [self.raw], bucket, self.column_type)
+
+    def append(self, v):
+        self.raw.append(self.to_raw(v))
+
+    def extend(self, values):
+        to_raw = self.to_raw
+        self.raw.extend([to_raw(v) for v in values])
+
+    def __len__(self):
+        return len(self.raw)
+
+    def __iter__(self):
+        return six.moves.map(self.decode, self.raw)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self.decode(n) for n in self.raw[key]]
+        return self.decode(self.raw[key])
+
+
+class FixedDecimalColumn(TypedColumn):
+
+    """A column of Decimals with a fixed number of digits after the
+    decimal point (the scale), stored as 64 bit integers in units of
+    10 ** -scale, e.g. cents for a scale of 2.
+
+    Values with more digits after the point than the scale are invalid,
+    rather than being rounded, so the column is always exact. Sums add
+    the stored integers, converting only the result into a Decimal, and
+    so does arithmetic in expressions given to Table.expand (see
+    eztable.expression.fixed_scale).
+    """
+
+    MIN_RAW = -2 ** 63
+    MAX_RAW = 2 ** 63 - 1
+
+    def __init__(self, name, values=None, column_type=decimal.Decimal, scale=2):
+        self.name = name
+        self.column_type = column_type
+        self.scale = scale
+        self.raw = ArrayColumn(name, column_type=INT64_TYPECODE)
+        self.extend(values or [])
+
+    @classmethod
+    def for_storage(cls, name, column_type, parameter):
+        """Build a column for the storage policy 'fixed:<scale>'."""
+        scale = int(parameter)
+        if scale < 0:
+            raise ValueError('The scale of a fixed column cannot be negative')
+        return cls(name, column_type=column_type, scale=scale)
+
+    @property
+    def storage(self):
+        return 'fixed:%d' % self.scale
+
+    @property
+    def description(self):
+        return '%s (%s)' % (self.name, self.storage)
+
+    @property
+    def null_count(self):
+        """The number of missing values in this column."""
+        return self.raw.null_count
+
+    def memory_usage(self, deep=True):
+        """Bytes used by this column's integers."""
+        return self.raw.memory_usage(deep)
+
+    def to_raw(self, v):
+        """Scale a number into units of 10 ** -scale. The result is an
+        int if the number has no more digits than the scale allows,
+        otherwise an exact Decimal."""
+        if v is None:
+            return None
+        d = decimal.Decimal(v)
+        # scaleb rounds to the context's precision, so give it enough
+        # for every digit of d
+        context = decimal.Context(prec=max(len(d.as_tuple().digits), 1))
+        scaled = d.scaleb(self.scale, context)
+        n = int(scaled)
+        return n if n == scaled else scaled
+
+    def _checked(self, n, v):
+        """n, the stored form of v, if it fits in the column."""
+        if n is None or isinstance(n, six.integer_types) and \
+                self.MIN_RAW <= n <= self.MAX_RAW:
+            return n
+        raise InvalidData(
+            '%r cannot be stored exactly in 64 bits in column %s (%s)' % (
+                v, self.name, self.storage))
+
+    def decode(self, n):
+        """Convert a stored integer into a Decimal."""
+        return None if n is None else decimal.Decimal(n).scaleb(-self.scale)
+
+    @property
+    def encoded(self):
+        return self.raw
+
+    def validate(self, v):
+        if v is None:
+            return True
+        if not isinstance(v, self.column_type) or not v.is_finite():
+            return False
+        n = self.to_raw(v)
+        return isinstance(n, six.integer_types) and \
+            self.MIN_RAW <= n <= self.MAX_RAW
+
+    def validate_many(self, values):
+        return all(self.validate(v) for v in values)
+
+    def parse_raw(self, s):
+        """Parse a string such as '-12.50' straight into a stored
+        integer, without making a Decimal."""
+        s = s.strip()
+        if s == 'None':
+            return None
+        m = DECIMAL_STRING.match(s)
+        scale = self.scale
+        if m and (m.group(2) or m.group(3)) and \
+                not (m.group(3) or '')[scale:].strip('0'):
+            sign, whole, frac = m.groups()
+            frac = ((frac or '') + '0' * scale)[:scale]
+            n = int(whole or '0') * 10 ** scale + int(frac or '0')
+            return self._checked(-n if sign == '-' else n, s)
+
+        # Exponents, and anything else which Decimal understands
+        try:
+            d = decimal.Decimal(s)
+        except decimal.InvalidOperation:
+            d = None
+        if d is None or not d.is_finite():
+            raise ValueError('Cannot parse %r as a decimal' % s)
+        n = self.to_raw(d)
+        if not isinstance(n, six.integer_types):
+            raise ValueError(
+                '%r has more than %d digits after the point' % (s, scale))
+        return self._checked(n, s)
+
+    def fn_from_string(self):
+        return lambda s: self.decode(self.parse_raw(s))
+
+    def parse_strings(self, strings):
+        """Build a column like this one from a sequence of strings,
+        parsing each straight into the stored integers."""
+        c = self.__class__(self.name, column_type=self.column_type, scale=self.scale)
+        c.raw.extend([self.parse_raw(s) for s in strings])
+        return c
+
+    def sum_rows(self, rows):
+        """The sum of the values in the given rows, ignoring missing
+        values, as a Decimal."""
+        span = range_span(rows)
+        if span is not None:
+            raw = array.array.__getitem__(self.raw, slice(*span))
+        else:
+            raw = six.moves.map(
+                functools.partial(array.array.__getitem__, self.raw), rows)
+        # Missing values are stored as zero
+        return self.decode(sum(raw))
+
+    def sum(self):
+        """The sum of every value in the column, as a Decimal."""
+        return self.sum_rows(six.moves.range(len(self)))
+
+    def append(self, v):
+        self.raw.append(self._checked(self.to_raw(v), v))
+
+    def extend(self, values):
+        to_raw, checked = self.to_raw, self._checked
+        self.raw.extend([checked(to_raw(v), v) for v in values])
+
+    def __len__(self):
+        return len(self.raw)
+
+    def __iter__(self):
+        return six.moves.map(self.decode, self.raw)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self.decode(n) for n in self.raw[key]]
+        return self.decode(self.raw[key])
+
+
+class BitColumn(TypedColumn):
+
+    """A column of booleans which uses one bit per row.
+
+    Missing values are recorded in a validity bitmap, which is only
+    created once the first None is stored. The &, | and ~ operators
+    combine BitColumns (or Bitmaps) of the same length into a Bitmap of
+    the rows in which the result is True, with missing values counting
+    as False. Such a Bitmap can be passed to Table.restrict_mask.
+    """
+
+    storage = 'bits'
+
+    def __init__(self, name, values=None, column_type=bool):
+        self.name = name
+        self.column_type = column_type
+        self.bits = Bitmap()
+        self._validity = None
+        self.extend(values or [])
+
+    @property
+    def null_count(self):
+        """The number of missing values in this column."""
+        if self._validity is None:
+            return 0
+        return self._validity.count(False)
+
+    def memory_usage(self, deep=True):
+        """Bytes used by this column's bitmaps."""
+        total = sys.getsizeof(self.bits)
+        if self._validity is not None:
+            total += sys.getsizeof(self._validity)
+        return total
+
+    def count(self, value=True):
+        """Count the rows which hold value (True, False or None)."""
+        if value is None:
+            return self.null_count
+        ones = self.bits.count()
+        return ones if value else len(self) - ones - self.null_count
+
+    def mask(self):
+        """A Bitmap of the rows which are True."""
+        return self.bits.copy()
+
+    def positions(self):
+        """Generator giving the position of each row which is True."""
+        return self.bits.positions()
+
+    def append(self, v):
+        if v is None:
+            if self._validity is None:
+                self._validity = Bitmap.filled(True, len(self.bits))
+            self._validity.append(False)
+        elif self._validity is not None:
+            self._validity.append(True)
+        self.bits.append(v)
+
+    def extend(self, values):
+        values = list(values)
+        if self._validity is None and None in values:
+            self._validity = Bitmap.filled(True, len(self.bits))
+        if self._validity is not None:
+            self._validity.extend(v is not None for v in values)
+        self.bits.extend(values)
+
+    def __len__(self):
+        return len(self.bits)
+
+    def __iter__(self):
+        if self._validity is None:
+            return iter(self.bits)
+        return (
+            b if valid else None
+            for b, valid in six.moves.zip(self.bits, self._validity)
+        )
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            if self._validity is None:
+                return self.bits[key]
+            return [
+                b if valid else None
+                for b, valid in six.moves.zip(self.bits[key], self._validity[key])
+            ]
+        if self._validity is not None and not self._validity[key]:
+            return None
+        return self.bits[key]
+
+    @staticmethod
+    def _as_bitmap(other):
+        return other.mask() if isinstance(other, BitColumn) else other
+
+    def __and__(self, other):
+        return self.bits & self._as_bitmap(other)
+
+    def __or__(self, other):
+        return self.bits | self._as_bitmap(other)
+
+    def __invert__(self):
+        inverse = ~self.bits
+        if self._validity is not None:
+            inverse = inverse & self._validity
+        return inverse
+
+    __rand__ = __and__
+    __ror__ = __or__
+
+
+class Categories(object):
+
+    """A dictionary of distinct values, each of which is given a
+    small integer code in the order in which it was first seen.
+
+    A Categories object may be shared by several CategoricalColumns,
+    in which case equal values have equal codes in all of them.
+    """
+
+    def __init__(self, values=()):
+        self.values = []
+        self.codes = {}
+        for v in values:
+            self.code(v)
+
+    def __len__(self):
+        return len(self.values)
+
+    def code(self, value):
+        """Get the code for value, adding it if it is new. The code
+        for None is always None."""
+        if value is None:
+            return None
+        try:
+            return self.codes[value]
+        except KeyError:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+            return code
+
+    def decode(self, code):
+        return None if code is None else self.values[code]
+
+    def memory_usage(self, deep=True):
+        """Bytes used by the dictionary, including the values if deep."""
+        return sizeof_list(self.values, deep) + sys.getsizeof(self.codes)
+
+
+class CategoricalColumn(TypedColumn):
+
+    """A dictionary-encoded column, suitable for columns with a small
+    number of distinct values.
+
+    Each value is stored as a small integer code in an ArrayColumn,
+    the distinct values themselves are held once in a Categories
+    object. The codes start out as 2 byte integers and are widened
+    automatically if the number of categories outgrows them.
+    """
+
+    storage = 'category'
+
+    def __init__(self, name, values=None, column_type=object, categories=None):
+        self.name = name
+        self.column_type = column_type
+        self.categories = Categories() if categories is None else categories
+        self.codes = ArrayColumn(name, column_type='H')
+        self.extend(values or [])
+
+    @property
+    def encoded(self):
+        """The codes of this column's values, position by position."""
+        return self.codes
+
+    def decode(self, code):
+        return self.categories.decode(code)
+
+    def memory_usage(self, deep=True):
+        """Bytes used by this column's codes and its categories,
+        including the distinct values if deep."""
+        return self.codes.memory_usage(deep) + self.categories.memory_usage(deep)
+
+    def _widen(self):
+        self.codes = ArrayColumn(self.name, list(self.codes), column_type='i')
+
+    def append(self, v):
+        code = self.categories.code(v)
+        try:
+            self.codes.append(code)
+        except OverflowError:
+            self._widen()
+            self.codes.append(code)
+
+    def extend(self, values):
+        codes = [self.categories.code(v) for v in values]
+        try:
+            self.codes.extend(codes)
+        except OverflowError:
+            self._widen()
+            self.codes.extend(codes)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __iter__(self):
+        if not self.codes.null_count:
+            return six.moves.map(self.categories.values.__getitem__, self.codes)
+        return six.moves.map(self.categories.decode, self.codes)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self.categories.decode(c) for c in self.codes[key]]
+        return self.categories.decode(self.codes[key])
+
+
+class RunLengthColumn(TypedColumn):
+
+    """A run-length encoded column, suitable for sorted or repetitive
+    data.
+
+    Consecutive equal values of the same type are stored once, together
+    with the position at which their run ends. Random access finds the
+    run with a binary search, so costs O(log runs).
+    """
+
+    storage = 'rle'
+
+    def __init__(self, name, values=None, column_type=object):
+        self.name = name
+        self.column_type = column_type
+        self.run_values = []
+        self.run_ends = array.array(INT64_TYPECODE)
+        self.extend(values or [])
+
+    @property
+    def run_count(self):
+        return len(self.run_values)
+
+    def memory_usage(self, deep=True):
+        """Bytes used by this column's runs, including their values
+        if deep."""
+        return sizeof_list(self.run_values, deep) + sys.getsizeof(self.run_ends)
+
+    def append(self, v):
+        if self.run_values:
+            last = self.run_values[-1]
+            if last is v or (type(last) is type(v) and last == v):
+                self.run_ends[-1] += 1
+                return
+        self.run_values.append(v)
+        self.run_ends.append(len(self) + 1)
+
+    def extend(self, values):
+        for v in values:
+            self.append(v)
+
+    def __len__(self):
+        return self.run_ends[-1] if self.run_ends else 0
+
+    def runs(self):
+        """Generator giving a (start, stop, value) triple for each run."""
+        start = 0
+        for stop, v in six.moves.zip(self.run_ends, self.run_values):
+            yield start, stop, v
+            start = stop
+
+    def run_at(self, i):
+        """Get the (start, stop, value) triple of the run containing
+        position i."""
+        if not 0 <= i < len(self):
+            raise IndexError('RunLengthColumn index out of range')
+        r = bisect.bisect_right(self.run_ends, i)
+        start = self.run_ends[r - 1] if r else 0
+        return start, self.run_ends[r], self.run_values[r]
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(
+            itertools.repeat(v, stop - start) for start, stop, v in self.runs()
+        )
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step > 0:
+                return list(itertools.islice(self, start, stop, step))
+            return [self[i] for i in six.moves.range(start, stop, step)]
+        if key < 0:
+            key += len(self)
+        return self.run_at(key)[2]
+
+
+class CompressedColumn(TypedColumn):
+
+    """A column for rarely read data, whose values are pickled and
+    compressed in blocks of BLOCK_SIZE rows.
+
+    New values are kept in an uncompressed tail until a whole block has
+    been collected. The most recently read blocks are kept decompressed
+    in a small LRU cache, so that reading nearby rows does not
+    decompress the same block again. Iterating over the column
+    decompresses each block once without disturbing the cache.
+    """
+
+    storage = 'compressed'
+
+    BLOCK_SIZE = 4096
+    CACHE_SIZE = 4
+    LEVEL = 6
+
+    def __init__(self, name, values=None, column_type=object):
+        self.name = name
+        self.column_type = column_type
+        self.blocks = []
+        self._tail = []
+        self._cache = collections.OrderedDict()
+        self.extend(values or [])
+
+    def _compress(self, data):
+        return zlib.compress(data, self.LEVEL)
+
+    def _decompress(self, data):
+        return zlib.decompress(data)
+
+    def memory_usage(self, deep=True):
+        """Bytes used by this column's compressed blocks, its
+        uncompressed tail and any cached blocks. The values in the tail
+        and the cache are only counted if deep."""
+        return (
+            sys.getsizeof(self.blocks) +
+            sum(sys.getsizeof(b) for b in self.blocks) +
+            sizeof_list(self._tail, deep) +
+            sum(sizeof_list(b, deep) for b in self._cache.values())
+        )
+
+    def clear_cache(self):
+        """Drop every decompressed block from the cache."""
+        self._cache.clear()
+
+    def _flush(self):
+        size = self.BLOCK_SIZE
+        tail = self._tail
+        full = len(tail) - len(tail) % size
+        for start in six.moves.range(0, full, size):
+            self.blocks.append(self._compress(
+                pickle.dumps(tail[start:start + size], pickle.HIGHEST_PROTOCOL)))
+        if full:
+            self._tail = tail[full:]
+
+    def _load(self, b):
+        return pickle.loads(self._decompress(self.blocks[b]))
+
+    def _block(self, b):
+        """Get the values of block b, through the cache."""
+        cache = self._cache
+        try:
+            values = cache.pop(b)
+        except KeyError:
+            values = self._load(b)
+            if len(cache) >= self.CACHE_SIZE:
+                cache.popitem(last=False)
+        cache[b] = values
+        return values
+
+    def append(self, v):
+        self._tail.append(v)
+        if len(self._tail) >= self.BLOCK_SIZE:
+            self._flush()
+
+    def extend(self, values):
+        self._tail.extend(values)
+        self._flush()
+
+    def __len__(self):
+        return len(self.blocks) * self.BLOCK_SIZE + len(self._tail)
+
+    def __iter__(self):
+        for b in six.moves.range(len(self.blocks)):
+            cached = self._cache.get(b)
+            for v in (self._load(b) if cached is None else cached):
+                yield v
+        for v in self._tail[:]:
+            yield v
+
+    def _range(self, start, stop):
+        size = self.BLOCK_SIZE
+        values = []
+        for b in six.moves.range(start // size, len(self.blocks)):
+            first = b * size
+            if first >= stop:
+                return values
+            values.extend(self._block(b)[max(start - first, 0):stop - first])
+        first = len(self.blocks) * size
+        values.extend(self._tail[max(start - first, 0):max(stop - first, 0)])
+        return values
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step == 1:
+                return self._range(start, stop)
+            return [self[i] for i in six.moves.range(start, stop, step)]
+        n = len(self)
+        if key < 0:
+            key += n
+        if not 0 <= key < n:
+            raise IndexError('CompressedColumn index out of range')
+        b, i = divmod(key, self.BLOCK_SIZE)
+        if b == len(self.blocks):
+            return self._tail[i]
+        return self._block(b)[i]
+
+
+class LzmaCompressedColumn(CompressedColumn):
+
+    """A CompressedColumn which uses lzma, which is slower than zlib
+    but usually compresses text further."""
+
+    storage = 'compressed:lzma'
+
+    def __init__(self, name, values=None, column_type=object):
+        if lzma is None:
+            raise ValueError('lzma compression is not available')
+        CompressedColumn.__init__(self, name, values, column_type)
+
+    def _compress(self, data):
+        return lzma.compress(data)
+
+    def _decompress(self, data):
+        return lzma.decompress(data)
+
 
 class StaticColumn(object):
 
@@ -113,7 +1307,18 @@ class DerivedColumn(object):
         self.func = func
         self.inputs = inputs
 
+    def __len__(self):
+        if not self.inputs:
+            raise TypeError('DerivedColumn %s has no inputs' % self.name)
+        return min(len(c) for c in self.inputs)
+
     def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            func = self.func
+            return [
+                func(*row)
+                for row in six.moves.zip(*(c[idx] for c in self.inputs))
+            ]
         row = tuple(c[idx] for c in self.inputs)
         return self.func(*row)
 
@@ -126,6 +1331,390 @@ class DerivedColumn(object):
         return describe_column(self.name, self.column_type)
 
 
+def _evaluate_rows(func, inputs):
+    """Call func on each row of a chunk of input columns. This runs in a
+    worker process, so it must be importable at module level."""
+    return [func(*row) for row in six.moves.zip(*inputs)]
+
+
+class ParallelColumn(DerivedColumn):
+
+    """A calculated column whose function is called in a pool of worker
+    processes, for functions which are expensive enough to be worth
+    spreading across several cores.
+
+    Reading the whole column, a slice of it, or the rows at a list of
+    positions (see values_at) splits the input values into chunks of
+    chunk_size rows which are evaluated by the workers and joined back
+    together in row order. Derived tables read the rows they show in
+    this way. Single rows, and anything no bigger than one chunk, are
+    calculated in this process.
+
+    The function and the input values are sent to the workers by
+    pickling, so the function must be defined at module level: a lambda
+    or a nested function cannot be used.
+
+    The pool of workers is started the first time it is needed and
+    then kept for the life of the column, so that reading the column
+    again doesn't start new processes. Call shutdown to stop it sooner.
+    """
+
+    CHUNK_SIZE = 10000
+
+    #: Tells derived tables to read many rows at once, with values_at.
+    parallel = True
+
+    def __init__(self, name, inputs, func, column_type=object,
+                 processes=None, chunk_size=None):
+        if futures is None:
+            raise ImportError('concurrent.futures is not available')
+        if not inputs:
+            raise ValueError('A parallel column needs at least one input')
+        try:
+            pickle.dumps(func)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            raise ValueError(
+                'The function for parallel column %s cannot be sent to '
+                'worker processes, define it at module level (%s)' % (name, e))
+        super(ParallelColumn, self).__init__(name, inputs, func, column_type)
+        self.processes = processes
+        self.chunk_size = chunk_size or self.CHUNK_SIZE
+        self._pool = None
+
+    def _workers(self):
+        if self._pool is None:
+            self._pool = futures.ProcessPoolExecutor(self.processes)
+        return self._pool
+
+    def shutdown(self):
+        """Stop the worker processes. They are started again if they are
+        needed."""
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+
+    def __del__(self):
+        pool = getattr(self, '_pool', None)
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    def _map(self, chunks):
+        """Call func on each chunk of input values, in the workers if
+        there is more than one chunk, and join the results in order."""
+        chunks = iter(chunks)
+        first = next(chunks, None)
+        if first is None:
+            return []
+        second = next(chunks, None)
+        if second is None:
+            return _evaluate_rows(self.func, first)
+        values = []
+        # map gives the results in the order of the chunks
+        for result in self._workers().map(
+                _evaluate_rows, itertools.repeat(self.func),
+                itertools.chain([first, second], chunks)):
+            values.extend(result)
+        return values
+
+    def _evaluate(self, start, stop):
+        size = self.chunk_size
+        return self._map(
+            [list(c[i:min(i + size, stop)]) for c in self.inputs]
+            for i in six.moves.range(start, stop, size)
+        )
+
+    def values_at(self, positions):
+        """The values of the rows at positions, in the same order."""
+        span = range_span(positions)
+        if span is not None:
+            return self._evaluate(*span)
+        if not is_sequence(positions):
+            positions = list(positions)
+        size = self.chunk_size
+        return self._map(
+            [[c[i] for i in positions[k:k + size]] for c in self.inputs]
+            for k in six.moves.range(0, len(positions), size)
+        )
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            start, stop, step = idx.indices(len(self))
+            if step == 1:
+                return self._evaluate(start, max(start, stop))
+        return super(ParallelColumn, self).__getitem__(idx)
+
+    def __iter__(self):
+        return iter(self._evaluate(0, len(self)))
+
+
+def _gather(column, positions):
+    """The values of column at positions, in an array if a slice of the
+    column would be one."""
+    values = [column[i] for i in positions]
+    if isinstance(column, array.array) and \
+            getattr(column, '_validity', None) is None:
+        return array.array(column.typecode, values)
+    return values
+
+
+class VectorizedColumn(object):
+
+    """A calculated column whose function is called with whole chunks
+    of its input columns, rather than once per row.
+
+    The function receives one sequence for each input column (arrays
+    for array-backed columns, lists otherwise, or NumPy arrays if
+    use_numpy is set) and must return a sequence of the same length.
+    The most recently read chunks are kept, so reading the rows of a
+    chunk one at a time, even alternating between a few chunks, only
+    calls the function once for each. Reading the rows at a list of
+    positions (see values_at) calls it with just those rows.
+    """
+
+    CHUNK_SIZE = 65536
+
+    #: The number of calculated chunks to keep.
+    CACHED_CHUNKS = 4
+
+    #: Tells derived tables to read many rows at once, with values_at.
+    parallel = True
+
+    def __init__(self, name, inputs, func, column_type=object,
+                 use_numpy=False, chunk_size=CHUNK_SIZE):
+        if not inputs:
+            raise ValueError('A vectorized column needs at least one input')
+        if use_numpy and numpy is None:
+            raise ImportError('NumPy is not installed')
+        self.name = name
+        self.column_type = column_type
+        self.func = func
+        self.inputs = inputs
+        self.use_numpy = use_numpy
+        self.chunk_size = chunk_size
+        self._chunk = None
+        self._chunks = collections.OrderedDict()
+
+    @property
+    def description(self):
+        return describe_column(self.name, self.column_type)
+
+    def __len__(self):
+        return min(len(c) for c in self.inputs)
+
+    def _call(self, args, n):
+        if self.use_numpy:
+            args = [numpy.asarray(a) for a in args]
+        values = self.func(*args)
+        if len(values) != n:
+            raise ValueError(
+                'Vectorized function for column %s returned %d values for '
+                '%d rows' % (self.name, len(values), n)
+            )
+        if hasattr(values, 'tolist'):  # Python values, not NumPy scalars
+            values = values.tolist()
+        return values
+
+    def _evaluate(self, start, stop):
+        return self._call([c[start:stop] for c in self.inputs], stop - start)
+
+    def _chunk_at(self, i):
+        size = self.chunk_size
+        start = i - i % size
+        chunks = self._chunks
+        values = chunks.pop(start, None)
+        # The last chunk is short, and the table may have grown since
+        if values is None or i - start >= len(values):
+            values = self._evaluate(start, min(start + size, len(self)))
+        chunks[start] = values
+        if len(chunks) > self.CACHED_CHUNKS:
+            chunks.popitem(last=False)
+        chunk = self._chunk = (start, values)
+        return chunk
+
+    def values_at(self, positions):
+        """The values of the rows at positions, in the same order."""
+        span = range_span(positions)
+        size = self.chunk_size
+        if span is not None:
+            start, stop = span
+            values = []
+            for i in six.moves.range(start, stop, size):
+                values.extend(self._evaluate(i, min(i + size, stop)))
+            return values
+        if not is_sequence(positions):
+            positions = list(positions)
+        values = []
+        for k in six.moves.range(0, len(positions), size):
+            rows = positions[k:k + size]
+            values.extend(self._call(
+                [_gather(c, rows) for c in self.inputs], len(rows)))
+        return values
+
+    def __getitem__(self, idx):
+        chunk = self._chunk
+        if chunk is not None and isinstance(idx, int):
+            start, values = chunk
+            if 0 <= idx - start < len(values):
+                return values[idx - start]
+        if isinstance(idx, slice):
+            return [self[i] for i in six.moves.range(*idx.indices(len(self)))]
+        n = len(self)
+        if idx < 0:
+            idx += n
+        if not 0 <= idx < n:
+            raise IndexError('VectorizedColumn index out of range')
+        start, values = self._chunk_at(idx)
+        return values[idx - start]
+
+    def __iter__(self):
+        n = len(self)
+        for start in six.moves.range(0, n, self.chunk_size):
+            for v in self._evaluate(start, min(start + self.chunk_size, n)):
+                yield v
+
+
+class CachedColumn(object):
+
+    """Remembers the values of a calculated column, so that its function
+    is only called once for each row.
+
+    Each row is calculated the first time it is read, so rows which are
+    never read, e.g. because a restriction has removed them, are never
+    calculated. Values are kept in a CompactColumn for int and float
+    columns, or a list otherwise, together with a bitmap of the rows
+    which have been calculated.
+
+    The column is one of its source table's listeners, and makes room
+    for rows as they are added to the table, without calculating them:
+    they are calculated when they are first read, like any other.
+    Tables are only ever appended to, so cached values never go stale.
+    Writing into a table's columns in place is not supported, and
+    values which have already been cached are not recalculated.
+    """
+
+    # The cached values belong to the view, not the table it is made from
+    owned_by_view = True
+
+    def __init__(self, column):
+        self._column = column
+        typ = column.column_type
+        if typ in CompactColumn.TYPECODES:
+            self.values = CompactColumn(column.name, column_type=typ)
+            self._placeholder = typ()
+        else:
+            self.values = Column(column.name, column_type=typ)
+            self._placeholder = None
+        self.known = Bitmap()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def name(self):
+        return self._column.name
+
+    @property
+    def column_type(self):
+        return self._column.column_type
+
+    @property
+    def description(self):
+        return self._column.description
+
+    def memory_usage(self, deep=True):
+        """Bytes used by the cached values."""
+        return self.values.memory_usage(deep) + sys.getsizeof(self.known)
+
+    def notify(self, op, pos):
+        """Receive a change notification from the source table, as
+        Index.notify."""
+        self._grow()
+
+    def _grow(self):
+        """Make room for rows added to the source table, which are not
+        yet calculated."""
+        n = len(self) - len(self.known)
+        if n > 0:
+            self.values.extend([self._placeholder] * n)
+            self.known.fill(False, n)
+
+    def _missing_runs(self):
+        """(start, stop) of each run of rows which are not yet cached."""
+        missing = (~self.known).positions()
+        for _, run in itertools.groupby(enumerate(missing), lambda p: p[1] - p[0]):
+            run = [i for _, i in run]
+            yield run[0], run[-1] + 1
+
+    @property
+    def parallel(self):
+        return getattr(self._column, 'parallel', False)
+
+    def fill(self, positions=None):
+        """Calculate and keep the rows at positions, or every row, which
+        are not yet cached. The rows are calculated together, so that a
+        parallel column can spread them across its workers."""
+        self._grow()
+        values, known = self.values, self.known
+        if positions is None or covers_column(positions, self):
+            for start, stop in list(self._missing_runs()):
+                for i, v in enumerate(self._column[start:stop], start):
+                    values[i] = v
+                    known[i] = True
+                self.misses += stop - start
+            return
+        missing = [i for i in positions if not known[i]]
+        if not missing:
+            return
+        calculate = getattr(self._column, 'values_at', None)
+        if calculate is None:
+            column = self._column
+            calculate = lambda rows: [column[i] for i in rows]
+        for i, v in six.moves.zip(missing, calculate(missing)):
+            values[i] = v
+            known[i] = True
+        self.misses += len(missing)
+
+    def values_at(self, positions):
+        """The values of the rows at positions, in the same order."""
+        if not is_sequence(positions):
+            positions = list(positions)
+        self._grow()
+        known = self.known
+        self.hits += sum(1 for i in positions if known[i])
+        self.fill(positions)
+        values = self.values
+        return [values[i] for i in positions]
+
+    def __len__(self):
+        return len(self._column)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in six.moves.range(*idx.indices(len(self)))]
+        known = self.known
+        if 0 <= idx < len(known) and known[idx]:
+            self.hits += 1
+            return self.values[idx]
+        n = len(self)
+        if idx < 0:
+            idx += n
+        if not 0 <= idx < n:
+            raise IndexError('CachedColumn index out of range')
+        self._grow()
+        if known[idx]:
+            self.hits += 1
+            return self.values[idx]
+        v = self.values[idx] = self._column[idx]
+        known[idx] = True
+        self.misses += 1
+        return v
+
+    def __iter__(self):
+        self._grow()
+        self.hits += self.known.count()
+        self.fill()
+        return iter(self.values)
+
+
 class AggregationColumn(object):
 
     def __init__(self):
@@ -135,7 +1724,13 @@ class AggregationColumn(object):
 class DerivedTableColumn(object):
 
     """Not so much a derived column, but a column on a
-    derived table"""
+    derived table.
+
+    Positional access and len use the table's row positions as a
+    sequence. Reading them all the first time makes the table keep
+    them (see DerivedTable.materialize_rows), so after that they take
+    constant time.
+    """
 
     def __init__(self, indices_func, column):
         self._indices_func = indices_func
@@ -153,21 +1748,45 @@ class DerivedTableColumn(object):
     def description(self):
         return self._column.description
 
+    @property
+    def storage(self):
+        return getattr(self._column, 'storage', 'object')
+
     def __iter__(self):
-        for i in self._indices_func():
-            yield self._column[i]
+        c = self._column
+        indices = self._indices_func()
+        if covers_column(indices, c):
+            return iter(c)
+        if getattr(c, 'parallel', False):
+            positions = self._positions()
+            if None not in positions:
+                return iter(c.values_at(positions))
+        return (
+            # i can be None (because of broken joins)
+            None if i is None else c[i] for i in indices
+        )
+
+    def _positions(self):
+        indices = self._indices_func()
+        return indices if is_sequence(indices) else list(indices)
 
     def __len__(self):
-        return len([None for _ in self._indices_func()])
+        indices = self._indices_func()
+        if is_sequence(indices):
+            return len(indices)
+        return sum(1 for _ in indices)
 
     def __getitem__(self, key):
-        if isinstance(key, int):
-            i = next(itertools.islice(
-                self._indices_func(),
-                key,
-                key + 1
-            ))
-            return None if i is None else self._column[i]
+        c = self._column
+        positions = self._positions()[key]
+        if not isinstance(key, slice):
+            return None if positions is None else c[positions]
+        span = range_span(positions)
+        if span is not None:
+            return list(c[span[0]:span[1]])
+        if getattr(c, 'parallel', False) and None not in positions:
+            return c.values_at(positions)
+        return [None if i is None else c[i] for i in positions]
 
 
 class JoinColumn(DerivedTableColumn):
@@ -204,9 +1823,9 @@ class NormalizedColumn(FunctionColumn):
         self._normal = normal
 
     def normalize_func(self):
-        col_max = max(self._column)
-        col_min = min(self._column)
-        col_range = col_max - col_min
+        stats = column_stats(self._column)
+        col_min = stats.min
+        col_range = stats.max - col_min
         return lambda x: self._normal * (x - col_min) / col_range
 
     def __iter__(self):
@@ -229,15 +1848,11 @@ class StandardizedColumn(FunctionColumn):
         self._column = column
         self._range = deviation
 
-    def _average(self):
-        return sum(self._column) / float(len(self._column))
-
-    def _standard_deviation(self):
-        average = self._average()
-        return (sum((a - average)**2 for a in self._column.__iter__()) / len(self._column)) ** 0.5
-
     def standardize_func(self):
-        return lambda x: self._range * (x - self._average()) / self._standard_deviation()
+        stats = column_stats(self._column)
+        average = stats.mean
+        deviation = stats.stddev
+        return lambda x: self._range * (x - average) / deviation
 
     def __iter__(self):
         return six.moves.map(self.standardize_func(), self._column.__iter__())
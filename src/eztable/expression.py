@@ -0,0 +1,490 @@
+"""Column expressions, which can be used in place of a list of column
+names and a function in Table.expand and Table.restrict::
+
+    >>> from eztable.expression import col
+    >>> strong = pokedex.restrict(col('Level') * 2 > col('Limit'))
+    >>> pokedex.expand('Double', col('Level') * 2, col_type=int)
+
+Unlike a lambda, an expression knows which columns it uses, and is
+compiled into Python code which reads those columns directly, without
+building a tuple of arguments for every row.
+
+Operators work as they do in Python, except that &, | and ~ stand for
+and, or and not, since those cannot be overloaded. Comparisons bind
+less tightly than & and |, so they need brackets:
+(col('A') > 1) & (col('B') < 2).
+"""
+from __future__ import division
+
+import abc
+import decimal
+import itertools
+import six
+
+from .columns import describe_column, range_span
+
+_COMPILE_FLAGS = division.compiler_flag
+
+
+@six.add_metaclass(abc.ABCMeta)
+class Expression(object):
+
+    """Base class for column expressions."""
+
+    def __bool__(self):
+        raise TypeError(
+            'Expressions have no truth value, use & | ~ '
+            'rather than and, or, not.'
+        )
+
+    __nonzero__ = __bool__
+    __hash__ = None
+
+    @property
+    def columns(self):
+        """The names of the columns used by this expression, in the
+        order in which they first appear."""
+        names = []
+        self._collect_columns(names)
+        return names
+
+    def _collect_columns(self, names):
+        pass
+
+    def rename(self, mapping):
+        """A copy of this expression in which each column is replaced
+        by the column which mapping gives for its name."""
+        return self
+
+    @abc.abstractmethod
+    def source(self, ref, constants, vector=False):
+        """Get Python source code for this expression.
+
+        :param ref: Function giving the source for a column, given its
+                    name.
+        :param constants: List to which literal values are added, to be
+                          referred to as _k0, _k1, ...
+        :param vector: If True, generate code for NumPy arrays, which
+                       uses &, | and ~ for and, or and not.
+        """
+
+    def compile(self, kind):
+        """Compile this expression into the source of a function of the
+        given kind (see TEMPLATES), and return (code, constants).
+
+        Compiled code is remembered, so each kind is only compiled once.
+        """
+        cache = self.__dict__.setdefault('_compiled', {})
+        try:
+            return cache[kind]
+        except KeyError:
+            pass
+        columns = self.columns
+        if not columns:
+            raise ValueError('%r does not use any columns' % self)
+        positions = dict((name, k) for k, name in enumerate(columns))
+        template, ref, vector = TEMPLATES[kind]
+        constants = []
+        body = self.source(
+            lambda name: ref % {'k': positions[name]}, constants, vector=vector)
+
+        def names(prefix):
+            return ', '.join('%s%d' % (prefix, k) for k in range(len(columns)))
+
+        def loop(prefix):
+            # What to iterate over to get every row's values
+            return names(prefix) if len(columns) == 1 else '_zip(%s)' % names(prefix)
+        src = template % {
+            'body': body,
+            'values': names('_v'),
+            'columns': names('_c'),
+            'args': names('_a'),
+            'inputs': loop('_c'),
+            'chunks': loop('_a'),
+        }
+        code = compile(src, '<expression>', 'eval', _COMPILE_FLAGS, True)
+        cache[kind] = code, constants
+        return code, constants
+
+    def bind(self, kind, columns):
+        """Get a function of the given kind which reads from columns,
+        which must be in the order given by self.columns."""
+        code, constants = self.compile(kind)
+        namespace = {'_zip': six.moves.zip, '_count': itertools.count}
+        namespace.update(('_c%d' % k, c) for k, c in enumerate(columns))
+        namespace.update(('_k%d' % k, v) for k, v in enumerate(constants))
+        return eval(code, namespace)
+
+    def apply(self, fn):
+        """An expression which calls fn with the value of this one."""
+        return Call(fn, [self])
+
+    def is_none(self):
+        """An expression which is True where this one is None."""
+        return IsNone(self)
+
+    def __add__(self, other):
+        return BinaryOp('+', self, other)
+
+    def __radd__(self, other):
+        return BinaryOp('+', other, self)
+
+    def __sub__(self, other):
+        return BinaryOp('-', self, other)
+
+    def __rsub__(self, other):
+        return BinaryOp('-', other, self)
+
+    def __mul__(self, other):
+        return BinaryOp('*', self, other)
+
+    def __rmul__(self, other):
+        return BinaryOp('*', other, self)
+
+    def __truediv__(self, other):
+        return BinaryOp('/', self, other)
+
+    def __rtruediv__(self, other):
+        return BinaryOp('/', other, self)
+
+    __div__ = __truediv__
+    __rdiv__ = __rtruediv__
+
+    def __floordiv__(self, other):
+        return BinaryOp('//', self, other)
+
+    def __rfloordiv__(self, other):
+        return BinaryOp('//', other, self)
+
+    def __mod__(self, other):
+        return BinaryOp('%', self, other)
+
+    def __rmod__(self, other):
+        return BinaryOp('%', other, self)
+
+    def __pow__(self, other):
+        return BinaryOp('**', self, other)
+
+    def __rpow__(self, other):
+        return BinaryOp('**', other, self)
+
+    def __eq__(self, other):
+        return BinaryOp('==', self, other)
+
+    def __ne__(self, other):
+        return BinaryOp('!=', self, other)
+
+    def __lt__(self, other):
+        return BinaryOp('<', self, other)
+
+    def __le__(self, other):
+        return BinaryOp('<=', self, other)
+
+    def __gt__(self, other):
+        return BinaryOp('>', self, other)
+
+    def __ge__(self, other):
+        return BinaryOp('>=', self, other)
+
+    def __and__(self, other):
+        return Logical('and', self, other)
+
+    def __rand__(self, other):
+        return Logical('and', other, self)
+
+    def __or__(self, other):
+        return Logical('or', self, other)
+
+    def __ror__(self, other):
+        return Logical('or', other, self)
+
+    def __invert__(self):
+        return Not(self)
+
+    def __neg__(self):
+        return Negate(self)
+
+    def __abs__(self):
+        return Call(abs, [self])
+
+    def __repr__(self):
+        constants = []
+        src = self.source(str, constants)
+        for k, v in reversed(list(enumerate(constants))):
+            src = src.replace('_k%d' % k, repr(v))
+        return '<%s %s>' % (self.__class__.__name__, src)
+
+
+def as_expression(value):
+    """Wrap a value in a Literal, unless it is already an expression."""
+    return value if isinstance(value, Expression) else Literal(value)
+
+
+class Col(Expression):
+
+    """The value of a column."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def _collect_columns(self, names):
+        if self.name not in names:
+            names.append(self.name)
+
+    def rename(self, mapping):
+        return Col(mapping[self.name])
+
+    def source(self, ref, constants, vector=False):
+        return ref(self.name)
+
+
+class Literal(Expression):
+
+    """A constant value."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def source(self, ref, constants, vector=False):
+        constants.append(self.value)
+        return '_k%d' % (len(constants) - 1)
+
+
+class BinaryOp(Expression):
+
+    """An arithmetic operator or comparison."""
+
+    def __init__(self, op, left, right):
+        self.op = op
+        self.left = as_expression(left)
+        self.right = as_expression(right)
+
+    def _collect_columns(self, names):
+        self.left._collect_columns(names)
+        self.right._collect_columns(names)
+
+    def rename(self, mapping):
+        return self.__class__(
+            self.op, self.left.rename(mapping), self.right.rename(mapping))
+
+    def source(self, ref, constants, vector=False):
+        return '(%s %s %s)' % (
+            self.left.source(ref, constants, vector),
+            self.op,
+            self.right.source(ref, constants, vector),
+        )
+
+
+class Logical(BinaryOp):
+
+    """and, or: these are &, | for NumPy arrays."""
+
+    VECTOR_OPS = {'and': '&', 'or': '|'}
+
+    def source(self, ref, constants, vector=False):
+        return '(%s %s %s)' % (
+            self.left.source(ref, constants, vector),
+            self.VECTOR_OPS[self.op] if vector else self.op,
+            self.right.source(ref, constants, vector),
+        )
+
+
+class UnaryOp(Expression):
+
+    """An operator which takes the value of one other expression."""
+
+    def __init__(self, operand):
+        self.operand = as_expression(operand)
+
+    def _collect_columns(self, names):
+        self.operand._collect_columns(names)
+
+    def rename(self, mapping):
+        return self.__class__(self.operand.rename(mapping))
+
+
+class Not(UnaryOp):
+
+    def source(self, ref, constants, vector=False):
+        return '(%s%s)' % (
+            '~' if vector else 'not ',
+            self.operand.source(ref, constants, vector))
+
+
+class Negate(UnaryOp):
+
+    def source(self, ref, constants, vector=False):
+        return '(-%s)' % self.operand.source(ref, constants, vector)
+
+
+class IsNone(UnaryOp):
+
+    def source(self, ref, constants, vector=False):
+        return '(%s %s None)' % (
+            self.operand.source(ref, constants, vector),
+            '==' if vector else 'is')
+
+
+class Call(Expression):
+
+    """A call to a function with the values of other expressions."""
+
+    def __init__(self, fn, args):
+        self.fn = fn
+        self.args = [as_expression(a) for a in args]
+
+    def _collect_columns(self, names):
+        for a in self.args:
+            a._collect_columns(names)
+
+    def rename(self, mapping):
+        return Call(self.fn, [a.rename(mapping) for a in self.args])
+
+    def source(self, ref, constants, vector=False):
+        fn = Literal(self.fn).source(ref, constants)
+        return '%s(%s)' % (
+            fn, ', '.join(a.source(ref, constants, vector) for a in self.args))
+
+
+def col(name):
+    """An expression giving the value of the named column."""
+    return Col(name)
+
+
+def lit(value):
+    """An expression giving a constant value."""
+    return Literal(value)
+
+
+# Templates for each kind of compiled function, with the source for a
+# reference to the k-th column, and whether to generate NumPy code.
+TEMPLATES = {
+    # The value in row _i
+    'row': ('lambda _i: %(body)s', '_c%(k)d[_i]', False),
+    # Every value, in order
+    'iter': (
+        'lambda: (%(body)s for %(values)s in %(inputs)s)', '_v%(k)d', False),
+    # The positions in _indices for which the expression is true
+    'filter': (
+        'lambda _indices: (_i for _i in _indices if %(body)s)',
+        '_c%(k)d[_i]', False),
+    # The position of every row for which the expression is true
+    'scan': (
+        'lambda: (_i for _i, %(values)s in _zip(_count(), %(columns)s) if %(body)s)',
+        '_v%(k)d', False),
+    # A list of the values for whole chunks of the columns
+    'chunk': (
+        'lambda %(args)s: [%(body)s for %(values)s in %(chunks)s]',
+        '_v%(k)d', False),
+    # The values for whole chunks of the columns, as NumPy arrays
+    'numpy': ('lambda %(values)s: %(body)s', '_v%(k)d', True),
+}
+
+
+class ExpressionColumn(object):
+
+    """A calculated column whose values are given by an expression."""
+
+    def __init__(self, name, expression, inputs, column_type=object):
+        if not inputs:
+            raise ValueError(
+                'Expression for column %s uses no columns' % name)
+        self.name = name
+        self.column_type = column_type
+        self.expression = expression
+        self.inputs = inputs
+        self._row = expression.bind('row', inputs)
+        self._iter = expression.bind('iter', inputs)
+        self._chunk = expression.bind('chunk', inputs)
+
+    @property
+    def description(self):
+        return describe_column(self.name, self.column_type)
+
+    def __len__(self):
+        return min(len(c) for c in self.inputs)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return self._chunk(*[c[idx] for c in self.inputs])
+        return self._row(idx)
+
+    def __iter__(self):
+        return self._iter()
+
+
+def _fixed_kind(e, scales):
+    """('fixed', scale) if e gives fixed decimals as integers in units of
+    10 ** -scale when its columns are replaced by their stored integers,
+    ('int', 0) if it is an integer constant, otherwise None."""
+    if isinstance(e, Col):
+        scale = scales.get(e.name)
+        return None if scale is None else ('fixed', scale)
+    if isinstance(e, Literal):
+        v = e.value
+        if isinstance(v, six.integer_types) and not isinstance(v, bool):
+            return 'int', 0
+        return None
+    if type(e) is Negate:
+        return _fixed_kind(e.operand, scales)
+    if type(e) is BinaryOp and e.op in ('+', '-', '*'):
+        left = _fixed_kind(e.left, scales)
+        right = _fixed_kind(e.right, scales)
+        if left is None or right is None:
+            return None
+        if e.op == '*':
+            # Scales add up when stored integers are multiplied
+            kind = 'fixed' if 'fixed' in (left[0], right[0]) else 'int'
+            return kind, left[1] + right[1]
+        return left if left == right else None
+    return None
+
+
+def fixed_scale(expression, scales):
+    """The scale of the result of expression, if it can be calculated
+    exactly from the integers stored in fixed decimal columns, which
+    is when it only adds and subtracts columns of the same scale,
+    negates them, and multiplies them by each other or by integers.
+    Otherwise None.
+
+    :param scales: The scale of each fixed decimal column, by name.
+    """
+    kind = _fixed_kind(expression, scales)
+    return kind[1] if kind is not None and kind[0] == 'fixed' else None
+
+
+class FixedExpressionColumn(ExpressionColumn):
+
+    """A calculated column whose expression (see fixed_scale) is
+    evaluated on the integers stored in fixed decimal columns, so that
+    it runs at integer speed and stays exact. Values are converted into
+    Decimals as they are read, and sums add up the integers."""
+
+    def __init__(self, name, expression, inputs, scale,
+                 column_type=decimal.Decimal):
+        super(FixedExpressionColumn, self).__init__(
+            name, expression, [c.encoded for c in inputs], column_type)
+        self.scale = scale
+
+    def decode(self, n):
+        """Convert a calculated integer into a Decimal."""
+        return None if n is None else decimal.Decimal(n).scaleb(-self.scale)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self.decode(n) for n in self._chunk(
+                *[c[idx] for c in self.inputs])]
+        return self.decode(self._row(idx))
+
+    def __iter__(self):
+        return six.moves.map(self.decode, self._iter())
+
+    def sum_rows(self, rows):
+        """The sum of the values in the given rows, ignoring missing
+        values, as a Decimal."""
+        span = range_span(rows)
+        if span is not None:
+            raw = self._chunk(*[c[span[0]:span[1]] for c in self.inputs])
+        else:
+            raw = six.moves.map(self._row, rows)
+        return self.decode(sum(n for n in raw if n is not None))
@@ -1,9 +1,14 @@
 """An index is an ordered list-like object implemented using a btree.blist.
 """
 
+import itertools
+import sys
 import bintrees
 import six.moves
 from .exceptions import InvalidIndex
+from .memory import sizeof_list
+from .bitmap import Bitmap, RunBitmap
+from .columns import range_span
 
 
 class Index(bintrees.RBTree):
@@ -22,13 +27,39 @@ class Index(bintrees.RBTree):
                     ', '.join(table.column_names)
                 ))
         self.table = table
+        self.nulls = {}
+        # Whether every row of the table is in the index. Rows added
+        # to the table are always indexed, but rows which it held
+        # before the index was made are only indexed by reindex.
+        self.complete = len(table) == 0
 
     def __hash__(self):
         return hash(c.name for c in self.cols)
 
     def notify(self, op, pos):
+        """Receive a change notification from the table.
+
+        op is either 'append', in which case pos is the position of
+        the new row, or 'extend', in which case pos is the range of
+        positions of a batch of new rows.
+        """
         if op == 'append':
-            value = tuple(c[pos] for c in self.cols) + (pos,)
+            self._add(tuple(c[pos] for c in self.cols), pos)
+        elif op == 'extend':
+            start, stop = range_span(pos)
+            rows = six.moves.zip(*(c[start:stop] for c in self.cols))
+            for p, value in six.moves.zip(pos, rows):
+                self._add(value, p)
+
+    def _add(self, value, pos):
+        """Record that the row at pos has key value.
+
+        Keys which contain None cannot be ordered alongside other
+        keys, so they are kept in the nulls dict rather than the tree.
+        """
+        if None in value:
+            self.nulls.setdefault(value, []).append(pos)
+        else:
             self.setdefault(value, []).append(pos)
 
     def __getitem__(self, key):
@@ -51,14 +82,233 @@ class Index(bintrees.RBTree):
         )
 
     def index(self, key):
+        if None in key:
+            return self.nulls[key]
         return bintrees.RBTree.__getitem__(self, key)
 
+    def prefix_positions(self, prefix):
+        """Generator giving the positions of the rows whose first
+        len(prefix) key values equal prefix, key by key.
+
+        A whole key is looked up directly, a shorter prefix walks the
+        tree from the first key which could match, so either takes
+        O(log n + k) time. Keys containing None are searched one by one.
+        """
+        prefix = tuple(prefix)
+        n = len(prefix)
+        if n == len(self.cols):
+            try:
+                positions = self.index(prefix)
+            except (KeyError, TypeError):
+                positions = ()
+            for p in positions:
+                yield p
+            return
+        if None not in prefix:
+            try:
+                for key, positions in self.iter_items(start_key=prefix):
+                    if key[:n] != prefix:
+                        break
+                    for p in positions:
+                        yield p
+            except TypeError:  # prefix can't be compared with the keys
+                pass
+        for key, positions in self.nulls.items():
+            if key[:n] == prefix:
+                for p in positions:
+                    yield p
+
+    def range_positions(self, lo=None, hi=None):
+        """Generator giving the positions of the rows whose value in the
+        first key column lies between lo and hi inclusive, in key order.
+        None means no limit, and missing values never match.
+        """
+        start = None if lo is None else (lo,)
+        for key, positions in self.iter_items(start_key=start):
+            if hi is not None and key[0] > hi:
+                break
+            for p in positions:
+                yield p
+        for key, positions in self.nulls.items():
+            v = key[0]
+            if v is not None and \
+                    (lo is None or lo <= v) and (hi is None or v <= hi):
+                for p in positions:
+                    yield p
+
+    @staticmethod
+    def _key(key):
+        return key if isinstance(key, tuple) else (key,)
+
+    def _iter_range(self, lo, hi, inclusive):
+        """(key, positions) for each key in the tree from lo to hi, in
+        order. Bounds shorter than a key are compared with the start
+        of the key."""
+        lo_inclusive, hi_inclusive = (
+            inclusive if isinstance(inclusive, tuple) else (inclusive,) * 2)
+        for key, positions in self.iter_items(start_key=lo):
+            if lo is not None and not lo_inclusive and \
+                    key[:len(lo)] == lo:
+                continue
+            if hi is not None:
+                head = key[:len(hi)]
+                if head > hi or not hi_inclusive and head == hi:
+                    break
+            yield key, positions
+
+    def _rows(self, description, positions):
+        return self.table._from_index(
+            [self], description, positions, sort=False)
+
+    def range(self, lo=None, hi=None, inclusive=True, reverse=False):
+        """A lazy DerivedTable of the rows whose keys lie between lo
+        and hi, in key order (rows with equal keys are in table order).
+
+        lo and hi are key tuples, or single values for the first key
+        column. A bound with fewer values than the key is compared with
+        the start of each key, so on an index of (Date, Time),
+        range(date1, date2) includes every time on date2. None means no
+        limit. Keys containing None are not ordered, so are never in a
+        range. Like index, only rows in the index are found, see
+        reindex.
+
+        :param lo: The lowest key, or None
+        :param hi: The highest key, or None
+        :param inclusive: Whether keys equal to the bounds match, either
+                          for both bounds or as a (lo, hi) pair.
+        :param reverse: If True, give the rows in descending key order.
+        """
+        lo = None if lo is None else self._key(lo)
+        hi = None if hi is None else self._key(hi)
+
+        def positions():
+            groups = self._iter_range(lo, hi, inclusive)
+            if reverse:
+                groups = reversed(list(groups))
+            for _, ps in groups:
+                for p in ps:
+                    yield p
+        return self._rows('range %r to %r' % (lo, hi), positions)
+
+    def prefix(self, prefix):
+        """A lazy DerivedTable of the rows whose first len(prefix) key
+        values equal prefix, in key order, followed by those whose keys
+        contain None.
+
+        :param prefix: A tuple of values, or a single value for the
+                       first key column.
+        """
+        prefix = self._key(prefix)
+        return self._rows(
+            'prefix %r' % (prefix,), lambda: self.prefix_positions(prefix))
+
+    def floor(self, key):
+        """A lazy DerivedTable of the rows with the greatest key which
+        is less than or equal to key. It is empty if there is none.
+
+        As for range and prefix, a key with fewer values than the index
+        is a prefix: the rows are those whose keys start with the
+        greatest such prefix which is less than or equal to it.
+        """
+        return self._nearest(self._key(key), 'floor')
+
+    def ceiling(self, key):
+        """A lazy DerivedTable of the rows with the least key which is
+        greater than or equal to key, or if key is shorter than the
+        index, whose keys start with the least such prefix. It is empty
+        if there is none."""
+        return self._nearest(self._key(key), 'ceiling')
+
+    def _nearest_prefix(self, key, name):
+        """The greatest (for floor) or least (for ceiling) start of a
+        key in the tree, as long as key, which is <= or >= key, or None.
+        key sorts before every longer key which starts with it."""
+        n = len(key)
+        try:
+            above = self.ceiling_key(key)[:n]
+        except KeyError:
+            above = None
+        if name == 'ceiling' or above == key:
+            return above
+        try:
+            return self.floor_key(key)[:n]
+        except KeyError:
+            return None
+
+    def _nearest(self, key, name):
+        if len(key) > len(self.cols):
+            raise InvalidIndex(
+                'Key %r is longer than the index on %s' % (key, self))
+        n = len(key)
+
+        def positions():
+            found = self._nearest_prefix(key, name)
+            if found is None:
+                return
+            for k, ps in self.iter_items(start_key=found):
+                if k[:n] != found:
+                    break
+                for p in ps:
+                    yield p
+        return self._rows('%s %r' % (name, key), positions)
+
     def reindex(self):
+        """Rebuild the index from every row of the table.
+
+        Rows are first grouped by key in a dict, so that each distinct
+        key is only inserted into the tree once. Dictionary-encoded
+        columns are grouped by their codes, which are decoded once
+        per group, and run-length encoded columns are grouped a whole
+        run at a time.
+        """
         del self[:]
-        for i, row in enumerate(six.moves.zip(*self.cols)):
-            self.setdefault(row, []).append(i)
+        self.nulls.clear()
+        self.complete = True
+        cols = self.cols
+        try:
+            if all(hasattr(c, 'run_at') for c in cols):
+                groups = self._group_runs()
+            else:
+                groups = self._group_rows()
+        except TypeError:  # Unhashable values, these can only go in the tree
+            for i, row in enumerate(six.moves.zip(*cols)):
+                self._add(row, i)
+            return self
+
+        decoders = [getattr(c, 'decode', None) for c in cols]
+        for key, positions in groups.items():
+            value = tuple(
+                v if d is None else d(v)
+                for d, v in six.moves.zip(decoders, key)
+            )
+            if None in value:
+                self.nulls[value] = positions
+            else:
+                self[value] = positions
         return self
 
+    def _group_rows(self):
+        groups = {}
+        keys = six.moves.zip(*(getattr(c, 'encoded', c) for c in self.cols))
+        for i, key in enumerate(keys):
+            groups.setdefault(key, []).append(i)
+        return groups
+
+    def _group_runs(self):
+        """Group rows by key a stretch at a time, where a stretch is a
+        set of rows in which no run-length encoded column changes value.
+        """
+        groups = {}
+        cols = self.cols
+        i, n = 0, len(cols[0])
+        while i < n:
+            runs = [c.run_at(i) for c in cols]
+            stop = min(r[1] for r in runs)
+            key = tuple(r[2] for r in runs)
+            groups.setdefault(key, []).extend(six.moves.range(i, stop))
+            i = stop
+        return groups
+
     def __str__(self):
         return ','.join(c.name for c in self.cols)
 
@@ -70,10 +320,166 @@ class Index(bintrees.RBTree):
                 str(self))
         )
 
+    def memory_usage(self, deep=True):
+        """Bytes used by this index: a tree node, a key tuple and a list
+        of row positions for each distinct key, counting the positions
+        themselves if deep. The values inside the keys belong to the
+        table's columns and are not counted.
+        """
+        root = getattr(self, '_root', None)
+        node = 0 if root is None else sys.getsizeof(root)
+        total = sys.getsizeof(self) + sys.getsizeof(self.nulls)
+        for key, positions in itertools.chain(self.items(), self.nulls.items()):
+            total += node + sys.getsizeof(key) + sizeof_list(positions, deep)
+        return total
+
     def unique_values(self):
-        return set(self)
+        return set(self).union(self.nulls)
 
     def _get_iterator_fn_for_value(self, value):
         """Get an iterator that gives the indeces of any value in the index
         """
-        return bintrees.RBTree.__getitem__(self, value).__iter__
+        return self.index(value).__iter__
+
+
+class BitmapIndex(object):
+
+    """An index which keeps a Bitmap of the rows holding each distinct
+    key, suited to columns with few distinct values.
+
+    The bitmaps for several keys, or from indexes on several columns,
+    can be combined with & | and ~ to answer compound conditions
+    without looking at any rows, see Table.restrict. Bitmaps are only
+    padded to the length of the table when they are read, so adding a
+    row only touches the bitmap for its own key.
+
+    Each key's rows are kept run-length compressed in a RunBitmap, so
+    a key whose rows are clustered takes a few bytes however long the
+    table is. A key whose rows are scattered is kept in a plain Bitmap
+    instead, once its runs would take more room than that.
+    """
+
+    # Runs are kept while they fit in this many bytes, however short
+    # the table, so that the first rows don't decide for the rest.
+    MIN_RUN_BYTES = 256
+
+    def __init__(self, table, cols):
+        if not cols:
+            raise InvalidIndex('Please provide at least one column to index.')
+
+        try:
+            self.cols = [table._get_column(c) for c in cols]
+        except KeyError as ke:
+            raise InvalidIndex(
+                'Column %s does not exist. Valid columns are %s' % (
+                    ke.args[0],
+                    ', '.join(table.column_names)
+                ))
+        self.table = table
+        self.bitmaps = {}
+        self.complete = len(table) == 0
+
+    def __len__(self):
+        return len(self.bitmaps)
+
+    def notify(self, op, pos):
+        """Receive a change notification from the table, as Index.notify.
+        """
+        if op == 'append':
+            self._add(tuple(c[pos] for c in self.cols), pos)
+        elif op == 'extend':
+            start, stop = range_span(pos)
+            rows = six.moves.zip(*(c[start:stop] for c in self.cols))
+            for p, value in six.moves.zip(pos, rows):
+                self._add(value, p)
+
+    def _add(self, key, pos):
+        bitmap = self.bitmaps.get(key)
+        if bitmap is None:
+            bitmap = self.bitmaps[key] = RunBitmap()
+        bitmap.fill(False, pos - len(bitmap))
+        bitmap.append(True)
+        if isinstance(bitmap, RunBitmap) and not self._small(bitmap):
+            self.bitmaps[key] = bitmap.bitmap()
+
+    def _small(self, runs):
+        """True if a RunBitmap is worth keeping over a Bitmap."""
+        return runs.nbytes <= max(len(runs) >> 3, self.MIN_RUN_BYTES)
+
+    def reindex(self):
+        """Rebuild the index from every row of the table."""
+        self.bitmaps.clear()
+        self.complete = True
+        cols = self.cols
+        keys = six.moves.zip(*(getattr(c, 'encoded', c) for c in cols))
+        groups = {}
+        for i, key in enumerate(keys):
+            groups.setdefault(key, []).append(i)
+        decoders = [getattr(c, 'decode', None) for c in cols]
+        n = len(self.table)
+        for key, positions in groups.items():
+            value = tuple(
+                v if d is None else d(v)
+                for d, v in six.moves.zip(decoders, key)
+            )
+            bitmap = RunBitmap.from_positions(positions, n)
+            if not self._small(bitmap):
+                bitmap = Bitmap.from_positions(positions, n)
+            self.bitmaps[value] = bitmap
+        return self
+
+    def bitmap(self, key):
+        """A Bitmap with a bit for each row of the table, which is set
+        if the row has the given key. key is a tuple of values, or a
+        single value if the index has one column."""
+        if not isinstance(key, tuple):
+            key = (key,)
+        n = len(self.table)
+        try:
+            bitmap = self.bitmaps[key]
+        except (KeyError, TypeError):  # TypeError: unhashable
+            return Bitmap.filled(False, n)
+        bitmap.fill(False, n - len(bitmap))
+        if isinstance(bitmap, RunBitmap):
+            return bitmap.bitmap()
+        return bitmap.copy()
+
+    def any_of(self, keys):
+        """A Bitmap of the rows which have any of the given keys."""
+        result = Bitmap.filled(False, len(self.table))
+        for key in keys:
+            result |= self.bitmap(key)
+        return result
+
+    def index(self, key):
+        """The positions of the rows with the given key."""
+        if not isinstance(key, tuple):
+            key = (key,)
+        try:
+            bitmap = self.bitmaps[key]
+        except (KeyError, TypeError):
+            return []
+        return list(bitmap.positions())
+
+    def unique_values(self):
+        return set(self.bitmaps)
+
+    def __str__(self):
+        return '%s (bitmap)' % ','.join(c.name for c in self.cols)
+
+    def __repr__(self):
+        return (
+            '<%s.%s %s>' % (
+                self.__class__.__module__,
+                self.__class__.__name__,
+                str(self))
+        )
+
+    def memory_usage(self, deep=True):
+        """Bytes used by this index: a key tuple and a compressed or
+        plain bitmap for each distinct key. The values inside the keys
+        belong to the table's columns and are not counted."""
+        total = sys.getsizeof(self) + sys.getsizeof(self.bitmaps)
+        for key, bitmap in self.bitmaps.items():
+            total += sys.getsizeof(key) + sys.getsizeof(bitmap)
+        return total
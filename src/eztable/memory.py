@@ -0,0 +1,59 @@
+"""Helpers for measuring the memory used by tables, columns and indexes.
+
+All sizes are in bytes, as reported by sys.getsizeof. Shallow sizes
+count only the containers themselves (e.g. a list's array of pointers),
+deep sizes also count each distinct object that they refer to.
+"""
+
+import sys
+
+
+def sizeof_objects(values):
+    """The total size of the distinct objects in values. An object
+    which appears many times is only counted once."""
+    seen = set()
+    total = 0
+    for v in values:
+        i = id(v)
+        if i not in seen:
+            seen.add(i)
+            total += sys.getsizeof(v)
+    return total
+
+
+def sizeof_list(values, deep=True):
+    """The size of a list, optionally including its contents."""
+    total = sys.getsizeof(values)
+    if deep:
+        total += sizeof_objects(values)
+    return total
+
+
+def sizeof_column(column, deep=True):
+    """The size of any column. Stored columns measure themselves,
+    columns which wrap another column report the wrapped column
+    and anything else is measured as a single object."""
+    try:
+        return column.memory_usage(deep)
+    except AttributeError:
+        pass
+    try:
+        return sizeof_column(column._column, deep)
+    except AttributeError:
+        return sys.getsizeof(column)
+
+
+def is_stored(column):
+    """True if column holds data of its own, or is a view on one which
+    does, unless the data belongs to the view (e.g. a cache)."""
+    if getattr(column, 'owned_by_view', False):
+        return False
+    return (
+        hasattr(column, 'memory_usage') or
+        hasattr(getattr(column, '_column', None), 'memory_usage')
+    )
+
+
+def sizeof_row(row):
+    """The size of a single TableRow object."""
+    return sys.getsizeof(row) + sys.getsizeof(row.__dict__)
@@ -0,0 +1,412 @@
+"""Logical plans for the rows of derived tables.
+
+Each restriction or slice of a table records a plan node which says
+how to find its rows from the rows of the table it was made from.
+Nodes are optimized as they are built: a restriction of a restriction
+becomes a single filter over the rows beneath them both, whose tests,
+functions and expressions alike, are compiled into a single loop. A
+slice of a slice becomes a single slice. Projections, renames and new columns
+don't change which rows a table has, so they pass their source's plan
+straight through.
+
+When a plan runs, any table in it whose rows have already been kept
+(see DerivedTable.materialize_rows) is read rather than re-evaluated.
+"""
+import abc
+import array
+import itertools
+import six
+
+from .columns import covers_column, is_sequence, INT64_TYPECODE
+from .expression import Call, Col, Literal, BinaryOp, Logical, Not, IsNone
+
+
+class ExpressionPredicate(object):
+
+    """Keeps rows for which an expression is True. columns are the
+    columns which the expression reads, in the order it uses them."""
+
+    def __init__(self, expression, columns):
+        self.expression = expression
+        self.columns = columns
+
+    def __repr__(self):
+        return repr(self.expression)[1:-1].split(' ', 1)[1]
+
+
+class FunctionPredicate(ExpressionPredicate):
+
+    """Keeps rows for which fn returns True, given values from the
+    named columns. This is the expression fn(*columns), so that it can
+    be compiled together with other predicates."""
+
+    def __init__(self, names, columns, fn):
+        by_name = dict(six.moves.zip(names, columns))
+        expression = Call(fn, [Col(n) for n in names])
+        super(FunctionPredicate, self).__init__(
+            expression, [by_name[n] for n in expression.columns])
+        self.names = list(names)
+        self.fn = fn
+
+    def __repr__(self):
+        return '%s(%s)' % (
+            getattr(self.fn, '__name__', 'fn'), ', '.join(self.names))
+
+
+def _compile_predicates(predicates):
+    """Compile predicates, which may read columns from different tables
+    under different names, into a single test in which each is
+    evaluated in turn, and only while the earlier ones are True.
+
+    Returns the scan and filter functions, as from Expression.bind,
+    and the first column which they read."""
+    columns, names = [], {}
+    combined = None
+    for p in predicates:
+        mapping = {}
+        for name, c in six.moves.zip(p.expression.columns, p.columns):
+            if id(c) not in names:
+                names[id(c)] = '_%d' % len(columns)
+                columns.append(c)
+            mapping[name] = names[id(c)]
+        e = p.expression.rename(mapping)
+        combined = e if combined is None else combined & e
+    # bind wants the columns in the order the expression uses them
+    by_name = dict((names[id(c)], c) for c in columns)
+    columns = [by_name[n] for n in combined.columns]
+    return (
+        combined.bind('scan', columns),
+        combined.bind('filter', columns),
+        columns[0]
+    )
+
+
+def conjuncts(expression):
+    """The expressions which are joined by & to make expression."""
+    if isinstance(expression, Logical) and expression.op == 'and':
+        return conjuncts(expression.left) + conjuncts(expression.right)
+    return [expression]
+
+
+def bitmap_condition(expression, indexes):
+    """Get a function which gives a Bitmap of the rows for which
+    expression is True, using bitmap indexes, or None if expression
+    isn't made up of tests for equality on indexed columns.
+
+    :param indexes: Single-column BitmapIndexes, by column name.
+    """
+    e = expression
+    if isinstance(e, IsNone) and isinstance(e.operand, Col) and \
+            e.operand.name in indexes:
+        index = indexes[e.operand.name]
+        return lambda: index.bitmap(None)
+    if type(e) is Not:
+        f = bitmap_condition(e.operand, indexes)
+        return f and (lambda: ~f())
+    if isinstance(e, Logical):
+        f = bitmap_condition(e.left, indexes)
+        g = bitmap_condition(e.right, indexes)
+        if f is None or g is None:
+            return None
+        if e.op == 'and':
+            return lambda: f() & g()
+        return lambda: f() | g()
+    if isinstance(e, BinaryOp) and e.op in ('==', '!='):
+        column, value = e.left, e.right
+        if isinstance(column, Literal):
+            column, value = value, column
+        if isinstance(column, Col) and isinstance(value, Literal) and \
+                column.name in indexes:
+            index, v = indexes[column.name], value.value
+            if e.op == '==':
+                return lambda: index.bitmap(v)
+            return lambda: ~index.bitmap(v)
+    return None
+
+
+@six.add_metaclass(abc.ABCMeta)
+class PlanNode(object):
+
+    """How to find the rows of a table. The positions which indices
+    gives are the ones which the table's columns are indexed by."""
+
+    @abc.abstractmethod
+    def indices(self):
+        """The positions of the table's rows."""
+
+    @abc.abstractmethod
+    def explain(self, depth=0):
+        """Lines describing this node and its inputs."""
+
+    def _line(self, depth, text):
+        return '  ' * depth + text
+
+    def _kept_line(self, depth, kept):
+        name = self.table.__class__.__name__
+        if isinstance(kept, six.moves.range):
+            return self._line(depth, 'Scan %s' % name)
+        return self._line(depth, 'Kept rows of %s' % name)
+
+
+class Scan(PlanNode):
+
+    """All of a table's rows, as its own _indices_func gives them."""
+
+    def __init__(self, table):
+        self.table = table
+
+    def indices(self):
+        return self.table._indices_func()
+
+    def explain(self, depth=0):
+        return [self._line(depth, 'Scan %s' % self.table.__class__.__name__)]
+
+
+class IndexLookup(PlanNode):
+
+    """The rows at the positions which one or more indexes find. They
+    are sorted into table order, unless sort is False, in which case
+    they are kept in the order given, e.g. the order of the keys."""
+
+    def __init__(self, table, indexes, description, positions, sort=True):
+        self.table = table
+        self.indexes = indexes
+        self.description = description
+        self.positions = positions
+        self.sort = sort
+
+    def indices(self):
+        if self.sort:
+            return sorted(self.positions())
+        return list(self.positions())
+
+    def explain(self, depth=0):
+        return [self._line(depth, 'Index %s on %s' % (
+            self.description, ', '.join(str(i) for i in self.indexes)))]
+
+
+class Sort(PlanNode):
+
+    """The rows of table, sorted by the values of some of its columns.
+
+    The order is kept as an array of positions until the table
+    changes. Rows with None in any sort column come last, and rows with
+    equal keys stay in table order. If index is given, which must be a
+    complete index on exactly the sort columns, the order is read from
+    it rather than sorted, if it has few enough distinct keys for
+    walking the tree to beat sorting.
+    """
+
+    #: Use the index if it has at most this many keys per row.
+    INDEX_KEYS_PER_ROW = 0.25
+
+    def __init__(self, table, names, columns, reverse=False, key=None,
+                 index=None):
+        self.table = table
+        self.names = names
+        self.columns = columns
+        self.reverse = reverse
+        self.key = key
+        self.index = index
+        self._order = None
+
+    def indices(self):
+        version = self.table._version()
+        if self._order is not None and self._order[0] == version and \
+                version is not None:
+            return self._order[1]
+        if self._use_index():
+            order = self._from_index()
+        else:
+            order = self._sort()
+        self._order = version, order
+        return order
+
+    def _use_index(self):
+        index = self.index
+        return index is not None and \
+            len(index) <= len(index.table) * self.INDEX_KEYS_PER_ROW
+
+    def _from_index(self):
+        index = self.index
+        groups = index.values()
+        if self.reverse:
+            groups = reversed(list(groups))
+        order = array.array(INT64_TYPECODE)
+        for positions in groups:
+            order.extend(positions)
+        order.extend(sorted(itertools.chain(*index.nulls.values())))
+        return order
+
+    def _sort(self):
+        indices = self.table._indices_func()
+        if not is_sequence(indices):
+            indices = list(indices)
+        columns = self.columns
+        values = [
+            list(c) if covers_column(indices, c) else [c[i] for i in indices]
+            for c in columns
+        ]
+        if self.key is not None:
+            key = self.key
+            keys = [key(*v) for v in six.moves.zip(*values)]
+            absent = []
+        elif len(values) == 1:
+            keys = values[0]
+            absent = [k for k, v in enumerate(keys) if v is None]
+        else:
+            keys = list(six.moves.zip(*values))
+            absent = [k for k, v in enumerate(keys) if None in v]
+        present = six.moves.range(len(keys))
+        if absent:
+            skip = set(absent)
+            present = [k for k in present if k not in skip]
+        present = sorted(present, key=keys.__getitem__, reverse=self.reverse)
+        return array.array(
+            INT64_TYPECODE, [indices[k] for k in itertools.chain(present, absent)])
+
+    def explain(self, depth=0):
+        use_index = self._use_index()
+        text = 'Sort by %s%s%s' % (
+            ', '.join(self.names),
+            ' descending' if self.reverse else '',
+            ' using index %s' % self.index if use_index else '',
+        )
+        kept = self.table._kept_indices()
+        if use_index:
+            return [self._line(depth, text)]
+        if kept is not None:
+            return [self._line(depth, text), self._kept_line(depth + 1, kept)]
+        return [self._line(depth, text)] + \
+            self.table._row_plan().explain(depth + 1)
+
+
+class Filter(PlanNode):
+
+    """The rows of table which pass predicates.
+
+    If table's rows are kept they are filtered directly, otherwise the
+    predicates are applied together with any beneath them, in order, to
+    the rows of the nearest table which isn't itself a filter.
+    """
+
+    def __init__(self, table, predicates, source, fused_predicates):
+        self.table = table
+        self.predicates = predicates
+        self.source = source
+        self.fused_predicates = fused_predicates
+        self._runs = {}
+
+    @classmethod
+    def over(cls, table, predicate):
+        """A node keeping the rows of table which pass predicate."""
+        below = table._row_plan()
+        if isinstance(below, Filter):
+            return cls(table, [predicate], below.source,
+                       below.fused_predicates + [predicate])
+        return cls(table, [predicate], below, [predicate])
+
+    def _run(self, fused):
+        """Get a function which filters indices by all of the
+        predicates, or just this node's own."""
+        try:
+            return self._runs[fused]
+        except KeyError:
+            pass
+        scan, filter_indices, first = _compile_predicates(
+            self.fused_predicates if fused else self.predicates)
+
+        def run(indices):
+            if covers_column(indices, first):
+                return scan()
+            return filter_indices(indices)
+        self._runs[fused] = run
+        return run
+
+    def indices(self):
+        kept = self.table._kept_indices()
+        if kept is not None:
+            return self._run(False)(kept)
+        return self._run(True)(self.source.indices())
+
+    def explain(self, depth=0):
+        kept = self.table._kept_indices()
+        if kept is not None:
+            return [
+                self._line(depth, 'Filter %s' % ', '.join(
+                    repr(p) for p in self.predicates)),
+                self._kept_line(depth + 1, kept),
+            ]
+        return [
+            self._line(depth, 'Filter %s' % ', '.join(
+                repr(p) for p in self.fused_predicates))
+        ] + self.source.explain(depth + 1)
+
+
+def _simple(key):
+    """True if a slice has no negative parts."""
+    return all(v is None or v >= 0 for v in (key.start, key.stop)) and \
+        (key.step is None or key.step > 0)
+
+
+def _compose(inner, outer):
+    """A single slice equivalent to slicing by inner and then outer."""
+    start1, step1 = inner.start or 0, inner.step or 1
+    start2, step2 = outer.start or 0, outer.step or 1
+    start = start1 + start2 * step1
+    stops = [s for s in (
+        inner.stop,
+        None if outer.stop is None else start1 + outer.stop * step1
+    ) if s is not None]
+    stop = min(stops) if stops else None
+    if stop is not None:
+        stop = max(stop, start)
+    step = step1 * step2
+    return slice(start, stop, None if step == 1 else step)
+
+
+class Slice(PlanNode):
+
+    """A slice of the rows of table."""
+
+    def __init__(self, table, key, source, fused_key):
+        self.table = table
+        self.key = key
+        self.source = source
+        self.fused_key = fused_key
+
+    @classmethod
+    def over(cls, table, key):
+        below = table._row_plan()
+        if isinstance(below, Slice) and _simple(below.fused_key) and \
+                _simple(key):
+            return cls(table, key, below.source,
+                       _compose(below.fused_key, key))
+        return cls(table, key, below, key)
+
+    @staticmethod
+    def _slice(indices, key):
+        if is_sequence(indices):
+            return indices[key]
+        if key.step and key.step < 0 or not _simple(key):
+            # islice doesn't support negative indices, convert to a list
+            return list(indices)[key]
+        return itertools.islice(indices, key.start, key.stop, key.step)
+
+    def indices(self):
+        kept = self.table._kept_indices()
+        if kept is not None:
+            return kept[self.key]
+        return self._slice(self.source.indices(), self.fused_key)
+
+    def explain(self, depth=0):
+        kept = self.table._kept_indices()
+        key = self.fused_key if kept is None else self.key
+        text = 'Slice %s:%s%s' % (
+            '' if key.start is None else key.start,
+            '' if key.stop is None else key.stop,
+            '' if key.step is None else ':%d' % key.step,
+        )
+        if kept is not None:
+            return [self._line(depth, text), self._kept_line(depth + 1, kept)]
+        return [self._line(depth, text)] + self.source.explain(depth + 1)
@@ -0,0 +1,164 @@
+"""Summary statistics for columns.
+"""
+from __future__ import division
+
+
+class ColumnStats(object):
+
+    """Running statistics over a sequence of values.
+
+    Missing values (None) are counted in null_count and otherwise
+    ignored. min and max are None if the values cannot be ordered;
+    sum, mean, variance and stddev are None if they are not numbers.
+
+    Values can be added in batches with update. The mean and variance
+    of each batch are merged into the running totals with the parallel
+    form of Welford's algorithm, which stays accurate over many batches.
+    """
+
+    def __init__(self, values=()):
+        self.count = 0
+        self.null_count = 0
+        self.min = None
+        self.max = None
+        self.sum = 0
+        self._mean = 0
+        self._m2 = 0
+        self._orderable = True
+        self._numeric = True
+        self.update(values)
+
+    def __repr__(self):
+        return (
+            '<%s count=%r null_count=%r min=%r max=%r mean=%r stddev=%r>' % (
+                self.__class__.__name__, self.count, self.null_count,
+                self.min, self.max, self.mean, self.stddev
+            )
+        )
+
+    @property
+    def rows(self):
+        """The number of values seen, including missing values."""
+        return self.count + self.null_count
+
+    @property
+    def mean(self):
+        if not self.count or not self._numeric:
+            return None
+        return self._mean
+
+    @property
+    def variance(self):
+        """The population variance of the values."""
+        if not self.count or not self._numeric:
+            return None
+        return self._m2 / self.count
+
+    @property
+    def stddev(self):
+        """The population standard deviation of the values."""
+        variance = self.variance
+        return None if variance is None else variance ** 0.5
+
+    def update(self, values):
+        """Add a batch of values to the statistics."""
+        values = list(values)
+        nulls = values.count(None)
+        if nulls:
+            self.null_count += nulls
+            values = [v for v in values if v is not None]
+        if not values:
+            return
+
+        if self._orderable:
+            self._update_range(values)
+        if self._numeric:
+            self._update_moments(values)
+        self.count += len(values)
+
+    def _update_range(self, values):
+        try:
+            lo, hi = min(values), max(values)
+            if self.count:
+                lo, hi = min(self.min, lo), max(self.max, hi)
+        except TypeError:
+            self._orderable = False
+            self.min = self.max = None
+        else:
+            self.min, self.max = lo, hi
+
+    def _update_moments(self, values):
+        n = len(values)
+        try:
+            total = sum(values)
+            mean = total / n
+            m2 = sum((v - mean) ** 2 for v in values)
+
+            count = self.count + n
+            delta = mean - self._mean
+            self._mean += delta * n / count
+            self._m2 += m2 + delta * delta * self.count * n / count
+            self.sum += total
+        except TypeError:
+            self._numeric = False
+            self.sum = None
+
+
+class ZoneMap(object):
+
+    """The minimum and maximum value of each complete fixed-size chunk
+    of a column. A chunk which holds only missing values has a minimum
+    and maximum of None.
+
+    Zone maps let range queries skip every chunk whose values all lie
+    outside the range.
+    """
+
+    CHUNK_SIZE = 4096
+
+    def __init__(self, chunk_size=CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.mins = []
+        self.maxs = []
+
+    def __len__(self):
+        return len(self.mins)
+
+    @property
+    def rows(self):
+        """The number of rows covered by complete chunks."""
+        return len(self.mins) * self.chunk_size
+
+    def add_chunk(self, values):
+        """Add the next chunk. Raises TypeError if the values cannot
+        be ordered."""
+        values = [v for v in values if v is not None]
+        if values:
+            self.mins.append(min(values))
+            self.maxs.append(max(values))
+        else:
+            self.mins.append(None)
+            self.maxs.append(None)
+
+    def possible_chunks(self, lo=None, hi=None):
+        """Get a list with a flag for each chunk, which is False if
+        no value in that chunk can lie between lo and hi inclusive.
+        A bound of None means that side of the range is open.
+        """
+        return [
+            mn is not None and
+            (hi is None or mn <= hi) and
+            (lo is None or mx >= lo)
+            for mn, mx in zip(self.mins, self.maxs)
+        ]
+
+
+def column_stats(column):
+    """Get statistics for any column. Stored columns keep running
+    statistics which are returned directly, any other column is
+    scanned.
+    """
+    try:
+        return column.stats
+    except AttributeError:
+        return ColumnStats(column)
@@ -1,5 +1,9 @@
+import array
 import csv
+import datetime
+import decimal
 import logging
+import sys
 import six.moves
 import itertools
 from collections import OrderedDict
@@ -7,11 +11,20 @@ from six import string_types
 from weakref import WeakValueDictionary, WeakSet
 
 from .columns import DerivedColumn, Column, DerivedTableColumn, StaticColumn, JoinColumn, ArrayColumn, describe_column, \
-    NormalizedColumn, StandardizedColumn
+    NormalizedColumn, StandardizedColumn, CompactColumn, CategoricalColumn, RunLengthColumn, BitColumn, \
+    InternedColumn, StringPool, TimestampColumn, FixedDecimalColumn, \
+    CompressedColumn, LzmaCompressedColumn, VectorizedColumn, CachedColumn, \
+    ParallelColumn, covers_column, is_sequence, INT64_TYPECODE
 from .row import TableRow
-from .exceptions import InvalidData, InvalidJoinMode
-from .index import Index
+from .exceptions import InvalidData, InvalidJoinMode, InvalidColumn, InvalidIndex
+from .index import Index, BitmapIndex
 from .aggregation import Aggregation
+from .stats import column_stats
+from .memory import sizeof_column, sizeof_row, is_stored
+from .expression import Expression, ExpressionColumn, FixedExpressionColumn, \
+    Col, fixed_scale
+from .plan import Scan, Filter, Slice, Sort, IndexLookup, FunctionPredicate, \
+    ExpressionPredicate, conjuncts, bitmap_condition
 
 log = logging.getLogger(__name__)
 
@@ -21,9 +34,40 @@ class Table(object):
     """The basic table class. Table objects contain
     any Python data type, however some features may be unavailable
     if the types are non-hashable.
+
+    Tables are only ever appended to. Derived tables, indexes and
+    cached columns made from a table rely on this, so writing into the
+    table's columns in place (e.g. t.Level[3] = 5) is not supported:
+    they will not see the new value. Build a new table instead.
     """
 
-    def __init__(self, schema, data=None):
+    #: Number of rows validated and appended together by extend.
+    EXTEND_BATCH_SIZE = 10000
+
+    #: Column classes for each storage policy, keyed by column type.
+    #: The class for object is used for any type not listed.
+    STORAGE_POLICIES = {
+        'object': {},
+        'compact': dict(
+            [(t, CompactColumn) for t in CompactColumn.TYPECODES] +
+            [(bool, BitColumn), (datetime.datetime, TimestampColumn)]
+        ),
+        'bits': {bool: BitColumn},
+        'timestamp': {datetime.datetime: TimestampColumn},
+        'interned': {object: InternedColumn},
+        'category': {object: CategoricalColumn},
+        'rle': {object: RunLengthColumn},
+        'compressed': {object: CompressedColumn},
+        'compressed:lzma': {object: LzmaCompressedColumn},
+    }
+
+    # Storage policies which take a parameter after a colon, e.g.
+    # 'fixed:2' for decimals with two digits after the point.
+    PARAMETERISED_STORAGE_POLICIES = {
+        'fixed': {decimal.Decimal: FixedDecimalColumn},
+    }
+
+    def __init__(self, schema, data=None, storage='object'):
         """
         Every Table object has a schema. In it's simplest form, the schema can be
         nothing more than a list of string column-names. Specifying a schema
@@ -38,30 +82,170 @@ class Table(object):
         types such as numbers and strings, however it is also possible to store any python
         object as long as they are hashable.
 
+        The storage policy controls how typed columns hold their values:
+
+        * object: Every value is a Python object in a list (the default).
+        * compact: int and float in 64 bit arrays, bool and datetime as below.
+        * bits: bool columns with one bit per row.
+        * timestamp: datetime columns as integer microseconds.
+        * fixed:<n>: Decimal columns as integer multiples of 10 ** -n.
+        * category: Dictionary-encoded values, for few distinct values.
+        * rle: Runs of equal values stored once, for sorted columns.
+        * interned: Equal strings stored once, shared by the table's columns.
+        * compressed, compressed:lzma: Values compressed in blocks (zlib, lzma).
+
+        A schema item may override the table's policy by giving it as a
+        third element, e.g. ('A', int, 'compact').
+
         :param schema: Column names as a sequence of strings, or ('col_name', type)
         :type schema: list
         :param data: Optional rows of data to initialize the table.
         :type data: list of lists
+        :param storage: Storage policy for typed columns: 'object', 'compact',
+                        'bits', 'timestamp', 'fixed:<n>', 'category', 'rle',
+                        'interned', 'compressed' or 'compressed:lzma'.
+        :type storage: str
 
         """
         data = data or []
         self._columns = []
         self.indexes = WeakValueDictionary()
         self._listeners = WeakSet()
+        self._storage = storage
 
         for s in schema:
-            if isinstance(s, string_types):
-                self._columns.append(Column(s))
-            else:
-                name, typ = s
-                if isinstance(typ, str):
-                    col = ArrayColumn(name, column_type=typ)
-                else:
-                    col = Column(name, column_type=typ)
-                self._columns.append(col)
+            self._columns.append(self._make_column(s))
+
+        self.extend(data)
+
+    def _make_column(self, s):
+        """Build an empty column from a single schema item."""
+        if isinstance(s, string_types):
+            return Column(s)
+        name, typ = s[:2]
+        storage = s[2] if len(s) > 2 else self._storage
+        policy, parameter = self._storage_policy(name, storage)
+        if isinstance(typ, str):
+            return ArrayColumn(name, column_type=typ)
+        column_class = policy.get(typ, policy.get(object, Column))
+        if parameter is not None and hasattr(column_class, 'for_storage'):
+            try:
+                return column_class.for_storage(name, typ, parameter)
+            except ValueError as e:
+                raise InvalidColumn(
+                    "Invalid storage %r for column %s: %s" % (storage, name, e))
+        if issubclass(column_class, InternedColumn):
+            pool = self.string_pool
+            if pool is None:
+                pool = StringPool()
+            return column_class(name, column_type=typ, pool=pool)
+        return column_class(name, column_type=typ)
+
+    def _storage_policy(self, name, storage):
+        """Get the policy for a storage name, and its parameter if it
+        takes one."""
+        try:
+            return self.STORAGE_POLICIES[storage], None
+        except KeyError:
+            pass
+        prefix, _, parameter = storage.partition(':')
+        if parameter and prefix in self.PARAMETERISED_STORAGE_POLICIES:
+            return self.PARAMETERISED_STORAGE_POLICIES[prefix], parameter
+        raise InvalidColumn(
+            "Unknown storage %r for column %s. Valid storage policies are %s" % (
+                storage, name, ', '.join(
+                    sorted(self.STORAGE_POLICIES) +
+                    ['%s:<n>' % p for p in sorted(self.PARAMETERISED_STORAGE_POLICIES)]
+                )
+            )
+        )
 
-        for row in data:
-            self.append(row)
+    @property
+    def string_pool(self):
+        """The StringPool shared by this table's interned columns, or
+        None if it has none."""
+        for c in self._columns:
+            pool = getattr(c, 'pool', None)
+            if pool is not None:
+                return pool
+        return None
+
+    @classmethod
+    def from_columns(cls, schema, columns, validate=False, storage='object'):
+        """Build a table from data which is already column-oriented,
+        without converting it into rows.
+
+        Each column may be any sequence: lists and arrays are copied
+        into the new table's columns in a single step. Column and
+        ArrayColumn objects whose name and type match the schema are
+        adopted as they are, without copying, and the new table then
+        shares them with their previous owner.
+
+        >>> import array
+        >>> t = Table.from_columns(
+        ...     [('A', int), ('B', 'd')],
+        ...     [[1, 2, 3], array.array('d', [1.5, 2.5, 3.5])]
+        ... )
+
+        :param schema: The table's schema, as for the Table constructor.
+        :type schema: list
+        :param columns: Column data in schema order, or a dict mapping
+                        column names to column data.
+        :type columns: list of sequences, or dict
+        :param validate: If True, verify that every value conforms to
+                         the column's type.
+        :type validate: bool
+        :param storage: Storage policy for typed columns, see Table.
+        :type storage: str
+        """
+        t = cls(schema, storage=storage)
+        if isinstance(columns, dict):
+            missing = [c.name for c in t._columns if c.name not in columns]
+            if missing:
+                raise InvalidData(
+                    "No data for columns: %s" % ', '.join(missing))
+            columns = [columns[c.name] for c in t._columns]
+
+        if len(columns) != len(t._columns):
+            raise InvalidData(
+                "Expected %d columns, got %d" % (len(t._columns), len(columns))
+            )
+
+        lengths = set(len(values) for values in columns)
+        if len(lengths) > 1:
+            raise InvalidData(
+                "Columns have different lengths: %s" % (
+                    ', '.join(str(l) for l in sorted(lengths))
+                )
+            )
+
+        t._columns = [
+            cls._adopt_column(c, values, validate)
+            for c, values in six.moves.zip(t._columns, columns)
+        ]
+        return t
+
+    @staticmethod
+    def _adopt_column(c, values, validate):
+        """Return a column like c containing values, re-using values
+        if it is already a suitable column object."""
+        if (type(values) is type(c) and
+                values.name == c.name and
+                values.column_type == c.column_type and
+                getattr(values, 'storage', None) == getattr(c, 'storage', None)):
+            col = values
+        else:
+            col = c
+            col.extend(values)
+
+        if validate and not col.validate_many(col):
+            bad = next(v for v in col if not col.validate(v))
+            raise InvalidData(
+                '%r is incompatible with type %s for column %s' % (
+                    bad, col.column_type, col.name
+                )
+            )
+        return col
 
     def append(self, row):
         """Append a single row to this table. The row must match the table's
@@ -86,6 +270,10 @@ class Table(object):
                         v, c.column_type, c.name
                     )
                 )
+            # Raises if an array column can't hold v, before any column
+            # has been written to, so a bad row never leaves the columns
+            # with different lengths.
+            c.coerce_many((v,))
         for v, c in zipped:
             c.append(v)
 
@@ -95,11 +283,53 @@ class Table(object):
     def extend(self, iterable):
         """Append all rows in iterable to this table. Each row
         must conform to this table's schema.
+
+        Rows are loaded in batches of EXTEND_BATCH_SIZE. Each batch is
+        validated and appended one column at a time and listeners are
+        notified once per batch. If any row in a batch is invalid then
+        that batch is appended row by row, so the same error is raised
+        and all rows before the invalid row are kept, exactly as if
+        append had been called for each row.
+
         :param iterable: Iterator from which to extract rows
         :type iterable: iterable
         """
-        for row in iterable:
-            self.append(row)
+        rows = iter(iterable)
+        while True:
+            batch = list(itertools.islice(rows, self.EXTEND_BATCH_SIZE))
+            if not batch:
+                break
+            if not self._extend_columns(batch):
+                for row in batch:
+                    self.append(row)
+
+    def _extend_columns(self, batch):
+        """Validate and append a batch of rows column by column.
+
+        Returns False without modifying the table if any row in the
+        batch has the wrong length or any value fails validation.
+        """
+        columns = self._columns
+        if not columns or set(six.moves.map(len, batch)) != set([len(columns)]):
+            return False
+
+        buffers = []
+        for c, values in six.moves.zip(columns, six.moves.zip(*batch)):
+            try:
+                if not c.validate_many(values):
+                    return False
+                buffers.append(c.coerce_many(values))
+            except (TypeError, ValueError, OverflowError):
+                return False
+
+        start = len(self)
+        for c, b in six.moves.zip(columns, buffers):
+            c.extend(b)
+
+        positions = six.moves.range(start, len(self))
+        for l in self._listeners:
+            l.notify('extend', positions)
+        return True
 
     @property
     def schema(self):
@@ -156,6 +386,42 @@ class Table(object):
                 return c
         raise KeyError(name)
 
+    @property
+    def _base_table(self):
+        """The stored table whose rows this table shows, if known."""
+        return self
+
+    def _get_base_column(self, name):
+        """Get a column by name which is indexed by the positions that
+        _indices_func gives, rather than by row number in this table.
+        """
+        return self._get_column(name)
+
+    def _version(self):
+        """Something which changes whenever this table's rows might,
+        or None if that can't be known. Stored tables are only ever
+        appended to (see Table), so their length will do."""
+        return len(self._columns[0]) if self._columns else 0
+
+    def _row_plan(self):
+        """The plan node which gives the rows of this table."""
+        return Scan(self)
+
+    def _kept_indices(self):
+        """This table's row positions as a sequence, if they can be had
+        without evaluating anything, otherwise None."""
+        return self._indices_func()
+
+    def explain(self):
+        """Describe how the rows of this table are found, after
+        adjacent restrictions and slices have been combined.
+
+        >>> print(t.restrict(['A'], f).restrict(col('B') > 1).explain())
+        Filter f(A), (B > 1)
+          Scan Table
+        """
+        return '\n'.join(self._row_plan().explain())
+
     def anti_project(self, *col_names):
         """Returns a new DerivedTable in which the named columns
         have been removed.
@@ -224,10 +490,17 @@ class Table(object):
     def _project(self, col_names, rename_dict=None):
         """Implementation of project, anti_project and rename function"""
         rename_dict = rename_dict or {}
-        cols = [self._get_column(c) for c in col_names]
+        cols = [self._get_base_column(c) for c in col_names]
 
+        # The columns keep their names from the underlying table, which
+        # may have been renamed in this one.
+        names = [rename_dict.get(n, n) for n in col_names]
+        rename_dict = dict(
+            (c.name, n) for c, n in six.moves.zip(cols, names) if c.name != n
+        )
         return (
-            DerivedTable(self._indices_func, cols, rename_dict=rename_dict)
+            DerivedTable(self._indices_func, cols, rename_dict=rename_dict,
+                         source=self)
         )
 
     def expand_const(self, name, value, type=object):
@@ -244,30 +517,147 @@ class Table(object):
         return DerivedTable(
             self._indices_func,
             self._columns + [StaticColumn(name, value, self.__len__, type)],
+            source=self
         )
 
-    def expand(self, name, input_columns, fn, col_type=object):
+    def expand(self, name, input_columns, fn=None, col_type=object,
+               vectorized=False, cache=False, parallel=None,
+               materialize=False):
         """Returns a new DerivedTable in which a new calculated
         column has been added.
 
         This column's value is determined by a function and
         a set of input columns.
 
+        Normally fn is called once for each row, with one value from each
+        input column. If vectorized is True, fn is instead called with
+        whole chunks of the input columns, as arrays (for array-backed
+        columns) or lists, and must return a sequence of results of the
+        same length. If vectorized is 'numpy' the chunks are passed as
+        NumPy arrays. e.g.
+
+        >>> t.expand('Total', ['Price', 'Quantity'],
+        ...          lambda p, q: p * q, float, vectorized='numpy')
+
+        Instead of input columns and a function, the new column can be
+        given as an expression, in which case fn is not used:
+
+        >>> t.expand('Double', col('Level') * 2, col_type=int)
+
+        An expression which only adds, subtracts and multiplies columns
+        with fixed decimal storage, and integers, is calculated on the
+        integers which those columns store, so it stays exact and runs
+        at integer speed. Its values are Decimals:
+
+        >>> t.expand('Gross', col('Price') * 3 + col('Tax'), col_type=Decimal)
+
+        If cache is True, each row's value is remembered the first time
+        it is read, so that fn is only called once per row however often
+        the new table is read, and never for rows which aren't read. The
+        cache's hits and misses can be read from the new column.
+
+        If materialize is True, the new table's rows are calculated
+        straight away and kept, as if cache were also given.
+
+        If parallel is given, reading the new table calls fn in that
+        many worker processes (or one per CPU if parallel is True), each
+        working on a chunk of rows. fn must then be a module-level
+        function, since it is sent to the workers by pickling, and a
+        ValueError is raised if it can't be. The workers are started
+        the first time they are needed and kept for later reads:
+
+        >>> t.expand('Score', ['Text'], score, float, parallel=8,
+        ...          materialize=True)
+
         :param name: The name of the new derived coulumn.
         :type name: str
-        :param input_columns: The input column names.
-        :type input_columns: list of str
+        :param input_columns: The input column names, or an expression.
+        :type input_columns: list of str or Expression
         :param fn; A function or lambda
         :param col_type: Optionally, constrain the value of this column by type
+        :param vectorized: False, True or 'numpy'
+        :param cache: If True, remember calculated values.
+        :type cache: bool
+        :param parallel: The number of worker processes, or True.
+        :type parallel: int or bool
+        :param materialize: If True, calculate every row immediately.
+        :type materialize: bool
         """
+        expression = None
+        if isinstance(input_columns, Expression):
+            expression, input_columns = input_columns, input_columns.columns
+        if parallel and (expression is not None or vectorized):
+            raise ValueError(
+                'parallel cannot be combined with an expression or vectorized')
         incols = []
         for c in input_columns:
-            incols.append(self._get_column(c))
+            incols.append(self._get_base_column(c))
+        use_numpy = vectorized == 'numpy'
+        if expression is not None and vectorized:
+            fn = expression.bind('numpy' if use_numpy else 'chunk', incols)
+        scale = None
+        if expression is not None and not vectorized:
+            scale = fixed_scale(expression, dict(
+                (n, c.scale) for n, c in six.moves.zip(input_columns, incols)
+                if isinstance(c, FixedDecimalColumn)))
+        if scale is not None:
+            column = FixedExpressionColumn(
+                name, expression, incols, scale, col_type)
+        elif expression is not None and not vectorized:
+            column = ExpressionColumn(name, expression, incols, col_type)
+        elif vectorized:
+            column = VectorizedColumn(
+                name, incols, fn, col_type, use_numpy=use_numpy)
+        elif parallel:
+            processes = None if parallel is True else parallel
+            column = ParallelColumn(name, incols, fn, col_type, processes)
+        else:
+            column = DerivedColumn(name, incols, fn, col_type)
+        if cache or materialize:
+            column = CachedColumn(column)
+            base = self._base_table
+            if base is not None:
+                base._listeners.add(column)
+            if materialize:
+                column.fill(self._indices_func())
         return DerivedTable(
             self._indices_func,
-            self._columns + [DerivedColumn(name, incols, fn, col_type)]
+            self._columns + [column],
+            source=self
         )
 
+    def expand_bucket(self, name, col_name, width):
+        """Returns a new DerivedTable with a column giving the bucket
+        which each value of another column falls into. Each value is
+        rounded down to a multiple of width, so e.g. a width of
+        timedelta(hours=1) on a timestamp column gives the start of
+        each value's hour.
+
+        The new column is a useful key for aggregations.
+
+        :param name: The name of the new column.
+        :type name: str
+        :param col_name: The column to put into buckets, which should
+                         hold numbers, or be a timestamp column.
+        :type col_name: str
+        :param width: The size of each bucket: a number, or a timedelta
+                      for a timestamp column.
+        """
+        col = self._get_base_column(col_name)
+        col_type = col.column_type
+        if isinstance(col_type, str):  # The type-code of an array column
+            col_type = ArrayColumn.PY_TYPE_MAPPING.get(col_type, object)
+        if hasattr(col, 'bucket_column'):
+            bucket = col.bucket_column(name, width)
+        else:
+            bucket = DerivedColumn(
+                name, [col],
+                lambda v: None if v is None else v - v % width,
+                col_type
+            )
+        return DerivedTable(
+            self._indices_func, self._columns + [bucket], source=self)
+
     def hash(self, name, input_columns):
         """A convenience function that expands the table
         with a new hash column.
@@ -280,30 +670,52 @@ class Table(object):
         This converts all dynamically generated columns into
         StaticColumn objects.
         """
-        t = Table(self.schema)
+        schema = [
+            (name, typ, getattr(c, 'storage', 'object'))
+            for (name, typ), c in six.moves.zip(self.schema, self._columns)
+        ]
+        t = Table(schema)
         t.extend(self)
         return t
 
-    def add_index(self, cols):
+    #: Index classes for each kind of index.
+    INDEX_KINDS = {'tree': Index, 'bitmap': BitmapIndex}
+
+    def add_index(self, cols, kind='tree'):
         """Create a new index on a set of columns.
 
         Indexes are list-like objects which can be used to
         speed-up access to rows of data. Indexes improve the
         preformance of operations (e.g. joins).
 
+        A 'bitmap' index keeps a bitmap of the rows for each distinct
+        value, which suits columns with few distinct values. Restricting
+        a table by an expression which compares columns with bitmap
+        indexes to constants, combined with & | and ~, combines their
+        bitmaps rather than testing each row:
+
+        >>> t.add_index(['Type'], kind='bitmap').reindex()
+        >>> t.restrict((col('Type') == 'Water') | (col('Type') == 'Ice'))
+
         The Table class only holds a weak-reference to this object,
         hence the user must retain a reference to the index
         in order to prevent it from being garbage collected.
 
         :param cols: Column names to be included into the index.
         :type cols: List of strings.
+        :param kind: 'tree' or 'bitmap'
+        :type kind: str
         """
-        index_key = tuple(cols)
+        try:
+            index_class = self.INDEX_KINDS[kind]
+        except KeyError:
+            raise InvalidIndex('Unknown kind of index: %r' % kind)
+        index_key = tuple(cols) if kind == 'tree' else (tuple(cols), kind)
 
         if index_key in self.indexes:
             return self.indexes[index_key]
 
-        i = Index(table=self, cols=cols)
+        i = index_class(table=self, cols=cols)
         self.indexes[index_key] = i
         self._listeners.add(i)
         return i
@@ -349,7 +761,8 @@ class Table(object):
             keys=keys,
             other=other,
             other_keys=other_keys,
-            mode=mode
+            mode=mode,
+            source=self
         )
 
     def restrict(self, col_names, fn=None):
@@ -358,38 +771,337 @@ class Table(object):
         all visible rows satisfy some kind of logical
         constraint given by fn.
 
-        :param col_names: List of column names to feed into fn
-        :type col_names: list of strings
+        Instead of column names and a function, the constraint can be
+        given as an expression, which is compiled into a loop over just
+        the columns it uses:
+
+        >>> t.restrict(col('Level') * 2 > col('Limit'))
+
+        :param col_names: List of column names to feed into fn, or an
+                          expression.
+        :type col_names: list of strings or Expression
         :param fn: Should return True for any retained row.
         :type fn: fuunction or lambda
         """
-        cols = [self._get_column(cn) for cn in col_names]
+        if isinstance(col_names, Expression):
+            return self._restrict_expression(col_names)
+        cols = [self._get_base_column(cn) for cn in col_names]
+
+        def run_indices_func():
+            """Evaluate fn once for each stretch of rows in which none
+            of the run-length encoded input columns change value."""
+            lo = hi = 0
+            keep = False
+            for i in self._indices_func():
+                if not lo <= i < hi:
+                    runs = [c.run_at(i) for c in cols]
+                    lo = max(r[0] for r in runs)
+                    hi = min(r[1] for r in runs)
+                    keep = fn(*[r[2] for r in runs])
+                if keep:
+                    yield i
 
         def indices_func():
             for i in self._indices_func():
-                vals = [c[i] for c in cols]
-                if fn(*vals):
+                if fn():
+                    yield i
+
+        if not cols or all(hasattr(c, 'run_at') for c in cols):
+            return DerivedTable(
+                indices_func=run_indices_func if cols else indices_func,
+                columns=self._columns,
+                source=self
+            )
+
+        return self._restrict_plan(FunctionPredicate(col_names, cols, fn))
+
+    def _restrict_expression(self, expression):
+        indexes = dict(
+            (i.cols[0].name, i) for i in self._complete_indexes(BitmapIndex)
+            if len(i.cols) == 1
+        )
+        if indexes:
+            # Answer what we can of the expression from bitmap indexes,
+            # and test the rows they find against the rest.
+            found, rest = [], []
+            for e in conjuncts(expression):
+                f = bitmap_condition(e, indexes)
+                (rest if f is None else found).append((e, f))
+            if found:
+                return self._restrict_bitmaps(found, rest, indexes)
+        cols = [self._get_base_column(cn) for cn in expression.columns]
+        return self._restrict_plan(ExpressionPredicate(expression, cols))
+
+    def _restrict_bitmaps(self, found, rest, indexes):
+        def positions():
+            bitmap = found[0][1]()
+            for _, f in found[1:]:
+                bitmap &= f()
+            return bitmap.positions()
+
+        def combine(parts):
+            e = parts[0][0]
+            for part, _ in parts[1:]:
+                e = e & part
+            return e
+
+        condition = combine(found)
+        used = sorted(set(condition.columns))
+        # Bitmap positions are already in table order
+        t = self._from_index(
+            [indexes[name] for name in used],
+            repr(ExpressionPredicate(condition, None)),
+            positions,
+            sort=False
+        )
+        return t.restrict(combine(rest)) if rest else t
+
+    def _restrict_plan(self, predicate):
+        plan = Filter.over(self, predicate)
+        return DerivedTable(
+            indices_func=plan.indices,
+            columns=self._columns,
+            source=self,
+            plan=plan
+        )
+
+    def restrict_between(self, col_name, lo=None, hi=None):
+        """
+        Return a new DerivedTable object containing only the
+        rows in which the value of a column lies between lo and hi
+        inclusive. Missing values are never between anything.
+
+        Unlike restrict, the range is known in advance, so chunks of
+        rows whose minimum and maximum values fall outside the range
+        are skipped without looking at their rows. On tables whose
+        rows are appended in order of this column, e.g. a timestamp,
+        a query for recent values only reads the end of the table.
+
+        :param col_name: The name of the column to test
+        :type col_name: str
+        :param lo: Lowest value to keep, or None for no lower limit
+        :param hi: Highest value to keep, or None for no upper limit
+        """
+        col = self._get_base_column(col_name)
+        if hasattr(col, 'to_raw'):
+            # Compare the integers which the column stores, rather
+            # than the values they represent.
+            lo, hi = col.to_raw(lo), col.to_raw(hi)
+            col = col.raw
+
+        def between(v):
+            return (
+                v is not None and
+                (lo is None or lo <= v) and
+                (hi is None or v <= hi)
+            )
+
+        def indices_func():
+            zone_map = getattr(col, 'zone_map', None)
+            indices = self._indices_func()
+            if zone_map is None:
+                possible, size = [], 1
+            else:
+                possible = zone_map.possible_chunks(lo, hi)
+                size = zone_map.chunk_size
+
+            if indices == six.moves.range(len(col)):
+                # Every row of the column in order: only read the chunks
+                # which might match, and the incomplete last chunk.
+                spans = [
+                    (k * size, (k + 1) * size)
+                    for k, p in enumerate(possible) if p
+                ]
+                spans.append((len(possible) * size, len(col)))
+                for start, stop in spans:
+                    for i, v in enumerate(col[start:stop], start):
+                        if between(v):
+                            yield i
+                return
+
+            checked = len(possible) * size
+            for i in indices:
+                if i < checked and not possible[i // size]:
+                    continue
+                if between(col[i]):
                     yield i
+
+        return DerivedTable(
+            indices_func=indices_func,
+            columns=self._columns,
+            source=self
+        )
+
+    def restrict_mask(self, mask):
+        """
+        Return a new DerivedTable object containing only the rows
+        whose bits are set in mask. The i-th bit of the mask selects
+        the i-th row of this table.
+
+        A mask can be built by combining BitColumns with the &, |
+        and ~ operators, e.g.
+
+        >>> t.restrict_mask(t.Shiny & ~t.Legendary)
+
+        :param mask: A Bitmap, BitColumn or sequence of booleans, with
+                     one item for each row.
+        """
+        if len(mask) != len(self):
+            raise ValueError(
+                'A mask of length %d cannot select rows of a table of length %d'
+                % (len(mask), len(self)))
+        indices = self._indices_func()
+        if hasattr(mask, 'positions') and \
+                isinstance(indices, six.moves.range) and \
+                indices == six.moves.range(len(self)):
+            # The mask's positions are already row numbers in the
+            # underlying columns.
+            indices_func = mask.positions
+        else:
+            def indices_func():
+                return itertools.compress(self._indices_func(), mask)
+
         return DerivedTable(
             indices_func=indices_func,
-            columns=self._columns
+            columns=self._columns,
+            source=self
+        )
+
+    def _complete_indexes(self, kind=Index):
+        """The indexes of a kind which hold every row of this table, if
+        this is a stored table. Positions in a derived table's indexes
+        aren't positions in its columns, so they can't be used."""
+        if self._base_table is not self:
+            return []
+        return [
+            i for i in list(self.indexes.values())
+            if i.complete and isinstance(i, kind)
+        ]
+
+    def _from_index(self, indexes, description, positions, sort=True):
+        """A view of the rows at the positions which indexes give."""
+        plan = IndexLookup(self, indexes, description, positions, sort)
+        return DerivedTable(
+            indices_func=plan.indices,
+            columns=self._columns,
+            source=self,
+            plan=plan
+        )
+
+    def where(self, **values):
+        """
+        Return a new DerivedTable object containing only the rows in
+        which each named column equals the given value, e.g.
+
+        >>> t.where(Pokemon='Pikachu', Owner='Ash')
+
+        If the table has an index whose first columns are some of the
+        named columns, the matching rows are looked up in the index in
+        O(log n + k) time, and only the remaining columns are tested.
+        Otherwise every row is tested, as by restrict. Indexes which
+        were added to a table which already had rows can only be used
+        once reindex has been called. Rows are kept in table order.
+
+        :param values: The value to match for each column.
+        """
+        if not values:
+            raise TypeError('where() needs at least one column=value')
+        best, width = None, 0
+        for index in self._complete_indexes():
+            names = [c.name for c in index.cols]
+            n = 0
+            while n < len(names) and names[n] in values:
+                n += 1
+            if n > width:
+                best, width = index, n
+        t, rest = self, sorted(values)
+        if best is not None:
+            names = [c.name for c in best.cols][:width]
+            prefix = tuple(values[n] for n in names)
+            t = self._from_index(
+                [best],
+                ', '.join('%s == %r' % nv for nv in zip(names, prefix)),
+                lambda: best.prefix_positions(prefix)
+            )
+            rest = [n for n in rest if n not in names]
+        if rest:
+            condition = Col(rest[0]) == values[rest[0]]
+            for name in rest[1:]:
+                condition = condition & (Col(name) == values[name])
+            t = t.restrict(condition)
+        return t
+
+    def where_between(self, col_name, lo=None, hi=None):
+        """
+        Return a new DerivedTable object containing only the rows in
+        which the value of a column lies between lo and hi inclusive,
+        like restrict_between. If the table has an index whose first
+        column is col_name the rows are found from the index in
+        O(log n + k) time. Rows are kept in table order.
+
+        :param col_name: The name of the column to test
+        :type col_name: str
+        :param lo: Lowest value to keep, or None for no lower limit
+        :param hi: Highest value to keep, or None for no upper limit
+        """
+        for index in self._complete_indexes():
+            if index.cols[0].name == col_name:
+                return self._from_index(
+                    [index],
+                    '%r <= %s <= %r' % (lo, col_name, hi),
+                    lambda: index.range_positions(lo, hi)
+                )
+        return self.restrict_between(col_name, lo, hi)
+
+    def sort_by(self, cols, reverse=False, key=None):
+        """
+        Return a new DerivedTable with the rows of this table sorted by
+        the values of some of its columns, e.g.
+
+        >>> t.sort_by(['Level', 'Pokemon'], reverse=True)
+
+        The order is found the first time the new table is read, as an
+        array of row positions, and kept until rows are added to the
+        underlying table. Rows are not copied. Rows with None in any of
+        the columns come last, and rows with equal values keep their
+        order. If this table has a complete index on exactly these
+        columns, the order is read from it instead of sorting.
+
+        :param cols: The names of the columns to sort by, or one name.
+        :type cols: list of str or str
+        :param reverse: If True, sort in descending order.
+        :type reverse: bool
+        :param key: Optionally, a function which is given one value from
+                    each column and returns the value to sort by. Missing
+                    values are then passed to it like any other.
+        """
+        if isinstance(cols, string_types):
+            cols = [cols]
+        cols = list(cols)
+        if not cols:
+            raise TypeError('sort_by() needs at least one column')
+        columns = [self._get_base_column(c) for c in cols]
+        index = None
+        if key is None:
+            for i in self._complete_indexes():
+                if [c.name for c in i.cols] == cols:
+                    index = i
+        plan = Sort(self, cols, columns, reverse, key, index)
+        return DerivedTable(
+            indices_func=plan.indices,
+            columns=self._columns,
+            source=self,
+            plan=plan
         )
 
     def __getitem__(self, key):
         if isinstance(key, slice):
-            if key.step and key.step < 0:
-                # islice doesn't support negative indices, convert to a list
-                f = lambda: list(self._indices_func())[key]
-            else:
-                f = lambda: itertools.islice(
-                    self._indices_func(),
-                    key.start,
-                    key.stop,
-                    key.step or None
-                )
+            plan = Slice.over(self, key)
             return DerivedTable(
-                f,
+                plan.indices,
                 self._columns[:],
+                source=self,
+                plan=plan
             )
         else:
             return self.get_row(key)
@@ -510,6 +1222,83 @@ class Table(object):
             aggregations=aggregations
         )
 
+    def sum(self, col_name):
+        """Get the sum of the values in a column, ignoring missing
+        values. Columns with fixed decimal storage add up their
+        integers, which is much faster than adding Decimals, so this
+        is the best way to total them in an aggregation, e.g.
+
+        >>> t.aggregate(['Owner'], [('Total', Decimal, lambda g: g.sum('Price'))])
+
+        :param col_name: The name of the column to add up.
+        :type col_name: str
+        """
+        col = self._get_base_column(col_name)
+        rows = self._indices_func()
+        if hasattr(col, 'sum_rows'):
+            return col.sum_rows(rows)
+        return sum(v for v in (col[i] for i in rows) if v is not None)
+
+    def stats(self, col_name):
+        """Get summary statistics for a single column: count, null_count,
+        min, max, sum, mean, variance and stddev.
+
+        Stored columns keep these statistics up to date as rows are
+        added, so on a Table they are available almost immediately.
+        On derived tables the visible rows are scanned.
+
+        :param col_name: The name of the column.
+        :type col_name: str
+        :rtype: eztable.stats.ColumnStats
+        """
+        return column_stats(self._get_column(col_name))
+
+    def memory_usage(self, deep=True):
+        """Report the memory used by this table, in bytes, as a table
+        with one row for each column, index and view.
+
+        The Kind of each row is one of:
+
+        * column: The storage for a column. Shared columns belong to
+          another table which this one is a view on.
+        * index: An index on this table, or (if Shared) an index on
+          another table which this table uses, e.g. for a join.
+        * view: The bookkeeping of a derived table.
+        * pool: The dictionary of the table's interned strings.
+        * row: The size of each TableRow object created while iterating
+          over the table. These only exist while they are being used.
+
+        Summing the Bytes of the rows which are neither shared nor of
+        kind 'row' gives the memory owned by this table.
+
+        :param deep: If True, include the size of the values held in
+                     object columns, otherwise only the containers.
+        :type deep: bool
+        :rtype: Table
+        """
+        report = Table([
+            ('Kind', str),
+            ('Name', str),
+            ('Bytes', int),
+            ('Shared', bool),
+        ])
+        report.extend(self._memory_usage(deep))
+        width = len(self.column_names)
+        report.append(
+            ('row', 'TableRow', sizeof_row(TableRow((None,) * width, {})), False)
+        )
+        return report
+
+    def _memory_usage(self, deep):
+        for c in self._columns:
+            yield 'column', c.name, sizeof_column(c, deep), False
+        for index in list(self.indexes.values()):
+            yield 'index', str(index), index.memory_usage(deep), False
+        pool = self.string_pool
+        if pool is not None:
+            # The strings themselves are counted in the columns
+            yield 'pool', 'strings', pool.memory_usage(deep=False), False
+
     def to_csv(self, output_file, dialect="excel", descriptions=False):
         """
         Save this table to a file in CSV format (or any dialect variation supported
@@ -543,7 +1332,8 @@ class Table(object):
                 return c
 
         return DerivedTable(indices_func=self._indices_func,
-                            columns=[standardize_col(c) for c in self._columns]
+                            columns=[standardize_col(c) for c in self._columns],
+                            source=self
                             )
 
     def normalize(self, normalizations):
@@ -566,7 +1356,8 @@ class Table(object):
                 return c
 
         return DerivedTable(indices_func=self._indices_func,
-                            columns=[normalize_col(c) for c in self._columns]
+                            columns=[normalize_col(c) for c in self._columns],
+                            source=self
                             )
 
 
@@ -578,8 +1369,16 @@ class AggregationTable(Table):
         self.keys = keys
         self.aggregations = [Aggregation(*a) for a in aggregations]
 
+    _base_table = None
+
+    def _version(self):
+        return None
+
     def _indices_func(self):
-        return six.moves.range(len(self.i.unique_values()))
+        return six.moves.range(len(self))
+
+    def __len__(self):
+        return len(self.i.unique_values())
 
     def _iter_subtables(self):
         """Generator function that gives a sequnce of (values, table) which represents
@@ -589,7 +1388,8 @@ class AggregationTable(Table):
             iterfn = self.i._get_iterator_fn_for_value(uv)
             yield uv, DerivedTable(
                 indices_func=iterfn,
-                columns=self.table._columns
+                columns=self.table._columns,
+                source=self.table
             )
 
     @property
@@ -637,13 +1437,121 @@ class DerivedTable(Table):
     """A view on an actual table, can include
     a smaller number of rows or columns than the orginal
     for performance reasons, certain functions are prohibited.
+
+    The positions of a derived table's rows are given by a generator
+    function, which may have to test every row of the table beneath it.
+    The first time that generator runs to completion the positions are
+    kept as an array (a selection vector), after which len, random
+    access, slicing and iterating over the table, or over any view made
+    from it, read the array instead. The array is discarded when rows
+    are added to the underlying table.
     """
 
-    def __init__(self, indices_func, columns, rename_dict=None):
-        self._indices_func = indices_func
+    #: Whether row positions are kept after the first complete pass.
+    MATERIALIZE_ROWS = True
+
+    _source = None
+    _selection = None
+
+    def __init__(self, indices_func, columns, rename_dict=None, source=None,
+                 plan=None):
+        self._row_func = indices_func
         self._columns = columns
         self._rename_dict = rename_dict or {}
         self._inv_rename_dict = {v: k for k, v in self._rename_dict.items()}
+        self._source = source
+        self._plan = plan
+        self._materialize = self.MATERIALIZE_ROWS
+
+    def _own_selection(self):
+        """The kept positions of this table's rows, if still valid."""
+        version = self._version()
+        if self._selection is not None and self._selection[0] == version:
+            return self._selection[1]
+        return None
+
+    def _passes_through(self):
+        """True if this table has exactly the rows of its source, e.g.
+        because it is a projection."""
+        return (
+            self._source is not None and
+            self._row_func == self._source._indices_func
+        )
+
+    def _row_plan(self):
+        if self._plan is not None:
+            return self._plan
+        if self._passes_through():
+            return self._source._row_plan()
+        return Scan(self)
+
+    def _kept_indices(self):
+        selection = self._own_selection()
+        if selection is None and self._passes_through():
+            return self._source._kept_indices()
+        return selection
+
+    def explain(self):
+        if self._own_selection() is not None:
+            return 'Kept rows of %s' % self.__class__.__name__
+        return Table.explain(self)
+
+    def _indices_func(self):
+        selection = self._own_selection()
+        if selection is not None:
+            return selection
+        version = self._version()
+        indices = self._row_func()
+        if not self._materialize or version is None or is_sequence(indices):
+            return indices
+        return self._record_rows(indices, version)
+
+    def _version(self):
+        """The version of the table this one was made from. If it is
+        None rows are never kept."""
+        if self._source is None:
+            return None
+        return self._source._version()
+
+    def _record_rows(self, indices, version):
+        """Pass on indices, keeping them as the selection vector if the
+        caller reads all of them."""
+        rows = array.array(INT64_TYPECODE)
+        record = rows.append
+        for i in indices:
+            if record is not None:
+                try:
+                    record(i)
+                except TypeError:  # A missing row of a join
+                    record = None
+            yield i
+        if record is not None:
+            self._selection = version, rows
+
+    def materialize_rows(self, lazy=False):
+        """Keep the positions of this table's rows as a selection
+        vector, so that len, random access and repeated iteration no
+        longer have to re-evaluate the restrictions beneath this table.
+
+        Derived tables do this by themselves the first time that all of
+        their rows are read, unless MATERIALIZE_ROWS is False.
+
+        :param lazy: If True, don't find the rows now, but keep them the
+                     next time that they are all read.
+        :type lazy: bool
+        :returns: This table.
+        """
+        self._materialize = True
+        if not lazy:
+            for _ in self._indices_func():
+                pass
+        return self
+
+    @property
+    def _base_table(self):
+        if self._source is None:
+            return None
+        return self._source._base_table
 
     @property
     def column_names(self):
@@ -653,18 +1561,67 @@ class DerivedTable(Table):
     def __iter__(self):
         cs = self._columns
         s = dict((c.name, i) for i, c in enumerate(cs))
+        indices = self._indices_func()
+        if any(getattr(c, 'parallel', False) for c in cs):
+            indices, cs = self._read_parallel(indices, cs)
         cls = TableRow
-        for i in self._indices_func():
+        for i in indices:
             # Slightly optimised, eg. we don't do LOAD_GLOBAL in this loop
             # i can be None (because of broken joins)
             r = (None if i is None else c[i] for c in cs)
             yield cls(r, s)
 
+    @staticmethod
+    def _read_parallel(indices, columns):
+        """Read the rows at indices of any parallel columns in one go,
+        so that their workers share the rows, rather than one row at a
+        time. Returns the indices as a sequence, and the columns with
+        each parallel column replaced by its values, by position."""
+        if not is_sequence(indices):
+            indices = list(indices)
+        if None in indices:  # A missing row of a join
+            return indices, columns
+        read = []
+        for c in columns:
+            if getattr(c, 'parallel', False):
+                values = c.values_at(indices)
+                if not covers_column(indices, c):
+                    values = dict(six.moves.zip(indices, values))
+                c = values
+            read.append(c)
+        return indices, read
+
+    @property
+    def _column_descriptions(self):
+        # Columns describe themselves by their own name, which may have
+        # been renamed in this table.
+        return [
+            name + c.description[len(c.name):]
+            for name, c in six.moves.zip(self.column_names, self._columns)
+        ]
+
     def _get_column(self, name):
-        actual_name = self._inv_rename_dict.get(name, name)
-        actual_col = Table._get_column(self, actual_name)
+        actual_col = self._get_base_column(name)
         return DerivedTableColumn(self._indices_func, actual_col)
 
+    def _get_base_column(self, name):
+        actual_name = self._inv_rename_dict.get(name, name)
+        return Table._get_column(self, actual_name)
+
+    def _memory_usage(self, deep):
+        yield 'view', self.__class__.__name__, self._view_memory_usage(), False
+        for name, c in six.moves.zip(self.column_names, self._columns):
+            yield 'column', name, sizeof_column(c, deep), is_stored(c)
+
+    def _view_memory_usage(self):
+        selection = self._selection
+        return (
+            sys.getsizeof(self) +
+            sys.getsizeof(self.__dict__) +
+            sys.getsizeof(self._columns) +
+            (0 if selection is None else sys.getsizeof(selection[1]))
+        )
+
     def append(self, row):
         raise TypeError("Cannot do append on a non-materialised table.")
 
@@ -679,10 +1636,14 @@ class DerivedTable(Table):
             return sum(1 for _ in idxs)
 
     def get_row(self, key):
-        try:
-            idx = next(itertools.islice(self._indices_func(), key, None))
-        except StopIteration:
-            raise IndexError(key)
+        indices = self._indices_func()
+        if is_sequence(indices):
+            idx = indices[key]
+        else:
+            try:
+                idx = next(itertools.islice(indices, key, None))
+            except StopIteration:
+                raise IndexError(key)
         return Table.get_row(self, idx)
 
 
@@ -692,56 +1653,158 @@ class JoinTable(DerivedTable):
 
     Join tables extend the _indices_func behavior of DerivedTable,
     with _left_join_indices_func, which provides a sequence of pairs.
+
+    The pairs are kept the first time they are all read, until either
+    table grows. The join table's own rows are numbered from zero, and
+    its columns, both left and joined, are indexed by those numbers.
     """
 
-    def __init__(self, indices_func, left_columns, keys, other, other_keys, mode='left'):
-        self._indices_func = indices_func
+    _rows = None
+
+    def __init__(self, indices_func, left_columns, keys, other, other_keys, mode='left',
+                 source=None):
+        self._left_indices_func = indices_func
         self._left_columns = left_columns
         self._keys = keys
         self._other = other
         self._other_keys = other_keys
         self._mode = mode
+        self._source = source
+        self._left_join_columns = [
+            JoinColumn(indices_func=self._left_indices, column=c)
+            for c in left_columns
+        ]
 
         # Finally build an index
         self._join_index = other.add_index(
             cols=other_keys
         ).reindex()
 
+    # Rows of a join don't correspond to rows of the left table, so
+    # they can't follow its changes.
+    _base_table = None
+
+    def _version(self):
+        left = DerivedTable._version(self)
+        right = self._other._version()
+        if left is None or right is None:
+            return None
+        return left, right
+
     @property
     def _columns(self):
-        return self._left_columns + self._join_columns
+        return self._left_join_columns + self._join_columns
 
     def _left_join_indices_func(self):
         """Generator function which gives a sequence of pairs:
         The first value is the index for the row in this table.
         The second value is the index for the row in the joined table.
         """
-        kcs = self._key_columns
-        for i in self._indices_func():
-            key = tuple(key[i] for key in kcs)
-            try:
-                yield i, self._join_index.index(key)[0]
-            except KeyError:
-                yield i, None
+        return self._iter_matches()
 
     def _inner_join_indices_func(self):
         """Generator function which provides the sequence of
         indexes for an inner join.
         """
-        kcs = self._key_columns
-        for i in self._indices_func():
-            key = tuple(key[i] for key in kcs)
+        for i, ji in self._iter_matches():
+            if ji is not None:
+                yield i, ji
+
+    def _iter_matches(self):
+        """Generator function giving the index of every row in this table
+        together with the index of its match in the joined table, or None.
+
+        If every key column is dictionary-encoded then each distinct
+        combination of codes is looked up in the join index only once.
+        """
+        kcs = self._left_key_columns
+        if not all(hasattr(c, 'encoded') for c in kcs):
+            for i in self._left_indices_func():
+                yield i, self._match(tuple(key[i] for key in kcs))
+            return
+
+        encoded = [c.encoded for c in kcs]
+        decoders = [c.decode for c in kcs]
+        matches = {}
+        for i in self._left_indices_func():
+            codes = tuple(e[i] for e in encoded)
             try:
-                yield i, self._join_index.index(key)[0]
+                ji = matches[codes]
             except KeyError:
-                pass
+                ji = matches[codes] = self._match(
+                    tuple(d(c) for d, c in six.moves.zip(decoders, codes))
+                )
+            yield i, ji
+
+    def _match(self, key):
+        """Get the index of the first row of the joined table
+        with the given key, or None."""
+        if None in key:  # Missing keys never match
+            return None
+        try:
+            return self._join_index.index(key)[0]
+        except KeyError:
+            return None
+
+    def _kept_rows(self):
+        """The kept (left, joined) positions of each row, or None if
+        they are out of date."""
+        rows = self._rows
+        if rows is not None and rows[0] == self._version():
+            return rows[1:]
+        return None
+
+    def _pairs(self):
+        """The (left, joined) positions of each row, which are kept if
+        the caller reads all of them."""
+        rows = self._kept_rows()
+        if rows is not None:
+            return six.moves.zip(*rows)
+        version = self._version()
+        pairs = self.get_indeces_function()()
+        if version is None:
+            return pairs
+        return self._record_pairs(pairs, version)
+
+    def _record_pairs(self, pairs, version):
+        left = array.array(INT64_TYPECODE)
+        right = []
+        for i, ji in pairs:
+            left.append(i)
+            right.append(ji)
+            yield i, ji
+        self._rows = version, left, right
+
+    def _indices_func(self):
+        rows = self._kept_rows()
+        if rows is not None:
+            return six.moves.range(len(rows[0]))
+        return (k for k, _ in enumerate(self._pairs()))
+
+    def _row_plan(self):
+        return Scan(self)
+
+    def _kept_indices(self):
+        rows = self._kept_rows()
+        return None if rows is None else six.moves.range(len(rows[0]))
+
+    def explain(self):
+        return Table.explain(self)
+
+    def _left_indices(self):
+        rows = self._kept_rows()
+        if rows is not None:
+            return rows[0]
+        return (i for i, _ in self._pairs())
 
     def _join_indices_func(self):
         """Generator function giving only the sequence
         of indices in the joined columns
         """
-        for _, ji in self.get_indeces_function()():
-            yield ji
+        rows = self._kept_rows()
+        if rows is not None:
+            return rows[1]
+        return (ji for _, ji in self._pairs())
 
     def get_indeces_function(self):
         try:
@@ -755,15 +1818,37 @@ class JoinTable(DerivedTable):
     def _get_column(self, name):
         """Get a single Column object by name. Columns are list-like sequences.
         """
-        for c in self._columns + self._join_columns:
+        for c in self._columns:
             if c.name == name:
                 return c
         raise KeyError(name)
 
+    _get_base_column = _get_column
+
+    def _memory_usage(self, deep):
+        for row in DerivedTable._memory_usage(self, deep):
+            yield row
+        index = self._join_index
+        yield 'index', str(index), index.memory_usage(deep), True
+
+    def _view_memory_usage(self):
+        rows = self._rows
+        return DerivedTable._view_memory_usage(self) + (
+            0 if rows is None else
+            sys.getsizeof(rows[1]) + sys.getsizeof(rows[2])
+        )
+
     @property
     def _key_columns(self):
         return [self._get_column(k) for k in self._keys]
 
+    @property
+    def _left_key_columns(self):
+        """The key columns of the left table, indexed by the positions
+        that _left_indices_func gives."""
+        columns = dict((c.name, c) for c in self._left_columns)
+        return [columns[k] for k in self._keys]
+
     @property
     def _join_columns(self):
         all_keys = set(self._keys + self._other_keys)
@@ -776,7 +1861,7 @@ class JoinTable(DerivedTable):
     def column_names(self):
         """Get the table's column names as a list of strings.
         """
-        return [c.name for c in (self._left_columns + self._join_columns)]
+        return [c.name for c in self._columns]
 
     @property
     def schema(self):
@@ -793,17 +1878,21 @@ class JoinTable(DerivedTable):
         return s
 
     def __getitem__(self, key):
-        cs = self._left_columns
-        jcs = self._join_columns
+        if isinstance(key, slice):
+            return Table.__getitem__(self, key)
 
-        try:
-            i, ji = next(itertools.islice(
-                self.get_indeces_function()(), key, key + 1))
-        except StopIteration:
-            raise IndexError(key)
+        rows = self._kept_rows()
+        if rows is None:
+            rows = list(six.moves.zip(*self._pairs())) or [[], []]
+        i, ji = rows[0][key], rows[1][key]
+        return self._make_row(
+            i, ji, self._tablerow_schema(),
+            self._left_columns, self._join_columns)
 
-        s = dict((c.name, i) for i, c in enumerate(self._columns))
+    def get_row(self, key):
+        return self[key]
 
+    def _make_row(self, i, ji, s, cs, jcs):
         if ji is None:  # Literally none!
             r = itertools.chain(
                 (c[i] for c in cs),
@@ -819,18 +1908,6 @@ class JoinTable(DerivedTable):
     def __iter__(self):
         cs = self._left_columns
         jcs = self._join_columns
-        kcs = self._key_columns
-        fn_i = self.get_indeces_function()
-        s = dict((c.name, i) for i, c in enumerate(self._columns))
-        for i, ji in fn_i():
-            if ji is None:  # Literally none!
-                r = itertools.chain(
-                    (c[i] for c in cs),
-                    (None for jc in jcs)
-                )
-            else:
-                r = itertools.chain(
-                    (c[i] for c in cs),
-                    (jc._column[ji] for jc in jcs)
-                )
-            yield TableRow(r, s)
+        s = self._tablerow_schema()
+        for i, ji in self._pairs():
+            yield self._make_row(i, ji, s, cs, jcs)
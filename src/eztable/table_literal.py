@@ -1,7 +1,10 @@
+import datetime
+import decimal
 import re
 from eztable.table import Table
+from eztable.exceptions import InvalidData
 
-EXP_COLUMN = re.compile("([^\(]+)(\s*\(([a-zA-Z0-9\.]+)\))?")
+EXP_COLUMN = re.compile("([^\(]+)(\s*\(([a-zA-Z0-9\.:]+)\))?")
 
 
 def parse_column_string(cs):
@@ -17,10 +20,27 @@ def import_something(path):
     return mod
 
 
+# Type names which stand for a type stored in a particular way
+TYPE_ALIASES = {
+    'timestamp': (datetime.datetime, 'timestamp'),
+}
+
+# Type names with a parameter, e.g. fixed:2 for decimals with two
+# digits after the point
+PARAMETERISED_TYPE_ALIASES = {
+    'fixed': decimal.Decimal,
+}
+
+
 def col_tuple_to_schema_item(ct, default_type):
     name, typestr = ct
     if not typestr:
         return name, default_type
+    if typestr in TYPE_ALIASES:
+        return (name,) + TYPE_ALIASES[typestr]
+    prefix, _, parameter = typestr.partition(':')
+    if parameter and prefix in PARAMETERISED_TYPE_ALIASES:
+        return name, PARAMETERISED_TYPE_ALIASES[prefix], typestr
     if len(typestr) == 1:
         return name, typestr  # Array
     modpath, _, classname = typestr.rpartition('.')
@@ -68,7 +88,9 @@ def table_literal(repr_string, default_type=str):
 
     The type column can be any importable object or function
     capable of building the contents of the column from the 
-    string values of each element in the column.
+    string values of each element in the column. The type name
+    timestamp gives a column of datetimes, and fixed:<n> a column of
+    Decimals with n digits after the point, both stored as integers.
 
     :param repr_string: table definition
     :type repr_string: str
@@ -80,13 +102,27 @@ def table_literal(repr_string, default_type=str):
                               for h in next(rows_iter)]
 
     t = Table(column_names_and_types)
-    fns = [c.fn_from_string() for c in t._columns]
-
-    def process_row(lst_row):
-        for ty, val in zip(fns, lst_row):
-            yield ty(val)
-
-    data = (list(process_row(row)) for row in rows_iter)
-    t.extend(data)
-
-    return t
+    rows = list(rows_iter)
+    if not rows:
+        return t
+    for row in rows:
+        if len(row) != len(t._columns):
+            raise InvalidData(
+                "Expected %d columns, got %d" % (len(t._columns), len(row)))
+    strings = list(zip(*rows))
+    return Table.from_columns(
+        column_names_and_types,
+        [parse_column(c, s) for c, s in zip(t._columns, strings)],
+        validate=True
+    )
+
+
+def parse_column(column, strings):
+    """Convert a column's strings into its values. Columns which can
+    parse strings straight into their own storage (e.g. fixed decimal
+    columns) return a column of the same kind, which is adopted by
+    the new table as it is."""
+    if hasattr(column, 'parse_strings'):
+        return column.parse_strings(strings)
+    fn = column.fn_from_string()
+    return [fn(s) for s in strings]
@@ -48,6 +48,45 @@ class TestArrayColumn(unittest.TestCase):
         c.append(u'j')
         self.assertEqual(c.description, 'foo (u)')
 
+    def test_array_column_none(self):
+        c = ArrayColumn(name='foo', column_type='i', values=[1, None, 3])
+        c.append(None)
+        c.append(5)
+        self.assertEqual(list(c), [1, None, 3, None, 5])
+        self.assertEqual(c[1], None)
+        self.assertEqual(c[-1], 5)
+        self.assertEqual(c[-2], None)
+        self.assertEqual(c[1:3], [None, 3])
+        self.assertEqual(c.null_count, 2)
+
+    def test_array_column_none_keeps_typed_buffer(self):
+        c = ArrayColumn(name='foo', column_type='d', values=[1.5, None])
+        self.assertIsInstance(c, array.array)
+        self.assertEqual(array.array.__getitem__(c, 1), 0.0)
+
+    def test_array_column_without_nones_has_no_bitmap(self):
+        c = ArrayColumn(name='foo', column_type='i', values=[1, 2, 3])
+        self.assertIsNone(c._validity)
+        self.assertEqual(c.null_count, 0)
+
+    def test_array_column_extend_mixed(self):
+        c = ArrayColumn(name='foo', column_type='i', values=[1])
+        c.extend(array.array('i', [2, 3]))
+        c.extend([None, 4])
+        c.extend(ArrayColumn(name='bar', column_type='i', values=[None, 6]))
+        c.extend([7])
+        self.assertEqual(list(c), [1, 2, 3, None, 4, None, 6, 7])
+
+    def test_array_column_failed_extend_is_atomic(self):
+        c = ArrayColumn(name='foo', column_type='b', values=[1])
+        with self.assertRaises(OverflowError):
+            c.extend([None, 2, 1000])
+        self.assertEqual(list(c), [1])
+
+    def test_array_column_unicode_none(self):
+        c = ArrayColumn(name='foo', column_type='u', values=[u'a', None])
+        self.assertEqual(list(c), [u'a', None])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+from eztable import Table, TableTestMixin
+
+
+class TestArrayNulls(TableTestMixin, unittest.TestCase):
+
+    """Missing values in array columns stay in the typed
+    buffer, but behave like None everywhere else."""
+
+    def setUp(self):
+        self.t = Table([('A', 'i'), ('B', 'd'), ('C', str)])
+        self.t.extend([
+            (1, 1.5, 'x'),
+            (None, 2.5, 'y'),
+            (2, None, 'z'),
+            (None, 3.5, 'x'),
+        ])
+
+    def test_rows(self):
+        self.assertEqual(
+            list(self.t),
+            [(1, 1.5, 'x'), (None, 2.5, 'y'), (2, None, 'z'), (None, 3.5, 'x')]
+        )
+
+    def test_placeholders_are_not_values(self):
+        from eztable.columns import ArrayColumn
+        c = ArrayColumn('A', [None, None], 'i')
+        self.assertFalse(0 in c)
+        self.assertTrue(None in c)
+        self.assertEqual(c.tolist(), [None, None])
+        self.assertEqual(c.count(0), 0)
+        self.assertEqual(c.count(None), 2)
+        with self.assertRaises(ValueError):
+            c.index(0)
+        self.assertNotEqual(c, ArrayColumn('A', [0, 0], 'i'))
+        self.assertEqual(c, ArrayColumn('B', [None, None], 'i'))
+        a = self.t._get_column('A')
+        self.assertEqual(a.index(2), 2)
+        self.assertEqual(a.index(None), 1)
+        self.assertEqual(ArrayColumn('A', [3, 4], 'i').index(4), 1)
+
+    def test_restrict(self):
+        r = self.t.restrict(['A'], lambda a: a is None)
+        self.assertEqual(list(r.C), ['y', 'x'])
+
+    def test_aggregate_groups_missing_values(self):
+        agg = self.t.aggregate(
+            keys=('A',),
+            aggregations=[('Count', int, len)]
+        )
+        self.assertEqual(
+            sorted(agg, key=lambda r: (r[0] is not None, r[0])),
+            [(None, 2), (1, 1), (2, 1)]
+        )
+
+    def test_index_keeps_missing_values_aside(self):
+        i = self.t.add_index(['A']).reindex()
+        self.assertEqual(len(i), 2)
+        self.assertEqual(i.index((None,)), [1, 3])
+        self.t.append((None, 4.5, 'w'))
+        self.assertEqual(i.index((None,)), [1, 3, 4])
+
+    def test_missing_keys_do_not_match_in_left_join(self):
+        other = Table([('A', 'i'), ('D', str)])
+        other.extend([(1, 'one'), (None, 'missing')])
+        j = self.t.left_join(keys=('A',), other=other)
+        self.assertEqual(list(j.D), ['one', None, None, None])
+
+    def test_missing_keys_do_not_match_in_inner_join(self):
+        other = Table([('A', 'i'), ('D', str)])
+        other.extend([(1, 'one'), (2, 'two'), (None, 'missing')])
+        j = self.t.inner_join(keys=('A',), other=other)
+        self.assertEqual(list(j), [(1, 1.5, 'x', 'one'), (2, None, 'z', 'two')])
+
+    def test_copy(self):
+        self.assertTablesEqual(self.t.copy(), self.t)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+from eztable import Table, TableTestMixin
+from eztable.bitmap import Bitmap
+from eztable.columns import BitColumn, Column
+
+
+class TestBitColumn(unittest.TestCase):
+
+    def setUp(self):
+        self.values = [True, False, True, None, False, True, True, False, True]
+        self.c = BitColumn('A', self.values)
+
+    def test_values(self):
+        self.assertEqual(list(self.c), self.values)
+        for i, v in enumerate(self.values):
+            self.assertIs(self.c[i], v)
+        self.assertEqual(self.c[2:6], self.values[2:6])
+        self.assertIs(self.c[-1], True)
+
+    def test_counts(self):
+        self.assertEqual(self.c.count(), 5)
+        self.assertEqual(self.c.count(False), 3)
+        self.assertEqual(self.c.count(None), 1)
+        self.assertEqual(self.c.null_count, 1)
+
+    def test_no_validity_without_nulls(self):
+        c = BitColumn('A', [True, False])
+        self.assertIsNone(c._validity)
+        c.append(None)
+        self.assertEqual(list(c), [True, False, None])
+
+    def test_operators(self):
+        other = BitColumn('B', [False, False, True, True, True, None, True, True, False])
+        self.assertEqual(
+            list((self.c & other).positions()), [2, 6])
+        self.assertEqual(
+            list((self.c | other).positions()), [0, 2, 3, 4, 5, 6, 7, 8])
+        # Missing values are neither True nor False
+        self.assertEqual(list((~self.c).positions()), [1, 4, 7])
+
+    def test_memory(self):
+        values = [True, False] * 4000
+        c = BitColumn('A', values)
+        self.assertLess(c.memory_usage() * 40, Column('A', values).memory_usage())
+
+
+class TestBitTable(TableTestMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.s = [('Name', str), ('Shiny', bool), ('Legendary', bool)]
+        self.rows = [
+            ('n%d' % i, i % 2 == 0, i % 3 == 0) for i in range(30)
+        ]
+        self.t = Table(self.s, self.rows, storage='compact')
+
+    def test_storage(self):
+        self.assertIsInstance(self.t._get_column('Shiny'), BitColumn)
+        t = Table([('F', bool, 'bits'), ('G', int, 'bits')])
+        self.assertIsInstance(t._get_column('F'), BitColumn)
+        self.assertNotIsInstance(t._get_column('G'), BitColumn)
+
+    def test_restrict_mask(self):
+        r = self.t.restrict_mask(self.t.Shiny & ~self.t.Legendary)
+        expected = self.t.restrict(
+            ['Shiny', 'Legendary'], lambda s, l: s and not l)
+        self.assertTablesEqual(r, expected)
+
+    def test_restrict_mask_on_derived_table(self):
+        d = self.t[10:20]
+        mask = Bitmap([i % 4 == 0 for i in range(10)])
+        self.assertEqual(
+            [r.Name for r in d.restrict_mask(mask)], ['n10', 'n14', 'n18'])
+
+    def test_restrict_mask_with_a_list(self):
+        mask = [True, False, False] * 10
+        self.assertEqual(len(self.t.restrict_mask(mask)), 10)
+
+    def test_restrict_mask_of_wrong_length(self):
+        with self.assertRaises(ValueError):
+            self.t.restrict_mask([True] * 31)
+        with self.assertRaises(ValueError):
+            self.t.restrict_mask(Bitmap([True] * 29))
+        with self.assertRaises(ValueError):
+            self.t[10:20].restrict_mask([True] * 20)
+
+    def test_copy_keeps_storage(self):
+        self.assertIsInstance(self.t.copy()._get_column('Shiny'), BitColumn)
+
+    def test_invalid(self):
+        with self.assertRaises(Exception):
+            self.t.append(('x', 1, True))
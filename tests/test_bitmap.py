@@ -0,0 +1,85 @@
+import unittest
+from eztable.bitmap import Bitmap, RunBitmap
+
+
+class TestBitmap(unittest.TestCase):
+
+    def setUp(self):
+        self.a = [True, False, True, True, False, False, True, False, True, True, False]
+        self.b = [False, False, True, False, True, False, True, True, True, False, False]
+
+    def test_extend(self):
+        for n in range(len(self.a)):
+            m = Bitmap(self.a[:n])
+            m.extend(self.b)
+            self.assertEqual(list(m), self.a[:n] + self.b)
+
+    def test_operators(self):
+        a, b = Bitmap(self.a), Bitmap(self.b)
+        pairs = list(zip(self.a, self.b))
+        self.assertEqual(list(a & b), [x and y for x, y in pairs])
+        self.assertEqual(list(a | b), [x or y for x, y in pairs])
+        self.assertEqual(list(a ^ b), [x != y for x, y in pairs])
+        self.assertEqual(list(~a), [not x for x in self.a])
+        self.assertEqual((~a).count(), self.a.count(False))
+
+    def test_mismatched_lengths(self):
+        with self.assertRaises(ValueError):
+            Bitmap([True]) & Bitmap([True, False])
+
+    def test_positions(self):
+        m = Bitmap(self.a)
+        positions = [i for i, v in enumerate(self.a) if v]
+        self.assertEqual(list(m.positions()), positions)
+        self.assertEqual(Bitmap.from_positions(positions, len(self.a)), m)
+
+    def test_count(self):
+        m = Bitmap(self.a)
+        self.assertEqual(m.count(), 6)
+        self.assertEqual(m.count(False), 5)
+        self.assertTrue(m.any())
+        self.assertFalse(Bitmap([False] * 20).any())
+
+    def test_empty(self):
+        m = Bitmap()
+        self.assertEqual(list(~m), [])
+        self.assertEqual(m.count(), 0)
+        self.assertEqual(list(m.positions()), [])
+
+
+class TestRunBitmap(unittest.TestCase):
+
+    def setUp(self):
+        self.bits = [False] * 3 + [True] * 14 + [False] * 9 + [True] + [False, True] * 4
+
+    def test_from_positions(self):
+        positions = [i for i, v in enumerate(self.bits) if v]
+        r = RunBitmap.from_positions(positions, len(self.bits) + 5)
+        self.assertEqual(r.runs, 6)
+        self.assertEqual(list(r.positions()), positions)
+        self.assertEqual(r.bitmap(), Bitmap(self.bits + [False] * 5))
+        self.assertEqual(r.count(), len(positions))
+        self.assertEqual(r.count(False), len(self.bits) + 5 - len(positions))
+
+    def test_append(self):
+        r = RunBitmap()
+        for v in self.bits:
+            r.append(v)
+        r.fill(True, 20)
+        r.fill(False, 3)
+        self.assertEqual(r.runs, 6)
+        self.assertEqual(list(r.bitmap()), self.bits + [True] * 20 + [False] * 3)
+
+    def test_runs_across_bytes(self):
+        for start in range(10):
+            for stop in range(start, 30):
+                r = RunBitmap.from_positions(range(start, stop), 30)
+                expected = [start <= i < stop for i in range(30)]
+                self.assertEqual(list(r.bitmap()), expected)
+
+    def test_empty(self):
+        r = RunBitmap()
+        self.assertEqual(r.bitmap(), Bitmap())
+        self.assertEqual(r.count(), 0)
+        self.assertEqual(r.nbytes, 0)
+
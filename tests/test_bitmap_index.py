@@ -0,0 +1,129 @@
+import unittest
+
+from eztable import Table, InvalidIndex, col
+from eztable.bitmap import Bitmap, RunBitmap
+from eztable.index import BitmapIndex
+
+
+class TestBitmapIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.t = Table([('Type', str), ('Region', str), ('Level', int)])
+        self.t.extend([
+            ('Water', 'Kanto', 10),
+            ('Fire', 'Johto', 20),
+            ('Water', 'Johto', 30),
+            ('Grass', 'Kanto', 40),
+            (None, 'Kanto', 50),
+            ('Fire', 'Kanto', 60),
+        ])
+        self.types = self.t.add_index(['Type'], kind='bitmap').reindex()
+        self.regions = self.t.add_index(['Region'], kind='bitmap').reindex()
+
+    def levels(self, t):
+        return [r.Level for r in t]
+
+    def test_kind(self):
+        self.assertIsInstance(self.types, BitmapIndex)
+        self.assertIs(self.t.add_index(['Type'], kind='bitmap'), self.types)
+        self.assertIsNot(self.t.add_index(['Type']), self.types)
+        with self.assertRaises(InvalidIndex):
+            self.t.add_index(['Type'], kind='hash')
+
+    def test_bitmaps(self):
+        self.assertEqual(self.types.bitmap('Water'), Bitmap([1, 0, 1, 0, 0, 0]))
+        self.assertEqual(self.types.bitmap(None), Bitmap([0, 0, 0, 0, 1, 0]))
+        self.assertEqual(self.types.bitmap('Ice'), Bitmap([0] * 6))
+        self.assertEqual(
+            self.types.any_of(['Fire', 'Grass']), Bitmap([0, 1, 0, 1, 0, 1]))
+        self.assertEqual(self.types.index('Fire'), [1, 5])
+        self.assertEqual(len(self.types), 4)
+
+    def test_follows_appends(self):
+        self.t.append(('Water', 'Hoenn', 70))
+        self.t.extend([('Ice', 'Hoenn', 80), ('Fire', 'Hoenn', 90)])
+        self.assertEqual(self.types.index('Water'), [0, 2, 6])
+        self.assertEqual(len(self.types.bitmap('Grass')), 9)
+        self.assertEqual(self.regions.index('Hoenn'), [6, 7, 8])
+
+    def test_restrict(self):
+        r = self.t.restrict(
+            ((col('Type') == 'Water') | (col('Type') == 'Fire')) &
+            (col('Region') == 'Kanto'))
+        self.assertTrue(r.explain().startswith('Index'))
+        self.assertTrue(r.explain().endswith(' on Region (bitmap), Type (bitmap)'))
+        self.assertEqual(r._row_plan().indexes, [self.regions, self.types])
+        self.assertEqual(self.levels(r), [10, 60])
+
+    def test_not_and_missing_values(self):
+        r = self.t.restrict(~(col('Type') == 'Water') & (col('Type') != 'Fire'))
+        self.assertEqual(self.levels(r), [40, 50])
+        r = self.t.restrict(col('Type').is_none())
+        self.assertEqual(self.levels(r), [50])
+
+    def test_negation_is_not_logical_not(self):
+        water = col('Type') == 'Water'
+        plain = Table(self.t.schema, self.t)
+        for e in [-water, ~water, ~-water, -water & (col('Region') == 'Kanto'),
+                  ~col('Type').is_none(), -(col('Region') != 'Kanto')]:
+            self.assertEqual(
+                self.levels(self.t.restrict(e)), self.levels(plain.restrict(e)))
+        self.assertTrue(self.t.restrict(-water).explain().startswith('Filter'))
+        self.assertEqual(self.levels(self.t.restrict(-water)), [10, 30])
+        self.assertEqual(self.levels(self.t.restrict(~water)), [20, 40, 50, 60])
+
+    def test_rest_of_expression_is_tested_by_row(self):
+        r = self.t.restrict((col('Region') == 'Kanto') & (col('Level') > 30))
+        self.assertTrue(r.explain().startswith('Filter (Level > 30)'))
+        self.assertEqual(self.levels(r), [40, 50, 60])
+
+    def test_unanswerable_expression(self):
+        r = self.t.restrict((col('Type') == 'Fire') | (col('Level') < 20))
+        self.assertTrue(r.explain().startswith('Filter'))
+        self.assertEqual(self.levels(r), [10, 20, 60])
+
+    def test_where(self):
+        r = self.t.where(Type='Fire', Region='Kanto')
+        self.assertTrue(r.explain().startswith('Index'))
+        self.assertEqual(self.levels(r), [60])
+
+    def test_compression(self):
+        t = Table([('Region', str), ('Parity', int)])
+        regions = ['Kanto', 'Johto', 'Hoenn', 'Sinnoh']
+        t.extend((regions[i // 5000], i % 2) for i in range(20000))
+        index = t.add_index(['Region'], kind='bitmap').reindex()
+        parity = t.add_index(['Parity'], kind='bitmap').reindex()
+        for bitmap in index.bitmaps.values():
+            self.assertIsInstance(bitmap, RunBitmap)
+            self.assertEqual(bitmap.runs, 1)
+        for bitmap in parity.bitmaps.values():
+            self.assertIsInstance(bitmap, Bitmap)
+        # The whole index is smaller than one uncompressed bitmap.
+        self.assertLess(index.memory_usage(), 20000 // 8)
+        self.assertGreater(parity.memory_usage(), 2 * 20000 // 8)
+        self.assertEqual(index.index('Hoenn'), list(range(10000, 15000)))
+        self.assertEqual(
+            index.bitmap('Johto'),
+            Bitmap.from_positions(range(5000, 10000), 20000))
+
+    def test_compression_follows_appends(self):
+        t = Table([('Parity', int)])
+        index = t.add_index(['Parity'], kind='bitmap')
+        t.extend((i % 2,) for i in range(20))
+        self.assertIsInstance(index.bitmaps[(0,)], RunBitmap)
+        t.extend((i % 2,) for i in range(10000))
+        self.assertIsInstance(index.bitmaps[(0,)], Bitmap)
+        t.extend([(0,)] * 3)
+        self.assertEqual(index.index(0)[-5:], [10016, 10018, 10020, 10021, 10022])
+        self.assertEqual(index.bitmap(1).count(), 5010)
+
+    def test_memory_usage(self):
+        report = dict(
+            (r.Name, r.Bytes) for r in self.t.memory_usage()
+            if r.Kind == 'index')
+        self.assertIn('Type (bitmap)', report)
+        self.assertGreater(report['Type (bitmap)'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
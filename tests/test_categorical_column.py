@@ -0,0 +1,130 @@
+import unittest
+from eztable import Table, table_literal, TableTestMixin
+from eztable.columns import CategoricalColumn, Categories
+
+
+class TestCategoricalColumn(unittest.TestCase):
+
+    def test_values_are_encoded(self):
+        c = CategoricalColumn('A', ['x', 'y', 'x', 'x'], column_type=str)
+        self.assertEqual(list(c), ['x', 'y', 'x', 'x'])
+        self.assertEqual(list(c.codes), [0, 1, 0, 0])
+        self.assertEqual(c.categories.values, ['x', 'y'])
+        self.assertEqual(c[1], 'y')
+        self.assertEqual(c[-1], 'x')
+        self.assertEqual(c[1:3], ['y', 'x'])
+        self.assertEqual(len(c), 4)
+
+    def test_codes_are_small(self):
+        c = CategoricalColumn('A', ['x'], column_type=str)
+        self.assertEqual(c.codes.itemsize, 2)
+
+    def test_codes_are_widened(self):
+        c = CategoricalColumn('A', range(70000), column_type=int)
+        c.append(3)
+        self.assertEqual(c[69999], 69999)
+        self.assertEqual(c[-1], 3)
+        self.assertEqual(len(c), 70001)
+
+    def test_none(self):
+        c = CategoricalColumn('A', ['x', None], column_type=str)
+        c.append(None)
+        self.assertEqual(list(c), ['x', None, None])
+        self.assertEqual(len(c.categories), 1)
+
+    def test_shared_categories(self):
+        cats = Categories()
+        a = CategoricalColumn('A', ['x', 'y'], categories=cats)
+        b = CategoricalColumn('B', ['y', 'z'], categories=cats)
+        self.assertEqual(list(a.codes), [0, 1])
+        self.assertEqual(list(b.codes), [1, 2])
+
+    def test_description(self):
+        c = CategoricalColumn('A', column_type=str)
+        self.assertEqual(c.description, 'A (str)')
+
+
+class TestCategoricalTable(TableTestMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.s = [
+            ('Attack', str),
+            ('Pokemon', str, 'category'),
+            ('Level Obtained', int),
+            ('Attack Type', str, 'category'),
+        ]
+        self.plain = table_literal("""
+            | Attack (str)  | Pokemon (str)  | Level Obtained (int) | Attack Type (str) |
+            | Thunder Shock | Pikachu        | 1                    | Electric          |
+            | Tackle        | Pikachu        | 1                    | Normal            |
+            | Tail Whip     | Pikachu        | 1                    | Normal            |
+            | Ember         | Charmander     | 1                    | Fire              |
+            | Growl         | Pikachu        | 5                    | Normal            |
+            | Scratch       | Charmander     | 1                    | Normal            |
+        """)
+        self.t = Table(self.s, self.plain)
+
+    def test_category_storage(self):
+        self.assertIsInstance(self.t._get_column('Pokemon'), CategoricalColumn)
+        self.assertEqual(self.t.schema, self.plain.schema)
+        self.assertTablesEqual(self.t, self.plain)
+
+    def test_table_wide_category_storage(self):
+        t = Table(self.plain.schema, self.plain, storage='category')
+        self.assertIsInstance(t._get_column('Attack'), CategoricalColumn)
+        self.assertTablesEqual(t, self.plain)
+
+    def test_index(self):
+        i = self.t.add_index(['Pokemon', 'Attack Type']).reindex()
+        self.assertEqual(i.index(('Pikachu', 'Normal')), [1, 2, 4])
+        self.assertEqual(
+            list(i.keys()),
+            sorted(set(zip(
+                self.plain.Pokemon,
+                self.plain._get_column('Attack Type')
+            )))
+        )
+
+    def test_aggregate(self):
+        agg = self.t.aggregate(
+            keys=('Pokemon', 'Attack Type'),
+            aggregations=[('Count', int, len)]
+        )
+        expected = table_literal("""
+            | Pokemon (str) | Attack Type (str) | Count (int) |
+            | Pikachu       | Normal            | 3           |
+            | Pikachu       | Electric          | 1           |
+            | Charmander    | Normal            | 1           |
+            | Charmander    | Fire              | 1           |
+        """)
+        self.assertTablesEqualAnyOrder(agg, expected)
+
+    def test_join_looks_up_each_code_once(self):
+        types = Table([('Attack Type', str), ('Strong Against', str)], [
+            ('Electric', 'Water'),
+            ('Fire', 'Grass'),
+        ])
+        j = self.t.left_join(keys=('Attack Type',), other=types)
+
+        lookups = []
+        index = j._join_index
+        original = index.index
+
+        def counting_index(key):
+            lookups.append(key)
+            return original(key)
+        index.index = counting_index
+
+        self.assertEqual(
+            list(j._iter_matches()),
+            [(0, 0), (1, None), (2, None), (3, 1), (4, None), (5, None)]
+        )
+        self.assertEqual(len(lookups), 3)
+        self.assertEqual(
+            list(j._get_column('Strong Against')),
+            ['Water', None, None, 'Grass', None, None]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 import unittest
-from eztable.columns import Column
+import six
+from eztable.columns import Column, range_span
 
 
 class TestColumn(unittest.TestCase):
@@ -20,5 +21,17 @@ class TestColumn(unittest.TestCase):
         self.assertEqual(list(c), [0, 1, 2])
 
 
+class TestRangeSpan(unittest.TestCase):
+
+    def test_range_span(self):
+        r = six.moves.range
+        self.assertEqual(range_span(r(3, 7)), (3, 7))
+        self.assertEqual(range_span(r(5)), (0, 5))
+        self.assertEqual(range_span(r(4, 5)), (4, 5))
+        self.assertEqual(range_span(r(3, 3)), (0, 0))
+        self.assertEqual(range_span(r(0, 10, 2)), None)
+        self.assertEqual(range_span([0, 1, 2]), None)
+
+
 if __name__ == '__main__':
     unittest.main()
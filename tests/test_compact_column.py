@@ -0,0 +1,119 @@
+import unittest
+import array
+from eztable import Table, InvalidColumn
+from eztable.columns import Column, CompactColumn
+
+
+class TestCompactColumn(unittest.TestCase):
+
+    def test_ints_are_stored_in_an_array(self):
+        c = CompactColumn('A', [1, 2, 3], column_type=int)
+        self.assertTrue(c.is_compact)
+        self.assertEqual(list(c), [1, 2, 3])
+        self.assertEqual(c[1], 2)
+        self.assertEqual(len(c), 3)
+
+    def test_floats_are_stored_in_an_array(self):
+        c = CompactColumn('B', [1.5, 2.5], column_type=float)
+        self.assertTrue(c.is_compact)
+        self.assertEqual(c._values.typecode, 'd')
+
+    def test_nones_are_kept_after_fall_back(self):
+        c = CompactColumn('A', [1, None], column_type=int)
+        c.append(2 ** 70)
+        self.assertFalse(c.is_compact)
+        self.assertEqual(list(c), [1, None, 2 ** 70])
+
+    def test_none_stays_compact(self):
+        c = CompactColumn('A', [1, 2], column_type=int)
+        c.append(None)
+        c.extend([3, None])
+        self.assertTrue(c.is_compact)
+        self.assertEqual(list(c), [1, 2, None, 3, None])
+        self.assertEqual(c.null_count, 2)
+
+    def test_out_of_range_falls_back_to_objects(self):
+        c = CompactColumn('A', [1, 2], column_type=int)
+        c.extend([3, 2 ** 70])
+        self.assertFalse(c.is_compact)
+        self.assertEqual(list(c), [1, 2, 3, 2 ** 70])
+
+    def test_subclasses_fall_back_to_objects(self):
+        c = CompactColumn('A', [1], column_type=int)
+        c.append(True)
+        self.assertFalse(c.is_compact)
+        self.assertIs(c[1], True)
+
+    def test_description(self):
+        c = CompactColumn('A', column_type=int)
+        self.assertEqual(c.description, 'A (int)')
+
+
+class TestCompactStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.s = [
+            ('A', int),
+            ('B', float),
+            ('C', str),
+        ]
+        self.rows = [
+            (1, 1.5, 'x'),
+            (2, 2.5, 'y'),
+        ]
+
+    def test_object_storage_is_the_default(self):
+        t = Table(self.s)
+        self.assertIsInstance(t._get_column('A'), Column)
+
+    def test_compact_storage(self):
+        t = Table(self.s, self.rows, storage='compact')
+        self.assertIsInstance(t._get_column('A'), CompactColumn)
+        self.assertIsInstance(t._get_column('B'), CompactColumn)
+        self.assertIsInstance(t._get_column('C'), Column)
+        self.assertEqual(list(t), self.rows)
+
+    def test_schema_is_unchanged(self):
+        t = Table(self.s, storage='compact')
+        self.assertEqual(t.schema, self.s)
+        self.assertEqual(t, Table(self.s))
+
+    def test_per_column_storage(self):
+        t = Table([('A', int, 'compact'), ('B', int)])
+        self.assertIsInstance(t._get_column('A'), CompactColumn)
+        self.assertIsInstance(t._get_column('B'), Column)
+
+    def test_unknown_storage(self):
+        with self.assertRaises(InvalidColumn):
+            Table(self.s, storage='telepathic')
+
+    def test_compact_table_accepts_none(self):
+        t = Table(self.s, self.rows, storage='compact')
+        t.append((None, 3.5, 'z'))
+        self.assertEqual(list(t.A), [1, 2, None])
+        self.assertTrue(t._get_column('A').is_compact)
+
+    def test_copy_keeps_storage(self):
+        t = Table(self.s, self.rows, storage='compact')
+        c = t.restrict(['A'], lambda a: a > 1).copy()
+        self.assertIsInstance(c._get_column('A'), CompactColumn)
+        self.assertEqual(list(c), self.rows[1:])
+
+    def test_index_on_compact_columns(self):
+        t = Table(self.s, self.rows, storage='compact')
+        i = t.add_index(['A']).reindex()
+        t.extend([(3, 3.5, 'z')])
+        self.assertEqual(i.index((3,)), [2])
+
+    def test_from_columns_with_arrays(self):
+        t = Table.from_columns(
+            self.s,
+            [array.array('q', [1, 2]), [1.5, 2.5], ['x', 'y']],
+            storage='compact'
+        )
+        self.assertTrue(t._get_column('A').is_compact)
+        self.assertEqual(list(t), self.rows)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+from eztable import Table, TableTestMixin
+from eztable.columns import CompressedColumn, LzmaCompressedColumn
+
+
+class SmallBlocks(CompressedColumn):
+    BLOCK_SIZE = 4
+    CACHE_SIZE = 2
+
+
+class TestCompressedColumn(unittest.TestCase):
+
+    def setUp(self):
+        self.values = ['v%d' % i for i in range(10)] + [None, 'last']
+        self.c = SmallBlocks('A', self.values, column_type=str)
+
+    def test_blocks(self):
+        self.assertEqual(len(self.c.blocks), 3)
+        self.assertEqual(len(self.c), 12)
+        self.c.append('more')
+        self.assertEqual(len(self.c.blocks), 3)
+        self.assertEqual(self.c[-1], 'more')
+
+    def test_values(self):
+        self.assertEqual(list(self.c), self.values)
+
+    def test_random_access(self):
+        for i, v in enumerate(self.values):
+            self.assertEqual(self.c[i], v)
+        self.assertEqual(self.c[-2], None)
+        with self.assertRaises(IndexError):
+            self.c[12]
+        with self.assertRaises(IndexError):
+            self.c[-13]
+
+    def test_slices(self):
+        for start in range(13):
+            for stop in range(start, 13):
+                self.assertEqual(self.c[start:stop], self.values[start:stop])
+        self.assertEqual(self.c[::3], self.values[::3])
+        self.assertEqual(self.c[::-1], self.values[::-1])
+
+    def test_cache_is_bounded(self):
+        for i in range(12):
+            self.c[i]
+        self.assertEqual(list(self.c._cache), [1, 2])
+        self.c[0]
+        self.assertEqual(list(self.c._cache), [2, 0])
+        self.c.clear_cache()
+        self.assertEqual(len(self.c._cache), 0)
+
+    def test_iteration_does_not_fill_cache(self):
+        list(self.c)
+        self.assertEqual(len(self.c._cache), 0)
+
+    def test_stats(self):
+        c = SmallBlocks('A', range(10), column_type=int)
+        self.assertEqual(c.stats.sum, 45)
+        c.extend(range(10))
+        self.assertEqual(c.stats.sum, 90)
+
+    def test_lzma(self):
+        try:
+            c = LzmaCompressedColumn('A', ['x'] * 5000, column_type=str)
+        except ValueError:
+            self.skipTest('lzma is not available')
+        self.assertEqual(len(c.blocks), 1)
+        self.assertEqual(list(c), ['x'] * 5000)
+
+    def test_compression(self):
+        values = ['customer %d archived order note' % (i % 50) for i in range(20000)]
+        plain = Table([('A', str)], [(v,) for v in values])
+        packed = Table([('A', str, 'compressed')], plain)
+        packed._get_column('A').clear_cache()
+        size = lambda t: [r.Bytes for r in t.memory_usage() if r.Kind == 'column'][0]
+        self.assertLess(size(packed) * 5, size(plain))
+
+
+class TestCompressedTable(TableTestMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.s = [('A', int), ('B', str)]
+        self.rows = [(i, 'b%d' % (i % 7)) for i in range(10000)]
+        self.t = Table(self.s, self.rows, storage='compressed')
+        self.plain = Table(self.s, self.rows)
+
+    def test_storage(self):
+        self.assertIsInstance(self.t._get_column('B'), CompressedColumn)
+
+    def test_same_as_plain(self):
+        self.assertTablesEqual(self.t, self.plain)
+
+    def test_restrict_and_index(self):
+        r = self.t.restrict(['B'], lambda b: b == 'b3')
+        self.assertEqual(len(r), len(self.plain.restrict(['B'], lambda b: b == 'b3')))
+        i = self.t.add_index(['B']).reindex()
+        self.assertEqual(len(list(i[('b3',)])), len(r))
+
+    def test_copy_keeps_storage(self):
+        c = self.t.copy()
+        self.assertIsInstance(c._get_column('A'), CompressedColumn)
+
+    def test_invalid(self):
+        with self.assertRaises(Exception):
+            self.t.append(('x', 'y'))
@@ -0,0 +1,48 @@
+import unittest
+
+from eztable import Table
+
+
+class TestDerivedTableColumn(unittest.TestCase):
+
+    def setUp(self):
+        self.t = Table([('A', int), ('B', str)])
+        self.t.extend((i, 'b%d' % i) for i in range(10))
+
+    def test_projected(self):
+        c = self.t.project('B').B
+        self.assertEqual(len(c), 10)
+        self.assertEqual([c[i] for i in range(len(c))], list(self.t.B))
+        self.assertEqual(c[-1], 'b9')
+        self.assertEqual(c[2:4], ['b2', 'b3'])
+        with self.assertRaises(IndexError):
+            c[10]
+
+    def test_restricted(self):
+        c = self.t.restrict(['A'], lambda a: a % 3 == 0).B
+        self.assertEqual(len(c), 4)
+        self.assertEqual(c[1], 'b3')
+        self.assertEqual(c[-1], 'b9')
+        self.assertEqual(c[::-2], ['b9', 'b3'])
+        self.assertEqual(c[1:], ['b3', 'b6', 'b9'])
+
+    def test_positions_are_kept(self):
+        calls = []
+
+        def even(a):
+            calls.append(a)
+            return a % 2 == 0
+        c = self.t.restrict(['A'], even).A
+        for i in range(len(c)):
+            c[i]
+        self.assertEqual(len(calls), 10)
+
+    def test_sliced(self):
+        c = self.t[2:8:2].A
+        self.assertEqual(len(c), 3)
+        self.assertEqual(c[-1], 6)
+        self.assertEqual(c[:], [2, 4, 6])
+
+
+if __name__ == '__main__':
+    unittest.main()
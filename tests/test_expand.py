@@ -1,6 +1,18 @@
+import array
+import os
 import unittest
 
-from eztable import Table, InvalidSchema, InvalidData
+from eztable import Table, InvalidSchema, InvalidData, col
+from eztable.columns import ParallelColumn
+
+
+def _weighted(a, b):
+    # Module level, so that it can be sent to worker processes
+    return a * b
+
+
+def _pid(a):
+    return os.getpid()
 
 
 class TestExpandTable(unittest.TestCase):
@@ -120,5 +132,340 @@ class TestExpandTable(unittest.TestCase):
 
         self.assertEqual(list(t), expected)
 
+    def test_expand_restricted_table(self):
+        t = self.t.restrict(
+            col_names=['A'],
+            fn=lambda a: a > 1
+        ).expand(
+            name='D',
+            col_type=int,
+            input_columns=['A'],
+            fn=lambda a: a * 10
+        )
+
+        self.assertEqual(list(t), [(2, 2.2, 'yello', 20)])
+
 if __name__ == '__main__':
     unittest.main()
+
+
+class TestVectorizedExpand(unittest.TestCase):
+
+    def setUp(self):
+        self.t = Table([('A', 'i'), ('B', float), ('C', str)])
+        self.t.extend((i, i * 0.5, 'c%d' % i) for i in range(1000))
+        self.calls = []
+
+    def add(self, a, b):
+        self.calls.append(len(a))
+        return [x + y for x, y in zip(a, b)]
+
+    def test_values(self):
+        t = self.t.expand('D', ['A', 'B'], self.add, float, vectorized=True)
+        self.assertEqual(list(t.D), [i * 1.5 for i in range(1000)])
+        self.assertEqual(self.calls, [1000])
+
+    def test_chunks(self):
+        t = self.t.expand('D', ['A', 'B'], self.add, float, vectorized=True)
+        t._get_column('D')._column.chunk_size = 300
+        self.assertEqual([r.D for r in t], [i * 1.5 for i in range(1000)])
+        self.assertEqual(self.calls, [300, 300, 300, 100])
+
+    def test_inputs_are_arrays(self):
+        seen = []
+
+        def fn(a, c):
+            seen.append((type(a), type(c)))
+            return c
+        list(self.t.expand('D', ['A', 'C'], fn, vectorized=True).D)
+        self.assertEqual(seen, [(array.array, list)])
+
+    def test_random_access(self):
+        t = self.t.expand('D', ['A', 'B'], self.add, float, vectorized=True)
+        self.assertEqual(t[5].D, 7.5)
+        self.assertEqual(t[999].D, 999 * 1.5)
+        self.assertEqual(t._get_column('D')._column[-1], 999 * 1.5)
+
+    def test_restricted(self):
+        r = self.t.restrict(['A'], lambda a: a % 100 == 0)
+        t = r.expand('D', ['A', 'B'], self.add, float, vectorized=True)
+        self.assertEqual(list(t.D), [i * 1.5 for i in range(0, 1000, 100)])
+
+    def test_recent_chunks_are_kept(self):
+        t = self.t.expand('D', ['A', 'B'], self.add, float, vectorized=True)
+        c = t._get_column('D')._column
+        c.chunk_size = 100
+        for i in range(50):
+            self.assertEqual(c[i], i * 1.5)
+            self.assertEqual(c[500 + i], (500 + i) * 1.5)
+            self.assertEqual(c[900 + i], (900 + i) * 1.5)
+        self.assertEqual(self.calls, [100, 100, 100])
+        for i in [0, 100, 200, 300, 400, 0]:
+            c[i]
+        self.assertEqual(self.calls, [100] * 8)
+
+    def test_restricted_rows_only(self):
+        r = self.t.restrict(['A'], lambda a: a % 100 == 0)
+        t = r.expand('D', ['A', 'B'], self.add, float, vectorized=True)
+        self.assertEqual([row.D for row in t], [i * 1.5 for i in range(0, 1000, 100)])
+        self.assertEqual(t.D[2:4], [300.0, 450.0])
+        self.assertEqual(self.calls, [10, 2])
+        c = t._get_column('D')._column
+        self.assertEqual(c.values_at(range(5, 8)), [7.5, 9.0, 10.5])
+
+    def test_values_at_gives_arrays(self):
+        seen = []
+
+        def fn(a, c):
+            seen.append((type(a), type(c)))
+            return c
+        t = self.t.expand('D', ['A', 'C'], fn, vectorized=True)
+        self.assertEqual(
+            t._get_column('D')._column.values_at([3, 1]), ['c3', 'c1'])
+        self.assertEqual(seen, [(array.array, list)])
+
+    def test_wrong_length(self):
+        t = self.t.expand('D', ['A'], lambda a: a[1:], vectorized=True)
+        with self.assertRaises(ValueError):
+            list(t.D)
+
+    def test_numpy(self):
+        try:
+            import numpy
+        except ImportError:
+            with self.assertRaises(ImportError):
+                self.t.expand('D', ['A'], abs, vectorized='numpy')
+            return
+        t = self.t.expand('D', ['A', 'B'], lambda a, b: a * b, float,
+                          vectorized='numpy')
+        self.assertEqual(list(t.D)[:3], [0.0, 0.5, 2.0])
+        self.assertIs(type(t[1].D), float)
+
+
+class TestCachedExpand(unittest.TestCase):
+
+    def setUp(self):
+        self.t = Table([('A', int), ('B', str)])
+        self.t.extend((i, 'b%d' % i) for i in range(10))
+        self.calls = []
+
+    def double(self, a):
+        self.calls.append(a)
+        return a * 2
+
+    def cached(self, table=None, col_type=int):
+        return (table or self.t).expand(
+            'D', ['A'], self.double, col_type, cache=True)
+
+    def test_each_row_is_calculated_once(self):
+        t = self.cached()
+        self.assertEqual(list(t.D), [i * 2 for i in range(10)])
+        self.assertEqual(list(t.D), [i * 2 for i in range(10)])
+        self.assertEqual([r.D for r in t], [i * 2 for i in range(10)])
+        self.assertEqual(self.calls, list(range(10)))
+        c = t._get_column('D')._column
+        self.assertEqual(c.misses, 10)
+        self.assertEqual(c.hits, 20)
+
+    def test_values_are_compact(self):
+        from eztable.columns import CompactColumn
+        c = self.cached()._get_column('D')._column
+        self.assertIsInstance(c.values, CompactColumn)
+
+    def test_random_access(self):
+        t = self.cached()
+        self.assertEqual(t[3].D, 6)
+        self.assertEqual(self.calls, [3])
+        self.assertEqual(t[1].D, 2)
+        self.assertEqual(t[3].D, 6)
+        self.assertEqual(self.calls, [3, 1])
+        self.assertEqual(list(t.D), [i * 2 for i in range(10)])
+        self.assertEqual(sorted(self.calls), list(range(10)))
+
+    def test_grows_with_the_table(self):
+        t = self.cached()
+        list(t.D)
+        self.t.append((10, 'b10'))
+        self.t.extend([(11, 'b11'), (12, 'b12')])
+        # The new rows are calculated when they are read
+        self.assertEqual(self.calls, list(range(10)))
+        self.assertEqual(list(t.D)[-3:], [20, 22, 24])
+        self.assertEqual(self.calls, list(range(13)))
+
+    def test_append_after_cache_is_full(self):
+        t = self.t.expand('Inv', ['A'], lambda a: 10 // a, int, cache=True)
+        self.assertEqual(t[1].Inv, 10)
+        r = t.restrict(['A'], lambda a: a != 0)
+        self.assertEqual(list(r.Inv)[:2], [10, 5])
+        # Appending doesn't call the function, so a row it can't
+        # calculate is stored like any other
+        self.t.append((0, 'zero'))
+        self.assertEqual(len(self.t), 11)
+        self.assertEqual(len(self.t.A), 11)
+        self.assertEqual(len(self.t.B), 11)
+        self.assertEqual(len(list(r.Inv)), 9)
+
+    def test_append_after_cache_is_full_updates_indexes(self):
+        t = self.cached()
+        list(t.D)
+        i = self.t.add_index(['A'])
+        self.t.append((10, 'b10'))
+        self.assertEqual(i.index((10,)), [10])
+
+    def test_listens_to_the_table(self):
+        t = self.cached()
+        c = t._get_column('D')._column
+        self.assertIn(c, self.t._listeners)
+        list(t.D)
+        self.t.extend([(10, 'b10'), (11, 'b11')])
+        # Room is made for the new rows, but they aren't calculated
+        self.assertEqual(len(c.known), 12)
+        self.assertEqual(c.known.count(), 10)
+        self.assertEqual(self.calls, list(range(10)))
+
+    def test_in_place_writes_are_not_supported(self):
+        # Tables are only ever appended to, so a value written into a
+        # column in place is not seen by the rows already cached, or by
+        # the kept rows of a restriction.
+        t = self.cached()
+        r = self.t.restrict(['A'], lambda a: a > 7)
+        self.assertEqual(list(t.D)[3], 6)
+        self.assertEqual([row.A for row in r], [8, 9])
+        self.t.A[3] = 100
+        self.assertEqual(list(t.D)[3], 6)
+        self.assertEqual([row.A for row in r], [8, 9])
+        self.assertEqual(self.t.A[3], 100)
+
+    def test_partial_cache_is_lazy(self):
+        t = self.cached()
+        self.t.append((10, 'b10'))
+        self.assertEqual(self.calls, [])
+        self.assertEqual(len(list(t.D)), 11)
+
+    def test_cached_on_derived_table(self):
+        r = self.t.restrict(['A'], lambda a: a % 2)
+        t = self.cached(r)
+        self.assertEqual(list(t.D), [2, 6, 10, 14, 18])
+        self.assertEqual(list(t.D), [2, 6, 10, 14, 18])
+        self.assertEqual([row.D for row in t], [2, 6, 10, 14, 18])
+        # Rows which the restriction removes are never calculated
+        self.assertEqual(self.calls, [1, 3, 5, 7, 9])
+        self.t.append((10, 'b10'))
+        self.assertEqual(self.calls, [1, 3, 5, 7, 9])
+
+    def test_restricted_partial_function(self):
+        t = Table([('X', int)], [(1,), (0,), (4,)])
+        r = t.restrict(['X'], lambda x: x != 0)
+        e = r.expand('Inv', ['X'], lambda x: 1.0 / x, float, cache=True)
+        self.assertEqual(list(e.Inv), [1.0, 0.25])
+        self.assertEqual([row.Inv for row in e], [1.0, 0.25])
+        self.assertEqual(e[1].Inv, 0.25)
+
+    def test_memory_is_not_shared(self):
+        t = self.cached()
+        list(t.D)
+        report = dict((r.Name, r.Shared) for r in t.memory_usage() if r.Kind == 'column')
+        self.assertFalse(report['D'])
+        self.assertTrue(report['A'])
+
+
+class TestParallelExpand(unittest.TestCase):
+
+    def setUp(self):
+        self.t = Table([('A', int), ('B', float)])
+        self.t.extend((i, i * 0.5) for i in range(1000))
+        chunk_size = ParallelColumn.CHUNK_SIZE
+        ParallelColumn.CHUNK_SIZE = 300
+        self.addCleanup(setattr, ParallelColumn, 'CHUNK_SIZE', chunk_size)
+
+    def test_values_are_in_order(self):
+        t = self.t.expand('D', ['A', 'B'], _weighted, float, parallel=2)
+        self.assertEqual(list(t.D), [i * i * 0.5 for i in range(1000)])
+        self.assertEqual(t[7].D, 24.5)
+
+    def test_uses_worker_processes(self):
+        t = self.t.expand('P', ['A'], _pid, int, parallel=2)
+        pids = set(t.P)
+        self.assertNotIn(os.getpid(), pids)
+        # Single rows are calculated here
+        self.assertEqual(t[0].P, os.getpid())
+
+    def test_row_iteration_uses_worker_processes(self):
+        t = self.t.expand('P', ['A'], _pid, int, parallel=2)
+        self.assertNotIn(os.getpid(), set(row.P for row in t))
+        self.assertNotIn(os.getpid(), set(t.copy().P))
+        r = self.t.restrict(['A'], lambda a: a % 2 == 0)[:450]
+        t = r.expand('P', ['A'], _pid, int, parallel=2)
+        self.assertNotIn(os.getpid(), set(row.P for row in t))
+        self.assertNotIn(os.getpid(), set(t.P))
+        self.assertEqual(len(list(t)), 450)
+
+    def test_restricted_rows(self):
+        r = self.t.restrict(['A'], lambda a: a % 3 == 0)
+        t = r.expand('D', ['A', 'B'], _weighted, float, parallel=2)
+        expected = [i * i * 0.5 for i in range(0, 1000, 3)]
+        self.assertEqual([row.D for row in t], expected)
+        self.assertEqual(t._get_column('D')[10:20], expected[10:20])
+
+    def test_slice(self):
+        t = self.t.expand('D', ['A', 'B'], _weighted, float, parallel=2)
+        c = t._get_column('D')._column
+        self.assertEqual(c[100:900], [i * i * 0.5 for i in range(100, 900)])
+        self.assertEqual(c[10:1:-3], [i * i * 0.5 for i in (10, 7, 4)])
+
+    def test_restricted(self):
+        r = self.t.restrict(['A'], lambda a: a % 100 == 0)
+        t = r.expand('D', ['A', 'B'], _weighted, float, parallel=True)
+        self.assertEqual(
+            list(t.D), [i * i * 0.5 for i in range(0, 1000, 100)])
+
+    def test_materialize(self):
+        t = self.t.expand('D', ['A', 'B'], _weighted, float, parallel=2,
+                          materialize=True)
+        c = t._get_column('D')._column
+        self.assertEqual(c.misses, 1000)
+        self.assertEqual(list(t.D)[-1], 999 * 999 * 0.5)
+        self.t.append((1000, 1.0))
+        self.assertEqual(c.misses, 1000)
+        self.assertEqual(list(t.D)[-1], 1000.0)
+        self.assertEqual(c.misses, 1001)
+
+    def test_materialize_restricted(self):
+        calls = []
+
+        def inverse(a):
+            calls.append(a)
+            return 1.0 / a
+        r = self.t.restrict(['A'], lambda a: a % 100 == 1)
+        t = r.expand('D', ['A'], inverse, float, materialize=True)
+        self.assertEqual(calls, list(range(1, 1000, 100)))
+        self.assertEqual(list(t.D), [1.0 / a for a in range(1, 1000, 100)])
+        self.assertEqual(len(calls), 10)
+
+    def test_workers_are_kept(self):
+        t = self.t.expand('P', ['A'], _pid, int, parallel=2)
+        c = t._get_column('P')._column
+        list(t.P)
+        pool = c._pool
+        self.assertIsNotNone(pool)
+        list(t.P)
+        list(t)
+        self.assertIs(c._pool, pool)
+        c.shutdown()
+        self.assertIsNone(c._pool)
+        self.assertNotIn(os.getpid(), set(t.P))
+        self.assertIsNot(c._pool, pool)
+        c.shutdown()
+
+    def test_function_must_be_picklable(self):
+        def nested(a):
+            return a
+        for fn in [nested, lambda a: a]:
+            with self.assertRaises(ValueError):
+                self.t.expand('D', ['A'], fn, parallel=2)
+
+    def test_invalid_combinations(self):
+        with self.assertRaises(ValueError):
+            self.t.expand('D', col('A') * 2, parallel=2)
+        with self.assertRaises(ValueError):
+            self.t.expand('D', ['A'], abs, vectorized=True, parallel=2)
@@ -0,0 +1,118 @@
+import unittest
+from eztable import Table, TableTestMixin, col, lit
+from eztable.expression import ExpressionColumn, UnaryOp, Not, Negate, IsNone
+
+
+class TestExpression(unittest.TestCase):
+
+    def test_columns(self):
+        e = (col('Level') * 2 > col('Limit')) & (col('Level') < 100)
+        self.assertEqual(e.columns, ['Level', 'Limit'])
+        self.assertEqual(lit(3).columns, [])
+
+    def test_repr(self):
+        e = (col('A') + 1 > col('B')) | ~col('C').is_none()
+        self.assertEqual(
+            repr(e), '<Logical (((A + 1) > B) or (not (C is None)))>')
+
+    def test_rename(self):
+        e = (col('A') + 1 > col('B')) | ~col('A').apply(abs).is_none()
+        r = e.rename({'A': 'X', 'B': 'Y'})
+        self.assertEqual(r.columns, ['X', 'Y'])
+        self.assertEqual(e.columns, ['A', 'B'])
+        self.assertEqual(
+            repr(r)[:31], '<Logical (((X + 1) > Y) or (not')
+
+    def test_unary_operators(self):
+        for e, cls in [(~col('A'), Not), (-col('A'), Negate),
+                       (col('A').is_none(), IsNone)]:
+            self.assertIs(type(e), cls)
+            self.assertIsInstance(e, UnaryOp)
+            self.assertEqual(e.rename({'A': 'B'}).columns, ['B'])
+        self.assertNotIsInstance(-col('A'), Not)
+        self.assertNotIsInstance(col('A').is_none(), Not)
+
+    def test_no_truth_value(self):
+        with self.assertRaises(TypeError):
+            col('A') > 1 and col('B') < 2
+
+    def test_reflected_operators(self):
+        f = (10 - col('A') * 2).bind('row', [[1, 2, 3]])
+        self.assertEqual([f(i) for i in range(3)], [8, 6, 4])
+
+    def test_true_division(self):
+        f = (col('A') / 2).bind('row', [[3]])
+        self.assertEqual(f(0), 1.5)
+
+    def test_kinds(self):
+        e = col('A') % 2 == lit(1)
+        columns = [[1, 2, 3, 4, 5]]
+        self.assertEqual(list(e.bind('iter', columns)()), [True, False, True, False, True])
+        self.assertEqual(list(e.bind('scan', columns)()), [0, 2, 4])
+        self.assertEqual(list(e.bind('filter', columns)([1, 2, 3])), [2])
+        self.assertEqual(e.bind('chunk', columns)([7, 8]), [True, False])
+
+    def test_expression_without_columns(self):
+        with self.assertRaises(ValueError):
+            lit(1).compile('row')
+
+    def test_compiled_once(self):
+        e = col('A') + 1
+        self.assertIs(e.compile('row')[0], e.compile('row')[0])
+
+    def test_apply(self):
+        f = abs(col('A')).apply(str).bind('row', [[-3]])
+        self.assertEqual(f(0), '3')
+
+
+class TestTableExpressions(TableTestMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.t = Table(
+            [('Pokemon', str), ('Level', int), ('Limit', 'i')],
+            [('p%d' % i, i % 13, i % 7) for i in range(200)]
+        )
+
+    def test_restrict(self):
+        self.assertTablesEqual(
+            self.t.restrict((col('Level') * 2 > col('Limit')) & (col('Level') < 10)),
+            self.t.restrict(['Level', 'Limit'], lambda l, m: l * 2 > m and l < 10)
+        )
+
+    def test_restrict_derived_table(self):
+        d = self.t[50:150].rename(['Level'], ['L'])
+        self.assertTablesEqual(
+            d.restrict(col('L') == 3),
+            d.restrict(['L'], lambda l: l == 3)
+        )
+
+    def test_expand(self):
+        t = self.t.expand('Total', col('Level') + col('Limit'), col_type=int)
+        self.assertEqual(t.column_names[-1], 'Total')
+        self.assertEqual(t.schema[-1], ('Total', int))
+        self.assertEqual(list(t.Total), [r.Level + r.Limit for r in self.t])
+        self.assertEqual(t[5].Total, 10)
+        c = t._get_column('Total')._column
+        self.assertIsInstance(c, ExpressionColumn)
+        self.assertEqual(c[3:6], [6, 8, 10])
+
+    def test_expand_then_restrict(self):
+        t = self.t.expand('Total', col('Level') + col('Limit'), col_type=int)
+        r = t.restrict(col('Total') > 15)
+        self.assertEqual(
+            [row.Pokemon for row in r],
+            [row.Pokemon for row in self.t if row.Level + row.Limit > 15])
+
+    def test_expand_vectorized(self):
+        t = self.t.expand(
+            'Total', col('Level') + col('Limit'), col_type=int, vectorized=True)
+        self.assertEqual(list(t.Total), [r.Level + r.Limit for r in self.t])
+
+    def test_expand_cached(self):
+        t = self.t.expand('Total', col('Level') * 3, col_type=int, cache=True)
+        self.assertEqual(list(t.Total), list(t.Total))
+        self.assertEqual(t._get_column('Total')._column.misses, 200)
+
+    def test_expand_needs_fn_or_expression(self):
+        with self.assertRaises(TypeError):
+            list(self.t.expand('X', ['Level']).X)
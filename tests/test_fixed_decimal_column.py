@@ -0,0 +1,157 @@
+import unittest
+from decimal import Decimal
+from eztable import Table, TableTestMixin, table_literal, InvalidColumn, InvalidData, col
+from eztable.expression import FixedExpressionColumn, ExpressionColumn
+from eztable.columns import FixedDecimalColumn
+
+
+class TestFixedDecimalColumn(unittest.TestCase):
+
+    def setUp(self):
+        self.values = [Decimal('12.34'), Decimal('-0.5'), None, Decimal('7')]
+        self.c = FixedDecimalColumn('Price', self.values, scale=2)
+
+    def test_values(self):
+        self.assertEqual(list(self.c), self.values)
+        self.assertEqual(str(self.c[1]), '-0.50')
+        self.assertEqual(self.c[1:3], self.values[1:3])
+        self.assertEqual(list(self.c.raw), [1234, -50, None, 700])
+
+    def test_validate(self):
+        self.assertTrue(self.c.validate(Decimal('1.20')))
+        self.assertTrue(self.c.validate(None))
+        self.assertFalse(self.c.validate(Decimal('1.234')))
+        self.assertFalse(self.c.validate(Decimal('NaN')))
+        self.assertFalse(self.c.validate(Decimal('1e30')))
+        self.assertFalse(self.c.validate(1.5))
+
+    def test_validate_more_digits_than_context_precision(self):
+        v = Decimal('0.1000000000000000000000000000001')
+        self.assertFalse(self.c.validate(v))
+        self.assertEqual(str(self.c.to_raw(v)), '10.00000000000000000000000000001')
+        self.assertTrue(self.c.validate(Decimal('0.1000000000000000000000000000000')))
+
+    def test_sum(self):
+        self.assertEqual(self.c.sum(), Decimal('18.84'))
+        self.assertEqual(self.c.sum_rows([0, 3]), Decimal('19.34'))
+
+    def test_parse_raw(self):
+        for s, n in [('12.34', 1234), ('-.05', -5), ('7', 700), ('1.230', 123),
+                     ('+3.1', 310), ('1e2', 10000), ('None', None)]:
+            self.assertEqual(self.c.parse_raw(s), n)
+        for s in ['1.234', 'abc', '', '-', '1.2.3', '--1', 'Infinity']:
+            with self.assertRaises(ValueError):
+                self.c.parse_raw(s)
+
+    def test_scale_zero(self):
+        c = FixedDecimalColumn('A', [Decimal('3')], scale=0)
+        self.assertEqual(c.parse_raw('12'), 12)
+        self.assertFalse(c.validate(Decimal('0.5')))
+
+
+class TestFixedDecimalTable(TableTestMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.s = [('Owner', str), ('Price', Decimal, 'fixed:2')]
+        self.rows = [
+            ('Ash' if i % 3 else 'Misty', Decimal(i) / 4) for i in range(1000)
+        ]
+        self.t = Table(self.s, self.rows)
+        self.plain = Table([('Owner', str), ('Price', Decimal)], self.rows)
+
+    def test_storage(self):
+        c = self.t._get_column('Price')
+        self.assertIsInstance(c, FixedDecimalColumn)
+        self.assertEqual(c.scale, 2)
+        self.assertEqual(c.storage, 'fixed:2')
+        self.assertIsInstance(self.t.copy()._get_column('Price'), FixedDecimalColumn)
+
+    def test_invalid_storage(self):
+        for storage in ['fixed:x', 'fixed:-1', 'floating:2']:
+            with self.assertRaises(InvalidColumn):
+                Table([('A', Decimal, storage)])
+
+    def test_too_precise(self):
+        with self.assertRaises(InvalidData):
+            self.t.append(('Ash', Decimal('0.001')))
+
+    def test_sum(self):
+        self.assertEqual(self.t.sum('Price'), self.plain.sum('Price'))
+        r = self.t.restrict(['Owner'], lambda o: o == 'Misty')
+        self.assertEqual(r.sum('Price'), sum(r.Price))
+
+    def test_aggregate(self):
+        aggregations = [('Total', Decimal, lambda g: g.sum('Price'))]
+        self.assertTablesEqual(
+            self.t.aggregate(['Owner'], aggregations),
+            self.plain.aggregate(['Owner'], aggregations),
+        )
+
+    def test_expand_arithmetic_on_integers(self):
+        e = self.t.expand('E', col('Price') * 3 - col('Price'), col_type=Decimal)
+        c = e._get_base_column('E')
+        self.assertIsInstance(c, FixedExpressionColumn)
+        self.assertEqual(c.scale, 2)
+        self.assertEqual(list(e.E), [p * 2 for p in self.plain.Price])
+        self.assertEqual(e[5].E, Decimal('2.50'))
+        self.assertEqual(e.sum('E'), self.plain.sum('Price') * 2)
+        r = e.restrict(['Owner'], lambda o: o == 'Misty')
+        self.assertEqual(r.sum('E'), sum(r.E))
+
+    def test_expand_product_of_fixed_columns(self):
+        t = Table([('P', Decimal, 'fixed:2'), ('Q', Decimal, 'fixed:1')],
+                  [(Decimal('1.25'), Decimal('0.5'))])
+        e = t.rename(['P'], ['Price']).expand('PQ', col('Price') * col('Q'))
+        self.assertEqual(e._get_base_column('PQ').scale, 3)
+        self.assertEqual(list(e.PQ), [Decimal('0.625')])
+
+    def test_expand_other_arithmetic_uses_decimals(self):
+        for expression in [col('Price') / 2, col('Price') + 1,
+                           col('Price') * Decimal('1.5')]:
+            e = self.t.expand('E', expression)
+            self.assertNotIsInstance(
+                e._get_base_column('E'), FixedExpressionColumn)
+            self.assertIsInstance(e._get_base_column('E'), ExpressionColumn)
+        self.assertEqual(self.t.expand('E', col('Price') + 1)[0].E, 1)
+
+    def test_literal_out_of_range(self):
+        with self.assertRaises(InvalidData):
+            table_literal("""
+                | P (fixed:2)          |
+                | 99999999999999999999 |
+            """)
+        with self.assertRaises(InvalidData):
+            table_literal("""
+                | P (fixed:2) |
+                | 1e20        |
+            """)
+        with self.assertRaises(InvalidData):
+            FixedDecimalColumn('P', [Decimal('1e20')])
+
+    def test_restrict_between(self):
+        r = self.t.restrict_between('Price', Decimal('10.1'), 11)
+        self.assertEqual(
+            list(r.Price), [Decimal('10.25'), Decimal('10.5'), Decimal('10.75'), Decimal('11')])
+
+    def test_memory(self):
+        size = lambda t: [r.Bytes for r in t.memory_usage() if r.Name == 'Price'][0]
+        self.assertLess(size(self.t) * 5, size(self.plain))
+
+    def test_literal(self):
+        t = table_literal("""
+            | Owner (str) | Price (fixed:2) |
+            | Ash         | 12.5            |
+            | Misty       | -0.25           |
+            | Brock       | None            |
+        """)
+        c = t._get_column('Price')
+        self.assertIsInstance(c, FixedDecimalColumn)
+        self.assertEqual(list(c.raw), [1250, -25, None])
+        self.assertTablesEqual(table_literal(repr(t)), t)
+
+    def test_literal_with_bad_row(self):
+        with self.assertRaises(InvalidData):
+            table_literal("""
+                | Owner (str) | Price (fixed:2) |
+                | Ash         |
+            """)
@@ -0,0 +1,93 @@
+import unittest
+import array
+from eztable import Table, InvalidData
+from eztable.columns import Column, ArrayColumn
+
+
+class TestFromColumns(unittest.TestCase):
+
+    def setUp(self):
+        self.s = [
+            ('A', int),
+            ('B', 'd'),
+            'C',
+        ]
+
+    def test_from_columns(self):
+        t = Table.from_columns(self.s, [
+            [1, 2, 3],
+            array.array('d', [1.5, 2.5, 3.5]),
+            ['x', 'y', 'z'],
+        ])
+        self.assertEqual(t.schema, Table(self.s).schema)
+        self.assertEqual(
+            list(t),
+            [(1, 1.5, 'x'), (2, 2.5, 'y'), (3, 3.5, 'z')]
+        )
+        self.assertIsInstance(t._get_column('B'), ArrayColumn)
+
+    def test_from_columns_dict(self):
+        t = Table.from_columns(self.s, {
+            'C': ['x', 'y'],
+            'B': [1.5, 2.5],
+            'A': [1, 2],
+        })
+        self.assertEqual(list(t), [(1, 1.5, 'x'), (2, 2.5, 'y')])
+
+    def test_from_columns_dict_missing_column(self):
+        with self.assertRaises(InvalidData):
+            Table.from_columns(self.s, {
+                'A': [1, 2],
+                'C': ['x', 'y'],
+            }, validate=True)
+
+    def test_equivalent_to_row_constructor(self):
+        rows = [(1, 1.5, 'x'), (2, 2.5, 'y')]
+        t = Table.from_columns(self.s, list(zip(*rows)))
+        self.assertEqual(t, Table(self.s, rows))
+
+    def test_existing_columns_are_adopted(self):
+        a = Column('A', [1, 2], column_type=int)
+        b = ArrayColumn('B', [1.5, 2.5], column_type='d')
+        t = Table.from_columns(self.s, [a, b, ['x', 'y']])
+        self.assertIs(t._get_column('A'), a)
+        self.assertIs(t._get_column('B'), b)
+
+    def test_mismatched_columns_are_copied(self):
+        a = Column('Z', [1, 2], column_type=int)
+        t = Table.from_columns(self.s, [a, [1.5, 2.5], ['x', 'y']])
+        self.assertIsNot(t._get_column('A'), a)
+        self.assertEqual(list(t.A), [1, 2])
+
+    def test_tables_can_be_appended_to(self):
+        t = Table.from_columns(self.s, [[1], [1.5], ['x']])
+        t.append((2, 2.5, 'y'))
+        self.assertEqual(len(t), 2)
+
+    def test_wrong_number_of_columns(self):
+        with self.assertRaises(InvalidData):
+            Table.from_columns(self.s, [[1], [1.5]])
+
+    def test_columns_of_different_lengths(self):
+        with self.assertRaises(InvalidData):
+            Table.from_columns(self.s, [[1, 2], [1.5], ['x']])
+
+    def test_no_validation_by_default(self):
+        t = Table.from_columns(self.s, [['one'], [1.5], ['x']])
+        self.assertEqual(list(t.A), ['one'])
+
+    def test_validation(self):
+        with self.assertRaises(InvalidData):
+            Table.from_columns(
+                self.s, [[1, 'two'], [1.5, 2.5], ['x', 'y']], validate=True
+            )
+
+    def test_validation_allows_none(self):
+        t = Table.from_columns(
+            self.s, [[1, None], [1.5, 2.5], ['x', 'y']], validate=True
+        )
+        self.assertEqual(list(t.A), [1, None])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -93,6 +93,17 @@ class TestIndex(unittest.TestCase):
         self.t.append((6, 7.4, 'Starfox Adventures'))
         self.assertEquals(len(i), 1)
 
+    def test_extending_a_table_adds_to_indexes(self):
+        i = self.t.add_index(
+            cols=('C',)
+        ).reindex()
+        self.t.extend([
+            (6, 7.4, 'Starfox Adventures'),
+            (7, 8.4, 'fnuu'),
+        ])
+        self.assertEquals(len(i), 6)
+        self.assertEquals(i.index(('fnuu',)), [3, 6])
+
     def test_indexes_can_be_reindexed(self):
         i = self.t.add_index(
             cols=('C')
@@ -122,5 +133,79 @@ class TestIndex(unittest.TestCase):
             3
         )
 
+
+class TestIndexRanges(unittest.TestCase):
+
+    def setUp(self):
+        self.t = Table([('Day', int), ('Hour', int), ('Price', str)])
+        self.t.extend([
+            (2, 1, 'a'),
+            (1, 5, 'b'),
+            (2, 0, 'c'),
+            (3, 3, 'd'),
+            (1, 2, 'e'),
+            (2, 1, 'f'),
+            (None, 1, 'n'),
+        ])
+        self.i = self.t.add_index(['Day', 'Hour']).reindex()
+
+    def prices(self, t):
+        return list(t.Price)
+
+    def test_range(self):
+        self.assertEqual(
+            self.prices(self.i.range(1, 2)), ['e', 'b', 'c', 'a', 'f'])
+        self.assertEqual(self.prices(self.i.range((1, 3), (2, 0))), ['b', 'c'])
+
+    def test_open_range(self):
+        self.assertEqual(
+            self.prices(self.i.range()), ['e', 'b', 'c', 'a', 'f', 'd'])
+        self.assertEqual(self.prices(self.i.range(lo=3)), ['d'])
+
+    def test_exclusive(self):
+        self.assertEqual(
+            self.prices(self.i.range(1, 2, inclusive=(True, False))),
+            ['e', 'b'])
+        self.assertEqual(
+            self.prices(self.i.range((1, 5), None, inclusive=False)),
+            ['c', 'a', 'f', 'd'])
+
+    def test_reverse(self):
+        self.assertEqual(
+            self.prices(self.i.range(2, reverse=True)), ['d', 'a', 'f', 'c'])
+
+    def test_prefix(self):
+        self.assertEqual(self.prices(self.i.prefix(2)), ['c', 'a', 'f'])
+        self.assertEqual(self.prices(self.i.prefix((2, 1))), ['a', 'f'])
+        self.assertEqual(self.prices(self.i.prefix(None)), ['n'])
+
+    def test_floor_and_ceiling(self):
+        self.assertEqual(self.prices(self.i.floor((2, 1))), ['a', 'f'])
+        self.assertEqual(self.prices(self.i.floor((1, 4))), ['e'])
+        self.assertEqual(self.prices(self.i.ceiling((1, 6))), ['c'])
+        self.assertEqual(self.prices(self.i.ceiling(9)), [])
+        self.assertEqual(self.prices(self.i.floor(0)), [])
+
+    def test_floor_and_ceiling_of_a_prefix(self):
+        # A partial key is a prefix, as it is for range and prefix
+        self.assertEqual(self.prices(self.i.floor(2)), ['c', 'a', 'f'])
+        self.assertEqual(self.prices(self.i.ceiling(2)), ['c', 'a', 'f'])
+        self.assertEqual(
+            self.prices(self.i.floor(2)), self.prices(self.i.prefix(2)))
+        self.assertEqual(self.prices(self.i.floor(1.5)), ['e', 'b'])
+        self.assertEqual(self.prices(self.i.ceiling(1.5)), ['c', 'a', 'f'])
+        self.assertEqual(self.prices(self.i.floor(9)), ['d'])
+        with self.assertRaises(InvalidIndex):
+            self.i.floor((1, 2, 3))
+
+    def test_ranges_are_lazy(self):
+        r = self.i.range(1, 1)
+        self.assertEqual(len(r), 2)
+        self.t.append((1, 0, 'z'))
+        self.assertEqual(self.prices(r), ['z', 'e', 'b'])
+        self.assertEqual(r[-1].Price, 'b')
+        self.assertEqual(r.explain(), 'Index range (1,) to (1,) on Day,Hour')
+
+
 if __name__ == '__main__':
     unittest.main()
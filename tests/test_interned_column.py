@@ -0,0 +1,104 @@
+import unittest
+from eztable import Table, TableTestMixin, table_literal
+from eztable.columns import InternedColumn, StringPool
+
+
+class TestStringPool(unittest.TestCase):
+
+    def test_intern(self):
+        p = StringPool()
+        a = p.intern(''.join(['ab', 'c']))
+        b = p.intern(''.join(['a', 'bc']))
+        self.assertIs(a, b)
+        self.assertEqual(p.intern(5), 5)
+        self.assertIsNone(p.intern(None))
+        self.assertEqual(len(p), 1)
+        self.assertEqual(p.dedupe_ratio, 2.0)
+
+    def test_intern_many(self):
+        p = StringPool()
+        values = p.intern_many(['x%d' % (i % 4) for i in range(20)] + [None, 3])
+        self.assertEqual(len(p), 4)
+        self.assertEqual(p.dedupe_ratio, 5.0)
+        self.assertIs(values[0], values[4])
+        self.assertEqual(values[-2:], [None, 3])
+
+    def test_empty(self):
+        self.assertEqual(StringPool().dedupe_ratio, 1.0)
+
+
+class TestInternedColumn(unittest.TestCase):
+
+    def test_values_are_shared(self):
+        c = InternedColumn('A', ['%s%s' % ('a', 'b') for _ in range(3)])
+        c.append('%s%s' % ('a', 'b'))
+        self.assertEqual(list(c), ['ab'] * 4)
+        self.assertEqual(len(set(map(id, c))), 1)
+
+    def test_every_write_is_interned(self):
+        def ab():
+            return ''.join(['a', 'b'])
+        c = InternedColumn('A', [ab()])
+        c.insert(0, ab())
+        c[1] = ab()
+        c[2:] = [ab(), ab()]
+        c += [ab()]
+        self.assertEqual(list(c), ['ab'] * 5)
+        self.assertEqual(len(set(map(id, c))), 1)
+        self.assertEqual(len(c.pool), 1)
+
+    def test_shared_pool(self):
+        p = StringPool()
+        a = InternedColumn('A', ['%s' % 'q'], pool=p)
+        b = InternedColumn('B', ['%s' % 'q'], pool=p)
+        self.assertIs(a[0], b[0])
+
+
+class TestInternedTable(TableTestMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.s = [('Type', str), ('Owner', str), ('Level', int)]
+        self.t = table_literal("""
+            | Type (str) | Owner (str) | Level (int) |
+            | Fire       | Ash         | 1           |
+            | Water      | Misty       | 2           |
+            | Fire       | Misty       | 3           |
+            | Misty      | Ash         | 4           |
+        """)
+        self.interned = Table(self.s, self.t, storage='interned')
+
+    def test_storage(self):
+        for name in ['Type', 'Owner', 'Level']:
+            self.assertIsInstance(
+                self.interned._get_column(name), InternedColumn)
+        self.assertTablesEqual(self.interned, self.t)
+
+    def test_table_shares_one_pool(self):
+        pool = self.interned.string_pool
+        self.assertIs(self.interned._get_column('Owner').pool, pool)
+        self.assertEqual(len(pool), 4)
+        self.assertEqual(pool.dedupe_ratio, 2.0)
+        types, owners = self.interned.Type, self.interned.Owner
+        self.assertIs(types[3], owners[1])
+
+    def test_per_column(self):
+        t = Table([('Type', str, 'interned'), ('Owner', str)], self.t.project('Type', 'Owner'))
+        self.assertIsInstance(t._get_column('Type'), InternedColumn)
+        self.assertNotIsInstance(t._get_column('Owner'), InternedColumn)
+        self.assertIsNone(Table([('A', str)]).string_pool)
+
+    def test_memory(self):
+        rows = [('%s %d' % ('category', i % 10), 'x', 1) for i in range(5000)]
+        plain = Table(self.s, rows)
+        interned = Table(self.s, rows, storage='interned')
+        size = lambda t: [r.Bytes for r in t.memory_usage() if r.Name == 'Type'][0]
+        self.assertLess(size(interned) * 2, size(plain))
+        self.assertIn('pool', list(interned.memory_usage().Kind))
+
+    def test_copy_keeps_storage(self):
+        c = self.interned.copy()
+        self.assertIsInstance(c._get_column('Type'), InternedColumn)
+
+    def test_join(self):
+        j = self.interned.inner_join(('Owner',), other=self.interned, other_keys=('Type',))
+        self.assertEqual([r.Owner for r in j], ['Misty', 'Misty'])
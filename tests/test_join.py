@@ -258,5 +258,57 @@ class TestBrokenJoin(unittest.TestCase):
         )
 
 
+class TestJoinPositions(unittest.TestCase):
+
+    def setUp(self):
+        self.p = Table([('Name', str), ('Owner', str), ('Level', int)])
+        self.p.extend([
+            ('Pikachu', 'Ash', 12),
+            ('Mew', None, 99),
+            ('Starmie', 'Misty', 44),
+            ('Onyx', 'Brock', 30),
+        ])
+        self.o = Table([('Owner', str), ('Town', str)])
+        self.o.extend([('Ash', 'Pallet'), ('Misty', 'Cerulean')])
+
+    def test_inner_join_columns(self):
+        j = self.p.inner_join(('Owner',), other=self.o)
+        self.assertEqual(len(j), 2)
+        self.assertEqual(list(j.Name), ['Pikachu', 'Starmie'])
+        self.assertEqual(j.Name[-1], 'Starmie')
+        self.assertEqual(j.Town[0:2], ['Pallet', 'Cerulean'])
+        self.assertEqual(j[-1], ('Starmie', 'Misty', 44, 'Cerulean'))
+
+    def test_join_restricted_table(self):
+        r = self.p.restrict(['Level'], lambda l: l > 20)
+        j = r.left_join(('Owner',), other=self.o)
+        self.assertEqual(len(j), 3)
+        self.assertEqual(j.Name[:], ['Mew', 'Starmie', 'Onyx'])
+        self.assertEqual(j.Town[-1], None)
+
+    def test_slice_and_restrict(self):
+        j = self.p.left_join(('Owner',), other=self.o)
+        self.assertEqual([r.Name for r in j[1:3]], ['Mew', 'Starmie'])
+        r = j.restrict(['Town'], lambda t: t is not None)
+        self.assertEqual([row.Name for row in r], ['Pikachu', 'Starmie'])
+
+    def test_join_a_join(self):
+        gyms = Table([('Town', str), ('Gym', str)])
+        gyms.append(('Cerulean', 'Water'))
+        j = self.p.inner_join(('Owner',), other=self.o)
+        j2 = j.left_join(('Town',), other=gyms)
+        self.assertEqual(list(j2.Gym), [None, 'Water'])
+        self.assertEqual(list(j2.Name), ['Pikachu', 'Starmie'])
+
+    def test_rows_follow_both_tables(self):
+        j = self.p.inner_join(('Owner',), other=self.o)
+        self.assertEqual(len(j), 2)
+        self.o.append(('Brock', 'Pewter'))
+        self.assertEqual(len(j), 3)
+        self.assertEqual(j.Town[-1], 'Pewter')
+        self.p.append(('Vulpix', 'Brock', 8))
+        self.assertEqual(j[-1], ('Vulpix', 'Brock', 8, 'Pewter'))
+
+
 if __name__ == '__main__':
     unittest.main()
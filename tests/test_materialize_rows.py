@@ -0,0 +1,87 @@
+import unittest
+
+from eztable import Table
+
+
+class TestMaterializeRows(unittest.TestCase):
+
+    def setUp(self):
+        self.t = Table([('A', int), ('B', str)])
+        self.t.extend((i, 'b%d' % i) for i in range(20))
+        self.calls = []
+
+    def odd(self, a):
+        self.calls.append(a)
+        return a % 2 == 1
+
+    def restricted(self):
+        return self.t.restrict(['A'], self.odd)
+
+    def test_rows_are_found_once(self):
+        r = self.restricted()
+        self.assertEqual(len(r), 10)
+        self.assertEqual(len(self.calls), 20)
+        self.assertEqual(len(r), 10)
+        self.assertEqual(r[3].A, 7)
+        self.assertEqual([row.A for row in r], list(range(1, 20, 2)))
+        self.assertEqual(list(r.B)[0], 'b1')
+        self.assertEqual(len(self.calls), 20)
+
+    def test_stacked_views_reuse_rows(self):
+        r = self.restricted()
+        len(r)
+        r2 = r.restrict(['A'], lambda a: a > 10)
+        self.assertEqual(list(r2.A), [11, 13, 15, 17, 19])
+        self.assertEqual(len(self.calls), 20)
+
+    def test_random_access(self):
+        r = self.restricted().materialize_rows()
+        self.assertEqual(r[-1].A, 19)
+        self.assertEqual([row.A for row in r[2:5]], [5, 7, 9])
+        self.assertEqual([row.A for row in r[::-4]], [19, 11, 3])
+        with self.assertRaises(IndexError):
+            r[10]
+
+    def test_append_discards_rows(self):
+        r = self.restricted()
+        self.assertEqual(len(r), 10)
+        self.t.append((21, 'b21'))
+        self.assertEqual(len(r), 11)
+        self.assertEqual(r[-1].A, 21)
+        self.assertEqual(len(self.calls), 41)
+
+    def test_partial_read_is_not_kept(self):
+        r = self.restricted()
+        next(iter(r))
+        self.assertIsNone(r._selection)
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(len(r), 10)
+        self.assertIsNotNone(r._selection)
+
+    def test_materialize_now(self):
+        r = self.restricted()
+        self.assertIs(r.materialize_rows(), r)
+        self.assertEqual(len(self.calls), 20)
+        self.assertEqual(list(r._selection[1]), list(range(1, 20, 2)))
+
+    def test_lazy(self):
+        r = self.restricted()
+        r._materialize = False
+        len(r)
+        len(r)
+        self.assertEqual(len(self.calls), 40)
+        r.materialize_rows(lazy=True)
+        self.assertEqual(len(self.calls), 40)
+        len(r)
+        len(r)
+        self.assertEqual(len(self.calls), 60)
+
+    def test_memory_usage_includes_rows(self):
+        r = self.restricted()
+        before = r._view_memory_usage()
+        r.materialize_rows()
+        self.assertGreater(r._view_memory_usage(), before)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+from eztable import Table
+
+
+def usage(report):
+    return dict(((r.Kind, r.Name), (r.Bytes, r.Shared)) for r in report)
+
+
+class TestMemoryUsage(unittest.TestCase):
+
+    def setUp(self):
+        self.t = Table([
+            ('A', int),
+            ('B', str, 'category'),
+            ('C', 'd'),
+        ], [(i, 'x%d' % (i % 3), i * 0.5) for i in range(1000)])
+
+    def test_schema(self):
+        report = self.t.memory_usage()
+        self.assertEqual(
+            report.schema,
+            [('Kind', str), ('Name', str), ('Bytes', int), ('Shared', bool)]
+        )
+
+    def test_columns(self):
+        u = usage(self.t.memory_usage())
+        for name in 'ABC':
+            nbytes, shared = u[('column', name)]
+            self.assertGreater(nbytes, 0)
+            self.assertFalse(shared)
+        self.assertIn(('row', 'TableRow'), u)
+
+    def test_compact_storage_is_smaller(self):
+        t = Table([('A', int)], [(i,) for i in range(1000)])
+        compact = Table([('A', int)], t, storage='compact')
+        self.assertLess(
+            usage(compact.memory_usage())[('column', 'A')][0],
+            usage(t.memory_usage())[('column', 'A')][0],
+        )
+
+    def test_deep(self):
+        deep = usage(self.t.memory_usage(deep=True))
+        shallow = usage(self.t.memory_usage(deep=False))
+        self.assertGreater(deep[('column', 'A')][0], shallow[('column', 'A')][0])
+        self.assertEqual(deep[('column', 'C')], shallow[('column', 'C')])
+
+    def test_index(self):
+        index = self.t.add_index(['B']).reindex()
+        nbytes, shared = usage(self.t.memory_usage())[('index', 'B')]
+        self.assertGreater(nbytes, 0)
+        self.assertFalse(shared)
+        self.assertEqual(nbytes, index.memory_usage())
+
+    def test_derived_columns_are_shared(self):
+        d = self.t.restrict(['A'], lambda a: a > 3).expand('E', ['A'], abs)
+        u = usage(d.memory_usage())
+        base = usage(self.t.memory_usage())
+        self.assertEqual(u[('column', 'A')], (base[('column', 'A')][0], True))
+        self.assertFalse(u[('column', 'E')][1])
+        self.assertFalse(u[('view', 'DerivedTable')][1])
+
+    def test_renamed_columns(self):
+        u = usage(self.t.rename(['A'], ['Z']).memory_usage())
+        self.assertIn(('column', 'Z'), u)
+        self.assertNotIn(('column', 'A'), u)
+
+    def test_join_index_is_shared(self):
+        other = Table([('B', str), ('D', int)], [('x1', 1)])
+        j = self.t.left_join(('B',), other=other)
+        nbytes, shared = usage(j.memory_usage())[('index', 'B')]
+        self.assertTrue(shared)
+        self.assertTrue(usage(j.memory_usage())[('column', 'D')][1])
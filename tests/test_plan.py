@@ -0,0 +1,66 @@
+import unittest
+
+from eztable import Table, col
+from eztable.table import DerivedTable
+
+
+class TestPlan(unittest.TestCase):
+
+    def setUp(self):
+        self.t = Table([('A', int), ('B', int)])
+        self.t.extend((i, i % 7) for i in range(100))
+        self.calls = []
+
+    def even(self, a):
+        self.calls.append(a)
+        return a % 2 == 0
+
+    def test_explain_table(self):
+        self.assertEqual(self.t.explain(), 'Scan Table')
+
+    def test_restricts_are_fused(self):
+        v = self.t.restrict(['A'], self.even).project('A', 'B') \
+            .rename(['B'], ['C']).restrict(col('C') > 3)
+        self.assertEqual(v.explain(), 'Filter even(A), (C > 3)\n  Scan Table')
+        self.assertEqual(
+            list(v.A), [i for i in range(100) if i % 2 == 0 and i % 7 > 3])
+
+    def test_each_row_is_tested_once(self):
+        v = self.t.restrict(['A'], self.even).restrict(['B'], lambda b: b > 3)
+        v._materialize = False
+        self.assertEqual(len(v), 21)
+        self.assertEqual(self.calls, list(range(100)))
+
+    def test_predicates_run_in_order(self):
+        t = Table([('A', object)])
+        t.extend([(1,), (None,), (3,)])
+        v = t.restrict(['A'], lambda a: a is not None).restrict(col('A') > 1)
+        self.assertEqual(list(v.A), [3])
+
+    def test_kept_rows_are_not_refiltered(self):
+        r = self.t.restrict(['A'], self.even).materialize_rows()
+        v = r.project('A').restrict(col('A') > 90)
+        self.assertEqual(v.explain(), 'Filter (A > 90)\n  Kept rows of DerivedTable')
+        self.assertEqual(list(v.A), [92, 94, 96, 98])
+        self.assertEqual(len(self.calls), 100)
+
+    def test_slices_are_composed(self):
+        v = self.t[2:50][3:20:2][1:]
+        self.assertEqual(v.explain(), 'Slice 7:22:2\n  Scan Table')
+        self.assertEqual(list(v.A), list(range(100))[2:50][3:20:2][1:])
+
+    def test_slices_of_restricts(self):
+        old = DerivedTable.MATERIALIZE_ROWS
+        DerivedTable.MATERIALIZE_ROWS = False
+        self.addCleanup(setattr, DerivedTable, 'MATERIALIZE_ROWS', old)
+        r = self.t.restrict(['A'], self.even)
+        expected = list(range(0, 100, 2))
+        for a, b in [(slice(3, 30), slice(2, 100, 3)),
+                     (slice(None, None, 2), slice(5, 7)),
+                     (slice(10, 20), slice(-3, None)),
+                     (slice(None, None, -1), slice(1, 4))]:
+            self.assertEqual(list(r[a][b].A), expected[a][b])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -40,6 +40,11 @@ class TestProject(unittest.TestCase):
             [0] * len(self.t)
         )
 
+    def test_project_restricted_table(self):
+        r = self.t.restrict(['A'], lambda a: a > 1)
+        t = r.project('C')
+        self.assertEqual(list(t), [(row.C,) for row in r])
+
 
 if __name__ == '__main__':
     unittest.main()
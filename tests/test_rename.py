@@ -42,5 +42,14 @@ class TestRename(unittest.TestCase):
             ['Pikachu', 'Squirtle', 'Starmie']
         )
 
+    def test_rename_twice(self):
+        t = self.t.rename(['pkmn'], ['B']).rename(['B'], ['C'])
+        self.assertEqual(t.column_names[0], 'C')
+        self.assertEqual(list(t.project('C').C), list(self.t.pkmn))
+
+    def test_renamed_descriptions(self):
+        t = self.t.rename(['pkmn'], ['B'])
+        self.assertEqual(t._column_descriptions[0].split(' ')[0], 'B')
+
 if __name__ == '__main__':
     unittest.main()
@@ -58,6 +58,28 @@ class TestRestrict(unittest.TestCase):
 
         )
 
+    def test_restrict_restricted_table(self):
+        r = self.t.restrict(
+            col_names=('B'),
+            fn=lambda b: b
+        ).restrict(
+            col_names=('A',),
+            fn=lambda a: a > 1
+        )
+
+        self.assertEquals(
+            list(r.C),
+            ['squirtle', 'pikachu']
+        )
+
+    def test_restrict_renamed_table(self):
+        r = self.t.rename(['A'], ['Z']).restrict(
+            col_names=('Z',),
+            fn=lambda z: z > 3
+        )
+
+        self.assertEquals(len(r), 2)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+from eztable import Table, TableTestMixin
+from eztable.columns import RunLengthColumn
+
+
+class TestRunLengthColumn(unittest.TestCase):
+
+    def setUp(self):
+        self.values = ['a', 'a', 'a', 'b', 'b', 'a', 'c', 'c', 'c', 'c']
+        self.c = RunLengthColumn('A', self.values, column_type=str)
+
+    def test_values(self):
+        self.assertEqual(list(self.c), self.values)
+        self.assertEqual(len(self.c), 10)
+
+    def test_runs(self):
+        self.assertEqual(self.c.run_count, 4)
+        self.assertEqual(
+            list(self.c.runs()),
+            [(0, 3, 'a'), (3, 5, 'b'), (5, 6, 'a'), (6, 10, 'c')]
+        )
+
+    def test_random_access(self):
+        for i, v in enumerate(self.values):
+            self.assertEqual(self.c[i], v)
+        self.assertEqual(self.c[-1], 'c')
+        self.assertEqual(self.c[-5], 'a')
+        self.assertEqual(self.c[2:7], self.values[2:7])
+
+    def test_out_of_range(self):
+        with self.assertRaises(IndexError):
+            self.c[10]
+        with self.assertRaises(IndexError):
+            self.c[-11]
+
+    def test_run_at(self):
+        self.assertEqual(self.c.run_at(4), (3, 5, 'b'))
+
+    def test_equal_values_of_different_types_are_kept_apart(self):
+        c = RunLengthColumn('A', [1, 1, True, 1.0, None, None])
+        self.assertEqual(c.run_count, 4)
+        self.assertIs(c[2], True)
+        self.assertIsInstance(c[3], float)
+
+    def test_empty(self):
+        c = RunLengthColumn('A')
+        self.assertEqual(len(c), 0)
+        self.assertEqual(list(c), [])
+
+
+class TestRunLengthTable(TableTestMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.s = [('Bucket', int, 'rle'), ('Value', int)]
+        self.t = Table(self.s, [(i // 4, i) for i in range(20)])
+        self.plain = Table([('Bucket', int), ('Value', int)], self.t)
+
+    def test_storage(self):
+        c = self.t._get_column('Bucket')
+        self.assertIsInstance(c, RunLengthColumn)
+        self.assertEqual(c.run_count, 5)
+        self.assertTablesEqual(self.t, self.plain)
+
+    def test_restrict_evaluates_once_per_run(self):
+        calls = []
+
+        def fn(b):
+            calls.append(b)
+            return b % 2 == 0
+
+        r = self.t.restrict(['Bucket'], fn)
+        self.assertEqual(
+            [row.Value for row in r],
+            [0, 1, 2, 3, 8, 9, 10, 11, 16, 17, 18, 19]
+        )
+        self.assertEqual(calls, [0, 1, 2, 3, 4])
+
+    def test_restrict_on_several_rle_columns(self):
+        t = Table(
+            [('A', int, 'rle'), ('B', int, 'rle'), ('C', int)],
+            [(i // 4, i // 6, i) for i in range(12)]
+        )
+        r = t.restrict(['A', 'B'], lambda a, b: a == b)
+        self.assertEqual(list(r.C), [0, 1, 2, 3, 6, 7])
+
+    def test_restrict_of_restricted_table(self):
+        r = self.t.restrict(['Value'], lambda v: v % 3 == 0)
+        r = r.restrict(['Bucket'], lambda b: b > 2)
+        self.assertEqual(list(r.Value), [12, 15, 18])
+
+    def test_aggregate(self):
+        agg = self.t.aggregate(
+            keys=('Bucket',),
+            aggregations=[
+                ('Count', int, len),
+                ('Total', int, lambda t: sum(t.Value)),
+            ]
+        )
+        expected = self.plain.aggregate(
+            keys=('Bucket',),
+            aggregations=[
+                ('Count', int, len),
+                ('Total', int, lambda t: sum(t.Value)),
+            ]
+        )
+        self.assertTablesEqualAnyOrder(agg, expected)
+
+    def test_index_over_runs(self):
+        i = self.t.add_index(['Bucket']).reindex()
+        self.assertEqual(i.index((2,)), [8, 9, 10, 11])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+
+from eztable import Table, col
+
+
+class TestSortBy(unittest.TestCase):
+
+    def setUp(self):
+        self.t = Table([('Name', str), ('Level', int), ('Owner', str)])
+        self.t.extend([
+            ('a', 3, 'x'),
+            ('b', None, 'y'),
+            ('c', 1, 'x'),
+            ('d', 3, 'y'),
+            ('e', 2, None),
+            ('f', 1, 'z'),
+        ])
+
+    def names(self, t):
+        return ''.join(t.Name)
+
+    def test_one_column(self):
+        self.assertEqual(self.names(self.t.sort_by('Level')), 'cfeadb')
+
+    def test_reverse_keeps_equal_rows_in_order(self):
+        self.assertEqual(
+            self.names(self.t.sort_by(['Level'], reverse=True)), 'adecfb')
+
+    def test_several_columns(self):
+        self.assertEqual(
+            self.names(self.t.sort_by(['Owner', 'Level'])), 'cadfbe')
+
+    def test_key(self):
+        t = self.t.sort_by('Name', key=lambda n: -ord(n))
+        self.assertEqual(self.names(t), 'fedcba')
+        t = self.t.sort_by(['Level', 'Name'], key=lambda l, n: (l or 0, n))
+        self.assertEqual(self.names(t), 'bcfead')
+
+    def test_derived_table(self):
+        r = self.t.restrict_between('Level', 2).sort_by('Name', reverse=True)
+        self.assertEqual(self.names(r), 'eda')
+
+    def test_rows_are_not_copied(self):
+        s = self.t.sort_by('Level')
+        self.assertIs(s._columns, self.t._columns)
+        self.assertEqual(s[0], ('c', 1, 'x'))
+        self.assertEqual(s[-1], ('b', None, 'y'))
+
+    def test_follows_appends(self):
+        s = self.t.sort_by('Level')
+        self.assertEqual(self.names(s), 'cfeadb')
+        self.t.append(('g', 0, 'q'))
+        self.assertEqual(self.names(s), 'gcfeadb')
+
+    def test_slice_and_restrict(self):
+        s = self.t.sort_by('Level')
+        self.assertEqual(self.names(s[:2]), 'cf')
+        self.assertEqual(self.names(s.restrict(col('Owner') == 'x')), 'ca')
+
+    def test_uses_index(self):
+        self.t.extend([('g', 1, 'x')] * 30)
+        i = self.t.add_index(['Level']).reindex()
+        s = self.t.sort_by('Level')
+        self.assertEqual(s.explain(), 'Sort by Level using index Level')
+        self.assertEqual(
+            self.names(s), self.names(self.t.copy().sort_by('Level')))
+        self.assertEqual(
+            self.names(self.t.sort_by('Level', reverse=True)),
+            self.names(self.t.copy().sort_by('Level', reverse=True)))
+
+    def test_sparse_index_is_not_used(self):
+        i = self.t.add_index(['Level']).reindex()
+        self.assertEqual(
+            self.t.sort_by('Level').explain(), 'Sort by Level\n  Scan Table')
+
+    def test_needs_columns(self):
+        with self.assertRaises(TypeError):
+            self.t.sort_by([])
+
+
+if __name__ == '__main__':
+    unittest.main()
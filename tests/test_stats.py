@@ -0,0 +1,102 @@
+import unittest
+from eztable import Table
+from eztable.stats import ColumnStats
+
+
+class TestColumnStats(unittest.TestCase):
+
+    def test_numbers(self):
+        s = ColumnStats([2, 4, 4, 4, 5, 5, 7, 9])
+        self.assertEqual(s.count, 8)
+        self.assertEqual(s.null_count, 0)
+        self.assertEqual(s.min, 2)
+        self.assertEqual(s.max, 9)
+        self.assertEqual(s.sum, 40)
+        self.assertEqual(s.mean, 5)
+        self.assertEqual(s.variance, 4)
+        self.assertEqual(s.stddev, 2)
+
+    def test_batches_match_a_single_pass(self):
+        values = [1.5, 2.25, -3.0, 8.5, 0.0, 4.75, 11.0]
+        s = ColumnStats()
+        for i in range(0, len(values), 2):
+            s.update(values[i:i + 2])
+        whole = ColumnStats(values)
+        self.assertAlmostEqual(s.mean, whole.mean)
+        self.assertAlmostEqual(s.variance, whole.variance)
+        self.assertEqual(s.sum, whole.sum)
+
+    def test_nulls(self):
+        s = ColumnStats([None, 1, None, 3])
+        self.assertEqual(s.count, 2)
+        self.assertEqual(s.null_count, 2)
+        self.assertEqual(s.rows, 4)
+        self.assertEqual(s.mean, 2)
+
+    def test_strings(self):
+        s = ColumnStats(['b', 'a', 'c'])
+        self.assertEqual(s.min, 'a')
+        self.assertEqual(s.max, 'c')
+        self.assertIsNone(s.sum)
+        self.assertIsNone(s.mean)
+
+    def test_unorderable(self):
+        s = ColumnStats([1, 'a'])
+        self.assertIsNone(s.min)
+        self.assertIsNone(s.max)
+
+    def test_empty(self):
+        s = ColumnStats()
+        self.assertIsNone(s.mean)
+        self.assertIsNone(s.variance)
+        self.assertIsNone(s.min)
+
+
+class TestTableStats(unittest.TestCase):
+
+    def setUp(self):
+        self.t = Table([('A', int), ('B', 'd'), ('C', str, 'category')])
+        self.t.extend([
+            (1, 0.5, 'x'),
+            (2, None, 'y'),
+            (3, 1.5, 'x'),
+        ])
+
+    def test_stored_column_stats(self):
+        s = self.t.stats('A')
+        self.assertEqual((s.min, s.max, s.sum, s.mean), (1, 3, 6, 2))
+        s = self.t.stats('B')
+        self.assertEqual((s.count, s.null_count, s.sum), (2, 1, 2.0))
+        self.assertEqual(self.t.stats('C').min, 'x')
+
+    def test_stats_are_kept_up_to_date(self):
+        s = self.t.stats('A')
+        self.t.append((10, 1.0, 'z'))
+        self.assertIs(self.t.stats('A'), s)
+        self.assertEqual(s.rows, 4)
+        self.assertEqual(s.max, 10)
+        self.assertEqual(s.sum, 16)
+
+    def test_only_new_rows_are_scanned(self):
+        c = self.t._get_column('A')
+        c.stats
+        seen = []
+        update = c._stats.update
+        c._stats.update = lambda values: seen.append(list(values)) or update(values)
+        self.t.extend([(4, 1.0, 'z'), (5, 1.0, 'z')])
+        c.stats
+        self.assertEqual(seen, [[4, 5]])
+
+    def test_derived_table_stats(self):
+        r = self.t.restrict(['A'], lambda a: a > 1)
+        s = r.stats('A')
+        self.assertEqual((s.count, s.min, s.sum), (2, 2, 5))
+
+    def test_standardize_scans_column_once(self):
+        t = Table([('A', float)], [(float(i),) for i in range(20000)])
+        result = list(t.standardize({'A': 1.0}).A)
+        self.assertAlmostEqual(sum(result), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -91,6 +91,62 @@ class TestTable(unittest.TestCase):
                 [1, 1.1, 0],
             ])
 
+    def test_extend_invalid_row_keeps_earlier_rows(self):
+        t = Table([
+            ('A', int),
+            ('B', float),
+            ('C', str),
+        ])
+
+        with self.assertRaises(InvalidData):
+            t.extend([
+                [1, 1.1, 'hello'],
+                [2, 2.2, 'goodbye'],
+                [3, 3.3, 3],
+                [4, 4.4, 'never'],
+            ])
+
+        self.assertEqual(list(t.A), [1, 2])
+
+    def test_extend_wrong_length_row(self):
+        t = Table(['A', 'B'])
+
+        with self.assertRaises(InvalidData):
+            t.extend([
+                [1, 2],
+                [1, 2, 3],
+            ])
+
+        self.assertEqual(len(t), 1)
+
+    def test_extend_in_several_batches(self):
+        t = Table([('A', int), ('B', 'i')])
+        t.EXTEND_BATCH_SIZE = 3
+        t.extend((i, i * 2) for i in range(10))
+
+        self.assertEqual(list(t.A), list(range(10)))
+        self.assertEqual(list(t.B), [i * 2 for i in range(10)])
+
+    def test_extend_array_column_overflow(self):
+        t = Table([('A', int), ('B', 'b')])
+
+        with self.assertRaises(OverflowError):
+            t.extend([(1, 1), (2, 1000)])
+
+        self.assertEqual(len(t), 1)
+        self.assertEqual(list(t.A), [1])
+        self.assertEqual(list(t.B), [1])
+
+    def test_append_array_column_overflow(self):
+        t = Table([('A', int), ('B', 'b')])
+
+        with self.assertRaises(OverflowError):
+            t.append((1, 1000))
+
+        self.assertEqual(len(t), 0)
+        self.assertEqual(len(t.A), 0)
+        self.assertEqual(len(t.B), 0)
+
     def test_append_invalid_row2(self):
         t = Table([
             ('A', int),
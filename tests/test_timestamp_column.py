@@ -0,0 +1,114 @@
+import datetime
+import unittest
+from eztable import Table, TableTestMixin, table_literal
+from eztable.columns import TimestampColumn, parse_timestamp
+
+T0 = datetime.datetime(2015, 3, 1, 12, 30, 15, 250)
+
+
+def minutes(n):
+    return T0 + datetime.timedelta(minutes=n)
+
+
+class TestTimestampColumn(unittest.TestCase):
+
+    def setUp(self):
+        self.values = [minutes(i) for i in range(5)] + [None]
+        self.c = TimestampColumn('T', self.values)
+
+    def test_values(self):
+        self.assertEqual(list(self.c), self.values)
+        self.assertEqual(self.c[1], minutes(1))
+        self.assertEqual(self.c[-1], None)
+        self.assertEqual(self.c[1:3], self.values[1:3])
+        self.assertEqual(self.c.null_count, 1)
+
+    def test_raw(self):
+        self.assertEqual(self.c.raw.typecode, 'q')
+        self.assertEqual(self.c.raw[1] - self.c.raw[0], 60 * 1000000)
+        self.assertEqual(TimestampColumn.to_raw(datetime.datetime(1970, 1, 1)), 0)
+        self.assertEqual(
+            TimestampColumn.decode(-1), datetime.datetime(1969, 12, 31, 23, 59, 59, 999999))
+
+    def test_validate(self):
+        self.assertTrue(self.c.validate(T0))
+        self.assertTrue(self.c.validate(None))
+        self.assertFalse(self.c.validate(T0.date()))
+        self.assertFalse(self.c.validate(1))
+
+    def test_parse(self):
+        for v in [T0, T0.replace(microsecond=0), datetime.datetime(2015, 3, 1)]:
+            self.assertEqual(parse_timestamp(str(v)), v)
+        self.assertEqual(parse_timestamp('2015-03-01T12:30:15'), T0.replace(microsecond=0))
+        with self.assertRaises(ValueError):
+            parse_timestamp('yesterday')
+
+
+class TestTimestampTable(TableTestMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.s = [('Time', datetime.datetime, 'timestamp'), ('Value', int)]
+        self.rows = [(minutes(i), i) for i in range(10000)]
+        self.t = Table(self.s, self.rows)
+        self.plain = Table([('Time', datetime.datetime), ('Value', int)], self.rows)
+
+    def test_storage(self):
+        self.assertIsInstance(self.t._get_column('Time'), TimestampColumn)
+        compact = Table([('Time', datetime.datetime)], storage='compact')
+        self.assertIsInstance(compact._get_column('Time'), TimestampColumn)
+        self.assertEqual(self.t.column_types, [datetime.datetime, int])
+
+    def test_restrict_between(self):
+        r = self.t.restrict_between('Time', minutes(9000), minutes(9010))
+        self.assertEqual([row.Value for row in r], list(range(9000, 9011)))
+        expected = self.plain.restrict_between('Time', minutes(9000), minutes(9010))
+        self.assertTablesEqual(r, expected)
+
+    def test_index(self):
+        i = self.t.add_index(['Time']).reindex()
+        self.assertEqual(i.index((minutes(5),)), [5])
+        self.assertEqual(list(i)[:2], [(minutes(0),), (minutes(1),)])
+        self.t.append((minutes(5), -1))
+        self.assertEqual(i.index((minutes(5),)), [5, 10000])
+
+    def test_expand_bucket(self):
+        b = self.t.expand_bucket('Hour', 'Time', datetime.timedelta(hours=1))
+        hours = list(b.Hour)
+        self.assertEqual(hours[0], datetime.datetime(2015, 3, 1, 12))
+        self.assertEqual(hours[29], datetime.datetime(2015, 3, 1, 12))
+        self.assertEqual(hours[30], datetime.datetime(2015, 3, 1, 13))
+        agg = b.copy().aggregate(['Hour'], [('Count', int, len)])
+        self.assertEqual(len(agg), len(set(hours)))
+
+    def test_expand_bucket_of_numbers(self):
+        b = self.t.expand_bucket('Tens', 'Value', 10)
+        self.assertEqual(list(b.Tens)[:12], [0] * 10 + [10, 10])
+
+    def test_expand_bucket_of_renamed_array_column(self):
+        t = Table([('Value', 'd')], [(v,) for v in [1.5, 12.0, 19.5, 25.0]])
+        b = t.rename(['Value'], ['Reading']).expand_bucket('Tens', 'Reading', 10)
+        self.assertEqual(list(b.Tens), [0.0, 10.0, 10.0, 20.0])
+        self.assertEqual(b.schema[-1], ('Tens', float))
+
+    def test_memory(self):
+        size = lambda t: [r.Bytes for r in t.memory_usage() if r.Name == 'Time'][0]
+        self.assertLess(size(self.t) * 5, size(self.plain))
+
+    def test_copy_keeps_storage(self):
+        self.assertIsInstance(self.t.copy()._get_column('Time'), TimestampColumn)
+
+
+class TestTimestampLiteral(TableTestMixin, unittest.TestCase):
+
+    def test_literal(self):
+        t = table_literal("""
+            | Time (timestamp)           | Value (int) |
+            | 2015-03-01 12:30:15.000250 | 1           |
+            | 2015-03-01 12:31:15        | 2           |
+        """)
+        self.assertIsInstance(t._get_column('Time'), TimestampColumn)
+        self.assertEqual(list(t.Time), [T0, minutes(1).replace(microsecond=0)])
+
+    def test_repr_round_trip(self):
+        t = Table([('Time', datetime.datetime, 'timestamp')], [(T0,), (minutes(1),)])
+        self.assertTablesEqual(table_literal(repr(t)), t)
@@ -0,0 +1,120 @@
+import unittest
+
+from eztable import Table
+
+
+class WhereTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.t = Table([('Pokemon', str), ('Owner', str), ('Level', int)])
+        self.t.extend([
+            ('Pikachu', 'Ash', 12),
+            ('Mew', None, 99),
+            ('Starmie', 'Misty', 44),
+            ('Pikachu', 'Misty', 3),
+            ('Onyx', 'Brock', 30),
+            ('Pikachu', None, 5),
+        ])
+
+    def rows(self, t):
+        return [tuple(r) for r in t]
+
+    def check(self, t, expected, uses_index):
+        self.assertEqual('Index' in t.explain(), uses_index)
+        self.assertEqual(self.rows(t), expected)
+
+
+class TestWhere(WhereTestCase):
+
+    def test_without_index(self):
+        self.check(
+            self.t.where(Pokemon='Pikachu', Owner='Misty'),
+            [('Pikachu', 'Misty', 3)], False)
+
+    def test_whole_key(self):
+        i = self.t.add_index(['Pokemon', 'Owner']).reindex()
+        self.check(
+            self.t.where(Owner='Misty', Pokemon='Pikachu'),
+            [('Pikachu', 'Misty', 3)], True)
+        self.check(self.t.where(Pokemon='Pikachu', Owner='Gary'), [], True)
+
+    def test_prefix(self):
+        i = self.t.add_index(['Pokemon', 'Owner']).reindex()
+        self.check(
+            self.t.where(Pokemon='Pikachu'),
+            [('Pikachu', 'Ash', 12), ('Pikachu', 'Misty', 3),
+             ('Pikachu', None, 5)], True)
+
+    def test_prefix_and_other_columns(self):
+        i = self.t.add_index(['Pokemon', 'Owner']).reindex()
+        t = self.t.where(Pokemon='Pikachu', Level=5)
+        self.assertTrue(t.explain().startswith('Filter (Level == 5)'))
+        self.check(t, [('Pikachu', None, 5)], True)
+
+    def test_unusable_index(self):
+        i = self.t.add_index(['Owner', 'Pokemon']).reindex()
+        self.check(self.t.where(Pokemon='Mew'), [('Mew', None, 99)], False)
+
+    def test_incomplete_index(self):
+        i = self.t.add_index(['Pokemon'])
+        self.assertFalse(i.complete)
+        self.check(self.t.where(Pokemon='Onyx'), [('Onyx', 'Brock', 30)], False)
+        i.reindex()
+        self.check(self.t.where(Pokemon='Onyx'), [('Onyx', 'Brock', 30)], True)
+
+    def test_missing_values(self):
+        i = self.t.add_index(['Owner']).reindex()
+        self.check(
+            self.t.where(Owner=None),
+            [('Mew', None, 99), ('Pikachu', None, 5)], True)
+
+    def test_follows_appends(self):
+        i = self.t.add_index(['Pokemon']).reindex()
+        t = self.t.where(Pokemon='Pikachu')
+        self.assertEqual(len(t), 3)
+        self.t.append(('Pikachu', 'Gary', 20))
+        self.assertEqual(len(t), 4)
+
+    def test_derived_table(self):
+        i = self.t.add_index(['Pokemon']).reindex()
+        r = self.t.restrict(['Level'], lambda l: l > 4)
+        self.check(
+            r.where(Pokemon='Pikachu'),
+            [('Pikachu', 'Ash', 12), ('Pikachu', None, 5)], False)
+
+    def test_needs_values(self):
+        with self.assertRaises(TypeError):
+            self.t.where()
+
+
+class TestWhereBetween(WhereTestCase):
+
+    def test_range(self):
+        i = self.t.add_index(['Level']).reindex()
+        self.check(
+            self.t.where_between('Level', 5, 30),
+            [('Pikachu', 'Ash', 12), ('Onyx', 'Brock', 30),
+             ('Pikachu', None, 5)], True)
+
+    def test_open_ranges(self):
+        i = self.t.add_index(['Level', 'Pokemon']).reindex()
+        self.assertEqual(
+            [r.Level for r in self.t.where_between('Level', lo=40)], [99, 44])
+        self.assertEqual(
+            [r.Level for r in self.t.where_between('Level', hi=5)], [3, 5])
+
+    def test_missing_values_in_later_columns(self):
+        i = self.t.add_index(['Pokemon', 'Owner']).reindex()
+        self.check(
+            self.t.where_between('Pokemon', 'N', 'Q'),
+            [('Pikachu', 'Ash', 12), ('Pikachu', 'Misty', 3),
+             ('Onyx', 'Brock', 30), ('Pikachu', None, 5)], True)
+
+    def test_without_index(self):
+        self.check(
+            self.t.where_between('Level', 40, 50),
+            [('Starmie', 'Misty', 44)], False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+from eztable import Table
+from eztable.stats import ZoneMap
+
+
+class TestZoneMap(unittest.TestCase):
+
+    def setUp(self):
+        self.t = Table([('Time', int), ('Value', 'i'), ('Name', str)])
+        self.t.extend((i, i % 7, 'n%d' % (i % 3)) for i in range(10000))
+
+    def test_zone_map_covers_complete_chunks(self):
+        zm = self.t._get_column('Time').zone_map
+        self.assertEqual(zm.chunk_size, ZoneMap.CHUNK_SIZE)
+        self.assertEqual(len(zm), 10000 // ZoneMap.CHUNK_SIZE)
+        self.assertEqual(zm.mins[1], ZoneMap.CHUNK_SIZE)
+        self.assertEqual(zm.maxs[1], 2 * ZoneMap.CHUNK_SIZE - 1)
+
+    def test_zone_map_grows(self):
+        c = self.t._get_column('Time')
+        before = len(c.zone_map)
+        self.t.extend((i, 0, 'x') for i in range(10000, 20000))
+        self.assertEqual(len(c.zone_map), 20000 // ZoneMap.CHUNK_SIZE)
+        self.assertTrue(len(c.zone_map) > before)
+
+    def test_possible_chunks(self):
+        zm = ZoneMap(chunk_size=2)
+        zm.add_chunk([1, 2])
+        zm.add_chunk([None, None])
+        zm.add_chunk([5, 3])
+        self.assertEqual(zm.possible_chunks(2, 4), [True, False, True])
+        self.assertEqual(zm.possible_chunks(lo=4), [False, False, True])
+        self.assertEqual(zm.possible_chunks(hi=0), [False, False, False])
+
+    def test_unorderable_column_has_no_zone_map(self):
+        t = Table(['A'], [(1,), ('a',)] * 5000)
+        self.assertIsNone(t._get_column('A').zone_map)
+
+    def test_restrict_between(self):
+        r = self.t.restrict_between('Time', 9990, 9995)
+        self.assertEqual(list(r.Time), list(range(9990, 9996)))
+
+    def test_restrict_between_open_ranges(self):
+        self.assertEqual(len(self.t.restrict_between('Time', lo=9000)), 1000)
+        self.assertEqual(len(self.t.restrict_between('Time', hi=99)), 100)
+
+    def test_restrict_between_matches_restrict(self):
+        r = self.t.restrict_between('Value', 2, 3)
+        expected = self.t.restrict(['Value'], lambda v: 2 <= v <= 3)
+        self.assertEqual(list(r), list(expected))
+
+    def test_restrict_between_skips_chunks(self):
+        c = self.t._get_column('Time')
+        reads = []
+        getitem = type(c).__getitem__
+
+        class CountingColumn(type(c)):
+            def __getitem__(self, key):
+                reads.append(key)
+                return getitem(self, key)
+
+        c.zone_map
+        c.__class__ = CountingColumn
+        r = self.t.restrict_between('Time', 9000, 9100)
+        self.assertEqual(len(list(r._indices_func())), 101)
+        self.assertEqual(reads, [slice(8192, 10000)])
+
+    def test_restrict_between_on_derived_table(self):
+        r = self.t.restrict(['Name'], lambda n: n == 'n0')
+        r = r.restrict_between('Time', 9990, 9999)
+        self.assertEqual(list(r.Time), [9990, 9993, 9996, 9999])
+
+    def test_restrict_between_ignores_missing_values(self):
+        t = Table([('A', int)], [(1,), (None,), (3,)])
+        self.assertEqual(list(t.restrict_between('A', 0, 5).A), [1, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()